@@ -0,0 +1,79 @@
+"""
+Benchmark Up transaction parsing: pydantic models vs the direct row mapping.
+
+Compares UpBankClient._parse_transaction + UpBankSync._transaction_to_dict
+against transaction_to_row (with and without validation) on generated
+JSON:API items, and checks both paths produce identical rows.
+
+Run with:
+    uv run python benchmarks/bench_up_parse.py --rows 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finance.up_client import UpBankClient, transaction_to_row
+from finance.up_fake_server import FakeUpData
+from finance.up_models import UP_TRANSACTION_COLUMNS
+from finance.up_sync import UpBankSync
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", help="Number of transactions to parse", type=int, default=50000)
+    parser.add_argument("--repeat", help="Timed repetitions per path (best is kept)", type=int, default=3)
+    args = parser.parse_args()
+
+    data = FakeUpData(accounts=2, transactions_per_account=args.rows // 2)
+    items = [t for txs in data.transactions.values() for t in txs]
+
+    client = UpBankClient(api_token="bench-token")
+    # _transaction_to_dict doesn't touch the db or client
+    sync = UpBankSync.__new__(UpBankSync)
+
+    def pydantic_path():
+        rows = []
+        for item in items:
+            tx_data = sync._transaction_to_dict(client._parse_transaction(item))
+            rows.append(tuple(tx_data[c] for c in UP_TRANSACTION_COLUMNS))
+        return rows
+
+    def row_path():
+        return [transaction_to_row(item) for item in items]
+
+    def validated_row_path():
+        return [transaction_to_row(item, validate=True) for item in items]
+
+    paths = [
+        ("pydantic models + dict", pydantic_path),
+        ("transaction_to_row", row_path),
+        ("transaction_to_row (validate)", validated_row_path),
+    ]
+
+    reference = None
+    baseline = None
+    print(f"Parsing {len(items)} transactions, best of {args.repeat}")
+    print(f"{'path':<32}{'seconds':>9}{'rows/s':>12}{'speedup':>9}")
+
+    for name, fn in paths:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            rows = fn()
+            best = min(best, time.perf_counter() - started)
+
+        if reference is None:
+            reference = rows
+        elif rows != reference:
+            print(f"  warning: {name} produced rows that differ from the pydantic path")
+
+        baseline = baseline or best
+        print(f"{name:<32}{best:>9.3f}{len(items) / best:>12.0f}{baseline / best:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark Up Bank sync throughput against the local fake Up API.
+
+Measures rows/second, pages/second and total sync time for the serial and
+concurrent (thread-per-account) sync modes, each against a fresh scratch DB.
+
+Run with:
+    uv run python benchmarks/bench_up_sync.py --accounts 8 --transactions 2000 --latency 0.02
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finance.db import FinanceDB
+from finance.up_client import UpBankClient
+from finance.up_fake_server import FakeUpData, FakeUpServer
+from finance.up_sync import UpBankSync
+
+
+def run_mode(server: FakeUpServer, max_workers: int) -> dict:
+    """Run one full sync into a scratch DB and return its throughput figures."""
+    server.reset_stats()
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        db = FinanceDB(os.path.join(scratch_dir, "bench.db"))
+        client = UpBankClient(api_token="fake-token", base_url=server.url)
+        sync = UpBankSync(db=db, client=client, max_workers=max_workers)
+
+        started = time.perf_counter()
+        results = sync.sync_all(skip_unchanged=False)
+        elapsed = time.perf_counter() - started
+
+        rows = sum(r.items_synced for r in results['transactions'])
+        failed = sum(1 for r in results['transactions'] if r.status == 'failed')
+
+    pages = server.stats["transaction_pages"]
+    return {
+        "seconds": elapsed,
+        "rows": rows,
+        "pages": pages,
+        "requests": server.stats["requests"],
+        "throttled": server.stats["throttled"],
+        "failed_accounts": failed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "pages_per_second": pages / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", help="Number of fake accounts", type=int, default=8)
+    parser.add_argument("--transactions", help="Transactions per account", type=int, default=1000)
+    parser.add_argument("--latency", help="Seconds of latency per request", type=float, default=0.02)
+    parser.add_argument("--rate-limit", help="Requests allowed per window", type=int, default=None)
+    parser.add_argument("--rate-limit-window", help="Rate limit window in seconds", type=float, default=60.0)
+    parser.add_argument("--workers", help="Worker threads for concurrent mode", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    data = FakeUpData(args.accounts, args.transactions)
+    modes = [("serial", 1), (f"concurrent ({args.workers} workers)", args.workers)]
+
+    with FakeUpServer(
+        data,
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        rate_limit_window=args.rate_limit_window,
+    ) as server:
+        print(f"Fake Up API: {args.accounts} accounts, {data.total_transactions} transactions, "
+              f"{args.latency * 1000:.0f}ms latency")
+        print(f"{'mode':<26}{'seconds':>9}{'rows':>9}{'pages':>7}{'rows/s':>10}{'pages/s':>9}{'429s':>6}")
+
+        for name, workers in modes:
+            r = run_mode(server, workers)
+            print(f"{name:<26}{r['seconds']:>9.2f}{r['rows']:>9}{r['pages']:>7}"
+                  f"{r['rows_per_second']:>10.0f}{r['pages_per_second']:>9.1f}{r['throttled']:>6}")
+            if r["failed_accounts"]:
+                print(f"  warning: {r['failed_accounts']} account syncs failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,27 @@
-from fastapi import FastAPI, Query, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, Query, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+import asyncio
+import codecs
+import queue
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import json
 import pandas as pd
-import tempfile
 
 from finance.db import FinanceDB
-from finance.dataloader_commbank import process_commbank_transactions_file
+from finance.dataloader_commbank import CommBankLoader
 from finance.up_sync import UpBankSync
+from finance.up_scheduler import SyncScheduler
+from finance.up_events import SyncEventBroadcaster, format_sse
 from finance.up_client import UpBankClient, UpBankAPIError
-from finance.etf_analysis import get_all_etf_analysis, process_ticker, load_etf_config
+from finance.upload_jobs import UploadJobQueue
+from finance.reparse import ReparseJobRunner
+from finance.categoriser import MerchantCategoriser, DEFAULT_MIN_CONFIDENCE as DEFAULT_SUGGESTION_CONFIDENCE
+from finance.etf_analysis import run_etf_analysis, process_ticker, load_etf_config, warm_fit_pool, shutdown_fit_pool
+from finance.etf_prices import ETFPriceStore
 
 # Subscription merchant patterns - transactions matching these are "fixed costs"
 # and should be spread across the month rather than spiking on specific days
@@ -30,6 +39,13 @@ SUBSCRIPTION_PATTERNS = [
 # This will be spread daily: ~$132.49 / 30.5 = ~$4.34/day
 MONTHLY_SUBSCRIPTION_BUDGET = 132.49
 
+# Uploads are read in chunks of this many bytes
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Received-but-unparsed chunks buffered per streaming upload before the
+# upload is made to wait for the parser
+UPLOAD_QUEUE_CHUNKS = 64
+
 # Add parent directory to path to import database module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -148,6 +164,71 @@ def ensure_tables_exist():
 db = FinanceDB(db_path)
 ensure_tables_exist()
 
+# Suggests categories for uncategorised merchants; trained on first use and
+# updated in place whenever a merchant's categories are edited
+categoriser = MerchantCategoriser(db)
+
+# Background Up Bank syncs: periodic incremental runs plus on-demand triggers,
+# never more than one at a time (UP_SYNC_INTERVAL_MINUTES=0 disables the timer)
+up_sync_interval = int(os.getenv("UP_SYNC_INTERVAL_MINUTES", "60"))
+up_sync_events = SyncEventBroadcaster()
+up_sync_scheduler = SyncScheduler(
+    lambda: UpBankSync(db=db, events=up_sync_events),
+    interval=timedelta(minutes=up_sync_interval) if up_sync_interval > 0 else None,
+    events=up_sync_events
+)
+
+@app.on_event("startup")
+def start_up_sync_scheduler():
+    if os.getenv("UP_BANK_TOKEN"):
+        up_sync_scheduler.start()
+
+@app.on_event("shutdown")
+def stop_up_sync_scheduler():
+    up_sync_scheduler.stop()
+
+# Uploaded statements are processed by a bounded worker pool and tracked in
+# upload_jobs, so they survive restarts and don't starve the API
+upload_jobs = UploadJobQueue(
+    db,
+    os.path.join(data_dir, "uploads"),
+    max_concurrent=int(os.getenv("UPLOAD_MAX_CONCURRENT_JOBS", "1"))
+)
+
+@app.on_event("startup")
+def resume_upload_jobs():
+    upload_jobs.resume_unfinished()
+
+@app.on_event("shutdown")
+def stop_upload_jobs():
+    upload_jobs.shutdown()
+
+# Re-parses rows from older parser versions in the background, resuming
+# after restarts from the last transaction id it handled
+reparse_jobs = ReparseJobRunner(db)
+
+@app.on_event("startup")
+def resume_reparse_jobs():
+    reparse_jobs.resume_unfinished()
+
+@app.on_event("shutdown")
+def stop_reparse_jobs():
+    reparse_jobs.shutdown()
+
+# ETF history is kept in etf_prices and topped up with only the newest bars;
+# ETF_PRICE_FIXTURES points it at fixture CSVs for offline runs
+etf_prices = ETFPriceStore(db)
+
+# ETF fits run in worker processes only when ETF_FIT_PROCESSES is set;
+# those are started here so the first analysis doesn't pay for the spawn
+@app.on_event("startup")
+def start_etf_fit_pool():
+    warm_fit_pool()
+
+@app.on_event("shutdown")
+def stop_etf_fit_pool():
+    shutdown_fit_pool()
+
 @app.get("/")
 def read_root():
     return {"message": "Finance Dashboard API is running"}
@@ -685,7 +766,8 @@ def add_merchant_category(merchant_name: str, category_id: int):
             cursor = conn.cursor()
             cursor.execute(query, (merchant_name, category_id))
             conn.commit()
-            
+
+        categoriser.learn(merchant_name)
         return {"status": "success"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add category to merchant: {str(e)}")
@@ -703,11 +785,76 @@ def remove_merchant_category(merchant_name: str, category_id: int):
             cursor = conn.cursor()
             cursor.execute(query, (merchant_name, category_id))
             conn.commit()
-            
+
+        categoriser.learn(merchant_name)
         return {"status": "success"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to remove category from merchant: {str(e)}")
 
+@app.post("/merchants/categories/suggestions/refresh")
+def refresh_category_suggestions(
+    min_confidence: float = Query(DEFAULT_SUGGESTION_CONFIDENCE, description="Lowest confidence stored as a suggestion")
+):
+    """Suggest a category for every uncategorised merchant from the existing assignments."""
+    try:
+        suggestions = categoriser.categorise_all(min_confidence=min_confidence)
+        return {
+            "status": "success",
+            "suggestions": len(suggestions),
+            "labelled_merchants": len(categoriser.merchants)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to suggest categories: {str(e)}")
+
+@app.get("/merchants/categories/suggestions")
+def get_category_suggestions(
+    min_confidence: float = Query(0.0, description="Only suggestions at or above this confidence"),
+    limit: Optional[int] = Query(None, description="Maximum number of suggestions to return")
+):
+    """Get stored category suggestions, most confident first."""
+    try:
+        suggestions = db.get_category_suggestions(min_confidence=min_confidence, limit=limit)
+        return suggestions.to_dict(orient="records")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch category suggestions: {str(e)}")
+
+@app.post("/merchants/categories/suggestions/accept")
+def accept_category_suggestions(
+    min_confidence: float = Query(..., description="Accept every suggestion at or above this confidence")
+):
+    """Assign the suggested category to every merchant whose suggestion clears min_confidence."""
+    try:
+        suggestions = db.get_category_suggestions(min_confidence=min_confidence)
+        assignments = list(zip(suggestions['merchant_name'], suggestions['category_id'].astype(int)))
+
+        with db._get_connection() as conn:
+            conn.executemany("""
+            INSERT INTO merchant_categories (merchant_name, category_id)
+            VALUES (?, ?)
+            ON CONFLICT (merchant_name, category_id) DO NOTHING;
+            """, assignments)
+            conn.executemany(
+                "DELETE FROM merchant_category_suggestions WHERE merchant_name = ?",
+                [(merchant_name,) for merchant_name, _ in assignments]
+            )
+            conn.commit()
+
+        # One rebuild is cheaper than learning each merchant separately
+        categoriser.train()
+        return {"status": "success", "accepted": len(assignments)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to accept category suggestions: {str(e)}")
+
+@app.post("/merchants/{merchant_name}/categories/suggestion/accept")
+def accept_category_suggestion(merchant_name: str):
+    """Assign a merchant its suggested category."""
+    suggestions = db.run_query_pandas(
+        "SELECT category_id FROM merchant_category_suggestions WHERE merchant_name = ?", (merchant_name,)
+    )
+    if suggestions.empty:
+        raise HTTPException(status_code=404, detail=f"No category suggestion for merchant: {merchant_name}")
+    return add_merchant_category(merchant_name, int(suggestions['category_id'].iloc[0]))
+
 @app.get("/transactions/timeline/categories")
 def get_transaction_timeline_with_categories(
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
@@ -830,8 +977,12 @@ def delete_category(category_id: int):
             cursor = conn.cursor()
             cursor.execute(delete_associations_query, (category_id,))
             cursor.execute(delete_category_query, (category_id,))
+            cursor.execute("DELETE FROM merchant_category_suggestions WHERE category_id = ?", (category_id,))
             conn.commit()
-            
+
+        # Every merchant in the deleted category lost a label
+        categoriser.train()
+
         return {"status": "success", "message": "Category deleted successfully"}
     except Exception as e:
         print(f"ERROR in delete_category: {str(e)}")
@@ -902,43 +1053,32 @@ def get_raw_transactions(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to fetch raw transactions: {str(e)}")
 
-@app.post("/transactions/upload/commbank")
-async def upload_commbank_transactions(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    db_path: str = Query("data/finance-prod.db", description="Database path")
-):
-    """Upload and process Commonwealth Bank transactions CSV file."""
+async def _queue_statement_upload(source: str, file: UploadFile, db_path: str):
+    """Save an uploaded statement to a job file in chunks and queue it for processing."""
     try:
-        # Create a temporary file to store the uploaded content
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as temp_file:
-            # Write the uploaded file content to the temp file
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        # Get an estimate of the number of rows to process
-        with open(temp_file_path, 'r', encoding='utf-8') as f:
-            row_count = sum(1 for _ in f) - 1  # Subtract 1 for header
-        
-        # Process the file in the background to avoid timeout
-        background_tasks.add_task(
-            process_commbank_transactions_file,
-            temp_file_path,
-            db_path,
-            model="gemma3"
+        job_id = upload_jobs.new_job_id()
+        file_path = upload_jobs.new_upload_path(job_id)
+
+        # Copy the upload to the job's file in chunks, counting lines as we go
+        line_count = 0
+        with open(file_path, 'wb') as upload_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                upload_file.write(chunk)
+                line_count += chunk.count(b'\n')
+
+        row_count = max(0, line_count - 1)  # Subtract 1 for header
+        job = upload_jobs.submit(
+            job_id, source, file_path, db_path,
+            filename=file.filename, model="gemma3", estimated_rows=row_count
         )
-        
-        # Return success response with estimated processing time
-        estimated_time = max(1, row_count // 10)  # Rough estimate: 10 rows per minute
-        
+
         return {
             "status": "success",
-            "message": f"File uploaded and processing started. Transactions will be added to the database.",
+            "message": f"File uploaded and queued for processing. Track it at /transactions/upload/jobs/{job_id}.",
             "filename": file.filename,
             "estimated_rows": row_count,
-            "estimated_time_minutes": estimated_time,
-            "saved_path": temp_file_path
+            "job_id": job_id,
+            "job": job
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process file: {str(e)}")
@@ -946,6 +1086,167 @@ async def upload_commbank_transactions(
         # Close the file
         await file.close()
 
+@app.post("/transactions/upload/commbank")
+async def upload_commbank_transactions(
+    file: UploadFile = File(...),
+    db_path: str = Query("data/finance-prod.db", description="Database path")
+):
+    """Upload a Commonwealth Bank transactions CSV file and queue it for processing."""
+    return await _queue_statement_upload('commbank', file, db_path)
+
+@app.post("/transactions/upload/westpac")
+async def upload_westpac_transactions(
+    file: UploadFile = File(...),
+    db_path: str = Query("data/finance-prod.db", description="Database path")
+):
+    """Upload a Westpac transactions CSV file and queue it for processing."""
+    return await _queue_statement_upload('westpac', file, db_path)
+
+@app.get("/transactions/upload/jobs")
+def get_upload_jobs(
+    limit: int = Query(50, description="Maximum number of jobs to return"),
+    status: Optional[str] = Query(None, description="Only jobs with this status")
+):
+    """List recent upload jobs with their progress."""
+    try:
+        jobs = db.get_upload_jobs(limit=limit, status=status)
+        jobs = jobs.astype(object).where(jobs.notna(), None)
+        return {
+            "jobs": jobs.to_dict(orient="records"),
+            "active_jobs": upload_jobs.active_jobs,
+            "max_concurrent": upload_jobs.max_concurrent
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch upload jobs: {str(e)}")
+
+@app.get("/transactions/upload/jobs/{job_id}")
+def get_upload_job(job_id: str):
+    """Get the progress of a single upload job."""
+    job = db.get_upload_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Upload job {job_id} not found")
+    return job
+
+@app.get("/transactions/parser-versions")
+def get_parser_versions(source: Optional[str] = Query(None, description="Only this statement source")):
+    """Count transactions by the parser version that produced their parsed fields."""
+    try:
+        counts = db.get_parser_version_counts(source)
+        counts = counts.astype(object).where(counts.notna(), None)
+        return counts.to_dict(orient="records")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch parser versions: {str(e)}")
+
+@app.post("/transactions/reparse")
+def start_reparse(
+    source: str = Query("commbank", description="Statement source to re-parse"),
+    model: str = Query("gemma3", description="LLM model for descriptions the rules and cache can't handle")
+):
+    """Queue a re-parse of rows produced by an older parser version (joins one already running)."""
+    try:
+        job = reparse_jobs.start(source, model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start re-parse: {str(e)}")
+    return {
+        "status": "success",
+        "message": f"Re-parse queued. Track it at /transactions/reparse/jobs/{job['id']}.",
+        "job_id": job['id'],
+        "job": job
+    }
+
+@app.get("/transactions/reparse/jobs")
+def get_reparse_jobs(limit: int = Query(50, description="Maximum number of jobs to return")):
+    """List recent re-parse jobs with their progress."""
+    try:
+        jobs = db.get_reparse_jobs(limit=limit)
+        jobs = jobs.astype(object).where(jobs.notna(), None)
+        return {"jobs": jobs.to_dict(orient="records"), "active_jobs": reparse_jobs.active_jobs}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch re-parse jobs: {str(e)}")
+
+@app.get("/transactions/reparse/jobs/{job_id}")
+def get_reparse_job(job_id: str):
+    """Get the progress of a single re-parse job."""
+    job = db.get_reparse_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Re-parse job {job_id} not found")
+    return job
+
+async def _iter_upload_lines(request: Request):
+    """Yield lists of complete, decoded lines from a request body as it arrives."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split('\n')
+        if complete:
+            yield [line + '\n' for line in complete]
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield [buffer]
+
+def _drain_lines(lines: queue.Queue):
+    """Yield lines handed over by the request handler until it sends None."""
+    while (chunk := lines.get()) is not None:
+        yield from chunk
+
+@app.post("/transactions/upload/commbank/stream")
+async def stream_commbank_transactions(
+    request: Request,
+    db_path: str = Query("data/finance-prod.db", description="Database path"),
+    model: str = Query("gemma3", description="LLM model for descriptions the rules can't parse")
+):
+    """
+    Ingest a Commonwealth Bank CSV sent as the raw request body, e.g.
+    `curl --data-binary @statement.csv -H 'Content-Type: text/csv' ...`.
+
+    Rows are parsed and committed in batches while the body is still
+    uploading. Only a bounded number of received chunks is buffered, so a
+    slow parse applies backpressure to the upload rather than growing memory.
+    """
+    lines = queue.Queue(maxsize=UPLOAD_QUEUE_CHUNKS)
+
+    def ingest():
+        loader = CommBankLoader(FinanceDB(db_path), model=model)
+        return loader.load_rows(loader.iter_rows(_drain_lines(lines)))
+
+    processing = asyncio.create_task(asyncio.to_thread(ingest))
+
+    async def hand_over(chunk):
+        while not processing.done():
+            try:
+                lines.put_nowait(chunk)
+                return
+            except queue.Full:
+                await asyncio.sleep(0.05)
+
+    try:
+        async for chunk in _iter_upload_lines(request):
+            await hand_over(chunk)
+            if processing.done():
+                break
+    finally:
+        await hand_over(None)
+
+    try:
+        stats = await processing
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to process upload: {str(e)}")
+
+    return {
+        "status": "success",
+        "rows": stats['rows'],
+        "inserted": stats['inserted'],
+        "skipped": stats['skipped'],
+        "failed": stats['failed'],
+        "seconds": round(stats['seconds'], 2),
+        "parsing": {
+            key: stats[key] for key in ('rules', 'cache_hits', 'index_hits', 'llm_rows', 'llm_failures')
+        }
+    }
+
 @app.post("/merchants/categories/batch")
 def get_merchant_categories_batch(merchant_names: List[str]):
     """Get categories for multiple merchants in a single request."""
@@ -1544,36 +1845,80 @@ def get_daily_spending_adjusted(
         raise HTTPException(status_code=500, detail=f"Failed to fetch adjusted daily spending: {str(e)}")
 
 @app.post("/up/sync")
-def trigger_up_sync(background_tasks: BackgroundTasks):
-    """Trigger a full sync from Up Bank API."""
+def trigger_up_sync(
+    resume: bool = Query(False, description="Resume interrupted syncs from their checkpoints")
+):
+    """Trigger a sync from Up Bank API, or join the one already running."""
     try:
-        # Check if API is configured
-        try:
-            client = UpBankClient()
-            if not client.ping():
-                raise HTTPException(status_code=503, detail="Up Bank API is not accessible")
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-
-        # Run sync in background
-        def run_sync():
-            sync = UpBankSync(db=db)
-            sync.sync_all()
-
-        background_tasks.add_task(run_sync)
+        # Check if API is configured; connectivity is checked by the sync job itself
+        if not os.getenv("UP_BANK_TOKEN"):
+            raise HTTPException(
+                status_code=400,
+                detail="Up Bank API token required. Set UP_BANK_TOKEN env var or pass api_token."
+            )
+
+        job = up_sync_scheduler.trigger(reason='manual', resume=resume)
+        already_running = job.triggers > 1
+
+        if already_running and resume and not job.resume:
+            message = ("Joined the Up Bank sync already in progress; it is not resuming from "
+                       "checkpoints, so trigger again with resume once it finishes")
+        elif already_running:
+            message = "Joined the Up Bank sync already in progress"
+        else:
+            message = "Up Bank sync started in background"
 
         return {
-            "status": "started",
-            "message": "Up Bank sync started in background"
+            "status": "already_running" if already_running else "started",
+            "message": message,
+            "job_id": job.id,
+            "job": job.to_dict()
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start sync: {str(e)}")
 
+@app.get("/up/sync/jobs/{job_id}")
+def get_sync_job(
+    job_id: str,
+    wait: float = Query(0, description="Seconds to wait for the job to finish (max 60)")
+):
+    """Get a sync job by ID, optionally waiting for it to complete."""
+    job = up_sync_scheduler.wait(job_id, timeout=min(max(wait, 0), 60)) if wait else up_sync_scheduler.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Sync job not found: {job_id}")
+    return job.to_dict()
+
+@app.get("/up/sync/events")
+async def stream_sync_events(
+    replay: bool = Query(True, description="Replay recent events on connect")
+):
+    """Stream Up Bank sync progress as Server-Sent Events."""
+    queue = up_sync_events.subscribe(replay=replay)
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    event = None
+                yield format_sse(event)
+        finally:
+            up_sync_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/up/sync/status")
-def get_sync_status():
-    """Get the status of Up Bank sync operations."""
+def get_sync_status(
+    trend_days: int = Query(30, description="Days of per-phase timing trends to include")
+):
+    """Get the status of Up Bank sync operations, with per-phase timings."""
     try:
         query = """
         SELECT
@@ -1583,7 +1928,15 @@ def get_sync_status():
             completed_at,
             status,
             items_synced,
-            error_message
+            error_message,
+            http_seconds,
+            rate_limit_sleep_seconds,
+            parse_seconds,
+            db_seconds,
+            pages,
+            requests,
+            retries,
+            max_request_seconds
         FROM sync_metadata
         ORDER BY started_at DESC
         LIMIT 10
@@ -1594,9 +1947,22 @@ def get_sync_status():
         last_sync_df = db.get_last_up_sync()
         last_sync = last_sync_df['last_sync'].iloc[0] if not last_sync_df.empty else None
 
+        current_job = up_sync_scheduler.current_job
+        next_run = up_sync_scheduler.next_run_at
+
+        # Where sync time goes: recent totals per sync type, and daily trends
+        summary_df = db.get_sync_telemetry_summary()
+        trends_df = db.get_sync_telemetry_trends(days=trend_days)
+
         return {
             "last_successful_sync": last_sync,
-            "recent_syncs": df.to_dict(orient="records")
+            "current_job": current_job.to_dict() if current_job else None,
+            "next_scheduled_sync": next_run.isoformat() if next_run else None,
+            "recent_syncs": df.astype(object).where(df.notna(), None).to_dict(orient="records"),
+            "performance": {
+                "by_sync_type": summary_df.to_dict(orient="records"),
+                "daily_trends": trends_df.to_dict(orient="records")
+            }
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch sync status: {str(e)}")
@@ -1666,11 +2032,13 @@ def get_up_summary():
 def get_etf_analysis():
     """Get analysis for all configured ETFs."""
     try:
-        results = get_all_etf_analysis()
+        analysis = run_etf_analysis(prices=etf_prices)
         return {
             "status": "success",
-            "etfs": results,
-            "count": len(results)
+            "etfs": analysis["results"],
+            "count": len(analysis["results"]),
+            "errors": analysis["errors"],
+            "seconds": analysis["seconds"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch ETF analysis: {str(e)}")
@@ -1685,7 +2053,7 @@ def get_single_etf_analysis(ticker: str):
         if ticker not in etf_config:
             raise HTTPException(status_code=404, detail=f"ETF ticker '{ticker}' not found in configuration")
 
-        result = process_ticker(ticker, etf_config[ticker])
+        result = process_ticker(ticker, etf_config[ticker], prices=etf_prices)
 
         if result is None:
             raise HTTPException(status_code=500, detail=f"Failed to fetch data for {ticker}")
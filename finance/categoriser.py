@@ -0,0 +1,202 @@
+"""Offline merchant categorisation trained on existing merchant_categories assignments."""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from .db import FinanceDB
+from .merchant_index import SCORE_CHUNK_SIZE, embedding_text
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Neighbours that vote on each merchant's category
+DEFAULT_NEIGHBOURS = 5
+
+# Suggestions below this confidence are not stored
+DEFAULT_MIN_CONFIDENCE = 0.3
+
+
+class MerchantCategoriser:
+    """
+    Weighted k-nearest-neighbour classifier over merchant names.
+
+    Merchants are embedded as L2-normalised hashed character n-grams, so
+    training is just stacking labelled rows and scoring every unassigned
+    merchant is one sparse matrix product. A merchant's category scores are
+    the cosine-weighted votes of its nearest labelled merchants, and the
+    confidence of a suggestion is the winning category's share of the vote
+    scaled by the similarity of the closest neighbour. Because there is
+    nothing to fit, a user's correction is learned by updating one row.
+    """
+
+    def __init__(self, db: FinanceDB, neighbours: int = DEFAULT_NEIGHBOURS):
+        """
+        Initialize the categoriser.
+
+        Args:
+            db: Database holding merchant_categories and transactions
+            neighbours: Labelled merchants that vote on each suggestion
+        """
+        self.db = db
+        self.neighbours = max(1, neighbours)
+        self.vectorizer = HashingVectorizer(
+            analyzer='char_wb', ngram_range=(2, 4), n_features=2 ** 18,
+            alternate_sign=False, norm='l2'
+        )
+        self.merchants: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.matrix = sparse.csr_matrix((0, self.vectorizer.n_features), dtype=np.float64)
+        self.labels: List[frozenset] = []
+        self.trained = False
+        self._lock = threading.Lock()
+
+    def train(self) -> int:
+        """
+        Rebuild the model from every merchant_categories assignment.
+
+        Returns:
+            Number of labelled merchants
+        """
+        labels = self.db.get_merchant_category_labels()
+        grouped = labels.groupby('merchant_name')['category_id'].agg(frozenset) if not labels.empty else {}
+
+        with self._lock:
+            self.merchants = list(grouped.keys()) if len(grouped) else []
+            self.rows = {merchant: i for i, merchant in enumerate(self.merchants)}
+            self.labels = [grouped[merchant] for merchant in self.merchants]
+            self.matrix = self._embed(self.merchants)
+            self.trained = True
+        logger.info(f"Categoriser trained on {len(self.merchants)} labelled merchants")
+        return len(self.merchants)
+
+    def learn(self, merchant_name: str) -> Optional[frozenset]:
+        """
+        Update the model with a merchant's current categories after a user edit.
+
+        Returns:
+            The categories now learned for the merchant (empty if it has none)
+        """
+        if not self.trained:
+            self.train()
+        labels = self.db.run_query_pandas(
+            "SELECT category_id FROM merchant_categories WHERE merchant_name = ?", params=(merchant_name,)
+        )
+        categories = frozenset(int(c) for c in labels['category_id'])
+
+        with self._lock:
+            row = self.rows.get(merchant_name)
+            if row is not None:
+                self.labels[row] = categories
+            elif categories:
+                self.rows[merchant_name] = len(self.merchants)
+                self.merchants.append(merchant_name)
+                self.labels.append(categories)
+                self.matrix = sparse.vstack([self.matrix, self._embed([merchant_name])], format='csr')
+
+        # A categorised merchant no longer needs a suggestion
+        self.db.delete_category_suggestion(merchant_name)
+        return categories
+
+    def predict(self, merchant_names: List[str]) -> pd.DataFrame:
+        """
+        Suggest one category per merchant in a single vectorized pass.
+
+        Returns:
+            DataFrame with merchant_name, category_id, confidence,
+            nearest_merchant and similarity (category_id is None where no
+            labelled merchant shares any n-grams)
+        """
+        columns = ['merchant_name', 'category_id', 'confidence', 'nearest_merchant', 'similarity']
+        with self._lock:
+            merchants, labels, matrix = list(self.merchants), list(self.labels), self.matrix
+
+        # Merchant x category indicator matrix; unlabelled rows never vote
+        categories = sorted({c for label in labels for c in label})
+        if not merchant_names or not categories:
+            return pd.DataFrame({'merchant_name': merchant_names}, columns=columns)
+        column_of = {c: i for i, c in enumerate(categories)}
+        rows = [i for i, label in enumerate(labels) for _ in label]
+        cols = [column_of[c] for label in labels for c in label]
+        votes = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(merchants), len(categories)))
+        has_label = np.array([bool(label) for label in labels])
+
+        k = min(self.neighbours, len(merchants))
+        results = []
+        for start in range(0, len(merchant_names), SCORE_CHUNK_SIZE):
+            chunk = merchant_names[start:start + SCORE_CHUNK_SIZE]
+            similarities = (self._embed(chunk) @ matrix.T).toarray()
+            similarities[:, ~has_label] = 0.0
+
+            # Keep each row's k most similar labelled merchants
+            nearest = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            weights = np.zeros_like(similarities)
+            np.put_along_axis(weights, nearest, np.take_along_axis(similarities, nearest, axis=1), axis=1)
+
+            scores = np.asarray(votes.T.dot(weights.T).T)
+            total = weights.sum(axis=1)
+            best = scores.argmax(axis=1)
+            share = np.divide(scores[np.arange(len(chunk)), best], total, out=np.zeros(len(chunk)), where=total > 0)
+            top = similarities.argmax(axis=1)
+            top_similarity = similarities[np.arange(len(chunk)), top]
+
+            for i, merchant in enumerate(chunk):
+                matched = total[i] > 0
+                results.append((
+                    merchant,
+                    categories[best[i]] if matched else None,
+                    float(share[i] * top_similarity[i]) if matched else 0.0,
+                    merchants[top[i]] if matched else None,
+                    float(top_similarity[i]),
+                ))
+        return pd.DataFrame(results, columns=columns)
+
+    def categorise_all(self, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> pd.DataFrame:
+        """
+        Score every uncategorised merchant and replace the stored suggestions.
+
+        Returns:
+            The suggestions that were stored
+        """
+        if not self.trained:
+            self.train()
+        merchants = self.db.get_uncategorised_merchants()['merchant_name'].tolist()
+        predictions = self.predict(merchants)
+        stored = predictions[predictions['category_id'].notna() & (predictions['confidence'] >= min_confidence)]
+
+        self.db.replace_category_suggestions([
+            (row.merchant_name, int(row.category_id), row.confidence, row.nearest_merchant, row.similarity)
+            for row in stored.itertuples(index=False)
+        ])
+        logger.info(f"Stored {len(stored)} category suggestions for {len(merchants)} uncategorised merchants "
+                    f"(confidence >= {min_confidence:.2f})")
+        return stored
+
+    def _embed(self, merchant_names: List[str]) -> sparse.csr_matrix:
+        # HashingVectorizer.transform raises on an empty list
+        if not merchant_names:
+            return sparse.csr_matrix((0, self.vectorizer.n_features), dtype=np.float64)
+        return self.vectorizer.transform([embedding_text(name) for name in merchant_names])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Suggest categories for uncategorised merchants")
+    parser.add_argument("--db-path", "-d", help="Database path", type=str, default="data/finance-prod.db")
+    parser.add_argument("--min-confidence", help="Lowest confidence stored as a suggestion", type=float, default=DEFAULT_MIN_CONFIDENCE)
+    parser.add_argument("--neighbours", "-k", help="Labelled merchants that vote on each suggestion", type=int, default=DEFAULT_NEIGHBOURS)
+    args = parser.parse_args()
+
+    categoriser = MerchantCategoriser(FinanceDB(args.db_path), neighbours=args.neighbours)
+    categoriser.train()
+    suggestions = categoriser.categorise_all(min_confidence=args.min_confidence)
+    print(suggestions.head(20).to_string(index=False))
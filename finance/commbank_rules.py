@@ -0,0 +1,157 @@
+"""Deterministic parser for the rigid CommBank description formats."""
+
+import re
+from typing import Dict, Optional, Tuple
+
+# Rows at or above this confidence are trusted without asking the LLM
+DEFAULT_MIN_CONFIDENCE = 0.8
+
+CARD_PATTERN = re.compile(
+    r'^(?P<body>.+?)\s+Card\s+(?P<card>xx\d{4})'
+    r'(?:\s+(?P<fx_currency>[A-Z]{3})\s+(?P<fx_amount>[\d,]+\.\d{2}))?'
+    r'(?:\s+Value Date:\s*(?P<date>\d{2}/\d{2}/\d{4}))?\s*$'
+)
+DIRECT_PATTERN = re.compile(r'^Direct (?P<kind>Debit|Credit)\s+\d+\s+(?P<party>.+?)\s*$', re.IGNORECASE)
+TRANSFER_PATTERN = re.compile(
+    r'^(?:Fast )?Transfer (?:To|From)\s+(?P<party>.+?)'
+    r'(?:\s+(?:from\s+)?CommBank [Aa]pp\b.*)?\s*$',
+    re.IGNORECASE
+)
+FEE_PATTERN = re.compile(r'^(?P<name>[A-Za-z ]*\bFee\b)(?:\s+Value Date:\s*\d{2}/\d{2}/\d{4})?\s*$', re.IGNORECASE)
+INTEREST_PATTERN = re.compile(r'^(?P<name>(?:Credit|Debit) Interest)\b', re.IGNORECASE)
+SIMPLE_AMOUNT_PATTERN = re.compile(r'^[+\-]?\d+(\.\d+)?$')
+
+# Trailing "AU AUS" style country suffix on card purchases
+COUNTRY_SUFFIX = re.compile(r'\s+(?:(?P<alpha2>[A-Z]{2})\s+)?(?P<alpha3>[A-Z]{3})$')
+
+AU_CITIES = {
+    'MELBOURNE', 'SYDNEY', 'BRISBANE', 'PERTH', 'ADELAIDE', 'HOBART', 'DARWIN',
+    'CANBERRA', 'GEELONG', 'NEWCASTLE', 'WOLLONGONG', 'CAIRNS', 'TOWNSVILLE',
+    'BALLARAT', 'BENDIGO', 'LAUNCESTON', 'TOOWOOMBA',
+}
+
+
+def _result(merchant_name, transaction_type, location=None, currency=None,
+            last_4_card_number=None, date=None) -> Dict[str, Optional[str]]:
+    return {
+        "merchant_name": merchant_name,
+        "transaction_type": transaction_type,
+        "location": location,
+        "currency": currency,
+        "last_4_card_number": last_4_card_number,
+        "date": date
+    }
+
+
+def _is_merchant_word(token: str) -> bool:
+    """Upper case words of two or more letters/digits ("KMART", "EZI*TPC") are merchant names, not suburbs."""
+    return token.isupper() and sum(c.isalnum() for c in token) >= 2
+
+
+def _split_merchant_location(body: str) -> Tuple[str, Optional[str], float]:
+    """
+    Split a card purchase body ("EZI*TPC Fitzroy MELBOURNE AU") into merchant and location.
+
+    Returns:
+        Tuple of (merchant, location, confidence)
+    """
+    # Unnormalized exports pad the merchant column with runs of spaces
+    columns = re.split(r'\s{2,}', body.strip())
+    if len(columns) > 1:
+        return columns[0], ' '.join(columns[1:]), 0.95
+
+    tokens = body.split()
+    for index in range(len(tokens) - 1, 0, -1):
+        if tokens[index] in AU_CITIES:
+            # Suburbs are printed in mixed case ahead of the upper case city
+            start = index
+            while start > 1 and not tokens[start - 1].isupper():
+                start -= 1
+            # Mixed-case merchant names ("Seven Seeds", "Guzman Y Gomez") look
+            # like suburbs too, so the split is only trusted when the suburb is
+            # a single word or the walk stopped on an upper case merchant word
+            suburb_words = index - start
+            stopped_on_merchant = _is_merchant_word(tokens[start - 1])
+            confidence = 0.9 if suburb_words <= 1 or stopped_on_merchant else 0.6
+            return ' '.join(tokens[:start]), ' '.join(tokens[start:]), confidence
+
+    # Overseas: "<merchant> <CITY> <STATE>" is the common shape, but city
+    # names can be several words, so leave the final call to the LLM
+    if len(tokens) >= 3 and len(tokens[-1]) == 2 and tokens[-1].isupper():
+        return ' '.join(tokens[:-2]), ' '.join(tokens[-2:]), 0.6
+
+    return body.strip(), None, 0.5
+
+
+def parse_card_purchase(description: str) -> Optional[Tuple[Dict, float]]:
+    match = CARD_PATTERN.match(description)
+    if not match:
+        return None
+
+    body = match.group('body')
+    country = COUNTRY_SUFFIX.search(body)
+    country_code = None
+    if country:
+        country_code = country.group('alpha3')
+        body = body[:country.start()]
+
+    merchant, location, confidence = _split_merchant_location(body)
+    if country:
+        location = f"{location} {country.group(0).strip()}" if location else country.group(0).strip()
+    else:
+        confidence -= 0.1
+
+    parsed = _result(
+        merchant_name=merchant,
+        transaction_type="Merchant",
+        location=location,
+        currency=match.group('fx_currency') or country_code,
+        last_4_card_number=match.group('card'),
+        date=match.group('date')
+    )
+    return parsed, confidence
+
+
+def rule_parse(description: str) -> Tuple[Optional[Dict], float, Optional[str]]:
+    """
+    Parse a CommBank description with fixed rules.
+
+    Produces the same fields as the LLM prompt in dataloader_commbank.
+
+    Args:
+        description: Raw transaction description
+
+    Returns:
+        Tuple of (parsed fields or None, confidence 0-1, name of the rule that matched)
+    """
+    description = description.strip()
+    if not description:
+        return None, 0.0, None
+
+    if SIMPLE_AMOUNT_PATTERN.match(description):
+        transaction_type = "Withdrawal" if description.startswith('-') else "Deposit"
+        return _result("Unknown", transaction_type), 1.0, 'simple_amount'
+
+    match = FEE_PATTERN.match(description)
+    if match:
+        return _result(' '.join(match.group('name').split()), "Fee"), 0.95, 'fee'
+
+    match = INTEREST_PATTERN.match(description)
+    if match:
+        return _result(match.group('name'), "Interest"), 0.95, 'interest'
+
+    match = DIRECT_PATTERN.match(description)
+    if match:
+        kind = match.group('kind').title()
+        return _result(match.group('party'), f"Direct {kind}"), 0.95, 'direct'
+
+    match = TRANSFER_PATTERN.match(description)
+    if match:
+        return _result(match.group('party'), "Transfer"), 0.9, 'transfer'
+
+    card = parse_card_purchase(description)
+    if card:
+        parsed, confidence = card
+        return parsed, confidence, 'card'
+
+    return None, 0.0, None
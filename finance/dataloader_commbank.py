@@ -1,19 +1,25 @@
-import csv
-from typing import List
+import json
+from typing import Callable, Iterable, List, Optional, Tuple
 import argparse
-from tqdm import tqdm
 import os
 import tempfile
 import sys
 import re
 import time
+import shutil
+import sqlite3
 import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from finance.db import FinanceDB, calculate_row_hash, parse_date
-from finance.llm import query_ollama, parse_json_response, is_valid_json
+from finance.db import FinanceDB, parse_date
+from finance.llm import OllamaClient, StubOllamaClient, get_default_client
+from finance.commbank_rules import rule_parse, DEFAULT_MIN_CONFIDENCE
+from finance.merchant_index import MerchantIndex, DEFAULT_SIMILARITY_THRESHOLD
+from finance.statement_loader import StatementLoader, ColumnMapping
 
 # Configure logging with more detailed format
 logging.basicConfig(
@@ -26,6 +32,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bump whenever create_commbank_prompt or create_commbank_batch_prompt
+# changes, so cached parses from the old prompts are not reused
+PROMPT_VERSION = "1"
+
+def commbank_parser_version(model):
+    """Version recorded on rows parsed with this prompt version and model."""
+    return f"prompt-{PROMPT_VERSION}/{model}"
+
+# Parallel LLM requests; Ollama only serves them concurrently up to OLLAMA_NUM_PARALLEL
+DEFAULT_LLM_WORKERS = 4
+
+PARSE_FIELDS = ("merchant_name", "transaction_type", "location", "currency", "last_4_card_number", "date")
+
+# JSON schemas Ollama constrains the single and batch prompt outputs to
+PARSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "merchant_name": {"type": "string"},
+        "transaction_type": {"type": "string"},
+        **{field: {"type": ["string", "null"]} for field in PARSE_FIELDS[2:]},
+    },
+    "required": list(PARSE_FIELDS),
+}
+BATCH_PARSE_SCHEMA = {"type": "array", "items": PARSE_SCHEMA}
+
+VALUE_DATE_PATTERN = re.compile(r'\s*Value Date:\s*(\d{2}/\d{2}/\d{4})\s*$', re.IGNORECASE)
+
 def is_simple_amount(description):
     """Check if the description is just an amount."""
     return bool(re.match(r'^[+\-]?\d+(\.\d+)?$', description.strip()))
@@ -123,21 +156,6 @@ Output:
 """
     return prompt
 
-def query_ollama_with_retry(prompt, model="gemma3", max_retries=3, retry_delay=2):
-    """Query Ollama with retry logic."""
-    for attempt in range(max_retries):
-        try:
-            logger.debug(f"Querying Ollama (attempt {attempt+1}/{max_retries})")
-            return query_ollama(prompt, model=model)
-        except Exception as e:
-            if attempt < max_retries - 1:
-                logger.warning(f"Ollama query failed (attempt {attempt+1}/{max_retries}): {e}")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-            else:
-                logger.error(f"Ollama query failed after {max_retries} attempts: {e}")
-                raise
-
 def handle_simple_amount(description):
     """Handle descriptions that are just amounts."""
     is_positive = not description.startswith('-')
@@ -161,195 +179,588 @@ def handle_simple_amount(description):
             "date": None
         }
 
-def process_commbank_transactions_file(file_path, db_path, model="gemma3"):
-    """Process a Commonwealth Bank transactions CSV file and insert into database."""
+def new_parse_stats():
+    """Counters for how each description was parsed."""
+    return {
+        'rules': 0, 'cache_hits': 0, 'index_hits': 0, 'llm_rows': 0, 'llm_calls': 0,
+        'llm_resplits': 0, 'llm_failures': 0
+    }
+
+def default_parse(description):
+    """Fallback parse used when the LLM response is missing or unusable."""
+    return {
+        "merchant_name": description[:50] if description else "Unknown",
+        "transaction_type": "Unknown",
+        "location": None,
+        "currency": None,
+        "last_4_card_number": None,
+        "date": None
+    }
+
+def normalize_description(description):
+    """
+    Normalize a description into a parse cache key.
+
+    Whitespace is collapsed and the trailing value date is dropped: it changes
+    on every card purchase but never changes the merchant fields we keep.
+    """
+    return VALUE_DATE_PATTERN.sub('', ' '.join(description.split()))
+
+def validate_parse(item):
+    """
+    Check one parsed object against the prompt's schema.
+
+    Returns:
+        The object with any missing optional fields set to None, or None if
+        it is not a usable parse
+    """
+    if not isinstance(item, dict):
+        return None
+    for field in ("merchant_name", "transaction_type"):
+        if not isinstance(item.get(field), str) or not item[field].strip():
+            return None
+    parsed = {field: item.get(field) for field in PARSE_FIELDS}
+    if any(value is not None and not isinstance(value, str) for value in parsed.values()):
+        return None
+    return parsed
+
+def parse_with_llm(description, model="gemma3", client: Optional[OllamaClient] = None):
+    """Parse a description with the LLM, returning None if the response is unusable."""
+    logger.debug(f"Querying LLM for description: {description}")
+    client = client or get_default_client()
+    response = client.generate_json(create_commbank_prompt(description), model=model, schema=PARSE_SCHEMA)
+
+    parsed_data = validate_parse(response)
+    if parsed_data is not None:
+        logger.debug(f"Successfully parsed JSON response: {parsed_data}")
+        return parsed_data
+
+    logger.warning(f"Failed to parse JSON response for transaction: {description}")
+    logger.warning(f"Raw response: {response}")
+    return None
+
+def create_commbank_batch_prompt(transactions: List[str]) -> str:
+    """Create a prompt asking the LLM to parse several transactions into one JSON array."""
+    numbered = "\n".join(f"{i}. {json.dumps(t)}" for i, t in enumerate(transactions, 1))
+    return f"""Please parse each of the following bank transactions and extract key information in JSON format.
+For every transaction include these fields: merchant_name, transaction_type, location (if present), currency (if present), last_4_card_number (if present), date (if present).
+
+Return only a JSON array with exactly one object per input transaction, in the same order, and no additional text. If a field is not present, use null.
+
+Here is an example:
+
+Inputs:
+1. "EZI*TPC Fitzroy MELBOURNE AU AUS Card xx4321 Value Date: 24/10/2024"
+2. "SP BENCHCLEARERS NEWARK DE USA Card xx1234 USD 55.98 Value Date: 21/10/2024"
+3. "Direct Debit 376681 John Doe PT 155982777"
+4. "International Transaction Fee Value Date: 20/10/2024"
+5. "Transfer To J R Blog PayID Phone from CommBank App Octoberfest"
+Output:
+```json
+[
+    {{"merchant_name": "EZI*TPC", "transaction_type": "Merchant", "location": "Fitzroy MELBOURNE AU AUS", "currency": "AUS", "last_4_card_number": "xx4321", "date": "24/10/2024"}},
+    {{"merchant_name": "SP BENCHCLEARERS", "transaction_type": "Merchant", "location": "NEWARK DE USA", "currency": "USD", "last_4_card_number": "xx1234", "date": "21/10/2024"}},
+    {{"merchant_name": "John Doe PT 155982777", "transaction_type": "Direct Debit", "location": null, "currency": null, "last_4_card_number": null, "date": null}},
+    {{"merchant_name": "International Transaction Fee", "transaction_type": "Fee", "location": null, "currency": null, "last_4_card_number": null, "date": null}},
+    {{"merchant_name": "J R Blog PayID Phone", "transaction_type": "Transfer", "location": null, "currency": null, "last_4_card_number": null, "date": null}}
+]
+```
+
+Now parse these {len(transactions)} transactions:
+Inputs:
+{numbered}
+Output:
+"""
+
+def parse_batch_with_llm(descriptions, model, stats, client: Optional[OllamaClient] = None):
+    """
+    Parse several descriptions with one LLM request, re-splitting on failure.
+
+    A response that isn't an array of the right length, or in which every
+    item fails schema validation, is split in half and each half retried;
+    when only some items fail, each of those is retried once on its own.
+    Halves always shrink and single descriptions (which use the
+    one-transaction prompt) are never retried, so a batch of N costs at
+    most about 2N calls however often the model fails.
+
+    Args:
+        descriptions: Descriptions to parse
+        model: LLM model to use
+        stats: Counter dict updated with llm_calls / llm_resplits
+        client: Ollama client to use (defaults to the shared client)
+
+    Returns:
+        Parsed fields aligned with descriptions, None where no usable parse came back
+    """
+    stats['llm_calls'] += 1
+    if len(descriptions) == 1:
+        try:
+            return [parse_with_llm(descriptions[0], model=model, client=client)]
+        except Exception as e:
+            logger.error(f"Error querying LLM for '{descriptions[0]}': {e}")
+            return [None]
+
+    items = None
+    try:
+        client = client or get_default_client()
+        items = client.generate_json(
+            create_commbank_batch_prompt(descriptions), model=model, schema=BATCH_PARSE_SCHEMA
+        )
+    except Exception as e:
+        logger.error(f"Error querying LLM for batch of {len(descriptions)}: {e}")
+
+    results = None
+    if isinstance(items, list) and len(items) == len(descriptions):
+        results = [validate_parse(item) for item in items]
+
+    if results is None or all(result is None for result in results):
+        logger.warning(f"Unusable batch response for {len(descriptions)} transactions; re-splitting")
+        stats['llm_resplits'] += 1
+        middle = len(descriptions) // 2
+        return (parse_batch_with_llm(descriptions[:middle], model, stats, client) +
+                parse_batch_with_llm(descriptions[middle:], model, stats, client))
+
+    failed = [i for i, result in enumerate(results) if result is None]
+    if failed:
+        logger.warning(f"{len(failed)} of {len(descriptions)} batch items failed validation; retrying them one by one")
+        stats['llm_resplits'] += 1
+        for i in failed:
+            results[i] = parse_batch_with_llm([descriptions[i]], model, stats, client)[0]
+    return results
+
+def parse_without_llm(description, model, db, stats, min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """
+    Try the fixed rules, then the parse cache.
+
+    Returns:
+        Tuple of (parsed fields or None if the LLM is needed, low confidence
+        rule parse to fall back on if the LLM fails)
+    """
+    parsed, rule_fallbacks = parse_many_without_llm([description], model, db, stats, min_confidence)
+    if description in parsed:
+        return parsed[description], None
+    return None, rule_fallbacks[description]
+
+def parse_many_without_llm(descriptions, model, db, stats, min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """
+    Try the fixed rules on each description, then the parse cache in one lookup.
+
+    Returns:
+        Tuple of (parsed fields by description, low confidence rule parse or
+        None by description for those that still need the LLM)
+    """
+    parsed_by_description = {}
+    rule_fallbacks = {}
+    for description in descriptions:
+        rule_parsed, confidence, rule = rule_parse(description)
+        if rule_parsed is not None and confidence >= min_confidence:
+            stats['rules'] += 1
+            logger.debug(f"Parsed with '{rule}' rule ({confidence:.2f}): {description}")
+            parsed_by_description[description] = rule_parsed
+        else:
+            rule_fallbacks[description] = rule_parsed
+
+    keys = {description: normalize_description(description) for description in rule_fallbacks}
+    cached = db.get_cached_parses(list(keys.values()), model, PROMPT_VERSION) if keys else {}
+    for description, key in keys.items():
+        if key not in cached:
+            continue
+        stats['cache_hits'] += 1
+        parsed = dict(cached[key])
+        value_date = VALUE_DATE_PATTERN.search(description)
+        parsed['date'] = value_date.group(1) if value_date else None
+        parsed_by_description[description] = parsed
+        del rule_fallbacks[description]
+
+    return parsed_by_description, rule_fallbacks
+
+def parse_description(description, model, db, stats, min_confidence=DEFAULT_MIN_CONFIDENCE, client=None):
+    """
+    Parse a description, trying the fixed rules and the persistent cache before the LLM.
+
+    Only successful LLM parses are cached, so a transient Ollama failure is
+    retried on the next import rather than pinned to the fallback parse.
+
+    Args:
+        description: Raw CommBank transaction description
+        model: LLM model to use on a cache miss
+        db: FinanceDB holding the llm_parse_cache table
+        stats: Counter dict (see new_parse_stats)
+        min_confidence: Rule parses at or above this confidence skip the LLM
+        client: Ollama client to use on a cache miss
+    """
+    parsed_data, rule_parsed = parse_without_llm(description, model, db, stats, min_confidence)
+    if parsed_data is not None:
+        return parsed_data
+
+    stats['llm_rows'] += 1
+    parsed_data = parse_batch_with_llm([description], model, stats, client)[0]
+    return finish_llm_parse(description, parsed_data, rule_parsed, model, db, stats)
+
+def finish_llm_parse(description, parsed_data, rule_parsed, model, db, stats):
+    """Cache a successful LLM parse, or pick the best fallback for a failed one."""
+    if parsed_data is None:
+        stats['llm_failures'] += 1
+        # A low confidence rule parse still beats the raw-description fallback
+        return rule_parsed if rule_parsed is not None else default_parse(description)
+
+    db.cache_parse(normalize_description(description), model, PROMPT_VERSION, parsed_data)
+    return parsed_data
+
+class CommBankLoader(StatementLoader):
+    """
+    CommBank statements on the shared ingestion core, with LLM description parsing.
+
+    Each distinct description in a batch is parsed once: by the fixed rules,
+    the parse cache or the merchant index where possible, otherwise by up to
+    `workers` parallel LLM requests (set OLLAMA_NUM_PARALLEL on the server
+    to match).
+    """
+
+    source = "commbank"
+    # CommBank CSV files often don't have headers: Date, Amount, Description, Balance
+    mapping = ColumnMapping(date=0, amount=1, description=2, balance=3)
+
+    def __init__(
+        self, db, model="gemma3", min_confidence=DEFAULT_MIN_CONFIDENCE,
+        workers=DEFAULT_LLM_WORKERS, batch_size=100, llm_batch_size=1,
+        use_merchant_index=True, index_threshold=DEFAULT_SIMILARITY_THRESHOLD,
+        llm_client: Optional[OllamaClient] = None
+    ):
+        """
+        Initialize the loader.
+
+        Args:
+            db: FinanceDB to insert into
+            model: LLM model for descriptions the rules and cache can't handle
+            min_confidence: Rule parses below this confidence go to the LLM
+            workers: Maximum concurrent LLM requests
+            batch_size: Rows deduped, parsed and committed together
+            llm_batch_size: Descriptions sent per LLM prompt (1 uses the single
+                            transaction prompt)
+            use_merchant_index: Reuse the merchant of similar, already-parsed
+                                descriptions instead of asking the LLM
+            index_threshold: Cosine similarity needed for a merchant index match
+            llm_client: Ollama client; by default one with a connection per worker
+        """
+        super().__init__(db, batch_size=batch_size)
+        self.model = model
+        self.min_confidence = min_confidence
+        self.workers = max(1, workers)
+        self.llm_batch_size = max(1, llm_batch_size)
+        self.merchant_index = MerchantIndex.load(db, index_threshold) if use_merchant_index else None
+        self.llm_client = llm_client or OllamaClient(pool_size=self.workers)
+        self.executor = None
+
+        self.stats['llm_seconds'] = 0.0
+        self.parse_stats = new_parse_stats()
+
+    def load_rows(
+        self, rows: Iterable[Tuple[int, List[str]]],
+        on_batch: Optional[Callable[[dict, int], None]] = None
+    ) -> dict:
+        """See StatementLoader.load_rows; the result also carries the parse stats."""
+        stats = super().load_rows(rows, on_batch=on_batch)
+
+        if self.merchant_index is not None and stats['inserted']:
+            with self.timed('index_update'):
+                self.merchant_index.refresh()
+                self.merchant_index.save()
+            # Keep the total in step with the stages, index update included
+            stats['seconds'] += self.stage_seconds['index_update']
+            self.stats['seconds'] = stats['seconds']
+        return {**stats, **self.parse_stats}
+
+    @contextmanager
+    def parsing_session(self):
+        """Keep one pool of LLM workers for every batch parsed in the session."""
+        with ThreadPoolExecutor(max_workers=self.workers) as self.executor:
+            try:
+                yield
+            finally:
+                self.executor = None
+
+    @property
+    def parser_version(self):
+        """Prompt and model behind LLM parses; rule and cache parses share it."""
+        return commbank_parser_version(self.model)
+
+    def signed_amounts(self, raw_amounts):
+        # CommBank CSV typically has amounts with + or - prefix; if no sign,
+        # assume it's an expense
+        unsigned = ~raw_amounts.str[:1].isin(['+', '-']) & (raw_amounts.fillna('') != '')
+        return raw_amounts.where(~unsigned, '-' + raw_amounts)
+
+    def hash_amounts(self, raw_amounts, amounts):
+        # Hash the amount as exported, matching rows loaded before the shared core
+        return raw_amounts
+
+    def parse_descriptions(self, descriptions) -> dict:
+        """Parse descriptions with rules, cache and the merchant index first, then LLM batches run concurrently."""
+        parse_stats = self.parse_stats
+        parsed_by_description, rule_fallbacks = parse_many_without_llm(
+            descriptions, self.model, self.db, parse_stats, self.min_confidence
+        )
+
+        # Reuse the merchant of a close enough, already-parsed description
+        if self.merchant_index is not None and rule_fallbacks:
+            candidates = list(rule_fallbacks)
+            for description, match in zip(candidates, self.merchant_index.lookup_many(candidates)):
+                if match is None:
+                    continue
+                merchant_name, transaction_type, similarity = match
+                logger.debug(f"Matched '{description}' to {merchant_name} ({similarity:.2f})")
+                parsed = dict(rule_fallbacks.pop(description) or default_parse(description))
+                parsed.update(merchant_name=merchant_name, transaction_type=transaction_type)
+                parsed_by_description[description] = parsed
+                parse_stats['index_hits'] += 1
+
+        pending = list(rule_fallbacks)
+        if not pending:
+            return parsed_by_description
+
+        batches = [pending[i:i + self.llm_batch_size] for i in range(0, len(pending), self.llm_batch_size)]
+        parse_stats['llm_rows'] += len(pending)
+        # Load the model once up front rather than inside the first timed request
+        self.llm_client.warm_up(self.model)
+
+        def parse_batch(batch):
+            local_stats = dict.fromkeys(parse_stats, 0)
+            try:
+                results = parse_batch_with_llm(batch, self.model, local_stats, self.llm_client)
+            except Exception as e:
+                # Never let one bad batch hold up the rest of the file
+                logger.error(f"Error parsing batch starting '{batch[0]}': {e}")
+                results = [None] * len(batch)
+            return results, local_stats
+
+        llm_started = time.perf_counter()
+        mapper = self.executor.map if self.executor is not None else map
+        for batch, (results, local_stats) in zip(batches, mapper(parse_batch, batches)):
+            for key, count in local_stats.items():
+                parse_stats[key] += count
+            for description, parsed in zip(batch, results):
+                if parsed is None:
+                    self.parse_failures.add(description)
+                parsed_by_description[description] = finish_llm_parse(
+                    description, parsed, rule_fallbacks[description], self.model, self.db, parse_stats
+                )
+        self.stats['llm_seconds'] += time.perf_counter() - llm_started
+        return parsed_by_description
+
+    def log_summary(self):
+        super().log_summary()
+        stats, parse_stats = self.stats, self.parse_stats
+        total_parses = sum(parse_stats[k] for k in ('rules', 'cache_hits', 'index_hits', 'llm_rows'))
+        bypass_rate = (total_parses - parse_stats['llm_rows']) / total_parses if total_parses else 0
+        logger.info(f"Description parses: {parse_stats['rules']} by rules, {parse_stats['cache_hits']} from cache, "
+                    f"{parse_stats['index_hits']} from similar merchants, "
+                    f"{parse_stats['llm_rows']} by LLM ({parse_stats['llm_failures']} failed); "
+                    f"LLM bypass rate {bypass_rate:.0%}")
+        if parse_stats['llm_rows']:
+            llm_seconds = stats['llm_seconds']
+            logger.info(f"LLM: batch size {self.llm_batch_size}, {parse_stats['llm_calls']} requests "
+                        f"({parse_stats['llm_resplits']} re-splits) for {parse_stats['llm_rows']} rows, "
+                        f"{llm_seconds:.1f}s, {parse_stats['llm_rows'] / llm_seconds if llm_seconds else 0:.2f} rows/s, "
+                        f"{parse_stats['llm_rows'] / parse_stats['llm_calls']:.1f} rows per request")
+            metrics = self.llm_client.metrics_summary()
+            if metrics['calls']:
+                logger.info(f"Ollama: {metrics['calls']} calls ({metrics['errors']} errors), "
+                            f"latency p50 {metrics['latency_p50']:.2f}s / p90 {metrics['latency_p90']:.2f}s, "
+                            f"{metrics['eval_tokens_per_second'] or 0:.1f} output tokens/s, "
+                            f"{metrics['load_seconds']:.1f}s loading the model")
+
+def process_commbank_transactions_file(
+    file_path, db_path, model="gemma3", min_confidence=DEFAULT_MIN_CONFIDENCE,
+    workers=DEFAULT_LLM_WORKERS, batch_size=100, llm_batch_size=1,
+    use_merchant_index=True, index_threshold=DEFAULT_SIMILARITY_THRESHOLD
+):
+    """
+    Process a Commonwealth Bank transactions CSV file and insert into database.
+
+    The file is streamed through CommBankLoader a batch at a time; see it
+    for the meaning of the tuning arguments.
+    """
     logger.info(f"Starting CommBank transaction processing")
     logger.info(f"Processing file: {file_path}")
     logger.info(f"Using database: {db_path}")
-    logger.info(f"Using model: {model}")
+    logger.info(f"Using model: {model} ({workers} workers, {llm_batch_size} per prompt)")
     
     # Initialize database
     db = FinanceDB(db_path)
+    loader = CommBankLoader(
+        db, model=model, min_confidence=min_confidence, workers=workers,
+        batch_size=batch_size, llm_batch_size=llm_batch_size,
+        use_merchant_index=use_merchant_index, index_threshold=index_threshold
+    )
     
-    # Read and process the CSV file
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            rows = list(reader)
-            logger.info(f"Successfully read CSV file with {len(rows)} rows")
+        stats = loader.load_file(file_path)
     except Exception as e:
         logger.error(f"Failed to read CSV file: {e}")
         return False
     
-    successful_inserts = 0
-    skipped_rows = 0
-    failed_inserts = 0
-    
-    # CommBank CSV files often don't have headers, so we'll define our own
-    expected_headers = ["Date", "Amount", "Description", "Balance"]
-    
-    # Check if the first row looks like a header (contains "Date" or similar)
-    first_row_is_header = False
-    if rows and len(rows) > 0:
-        first_row = rows[0]
-        if len(first_row) >= 4 and any(cell.lower() == "date" for cell in first_row):
-            first_row_is_header = True
-            logger.info(f"Detected header row: {first_row}")
-        else:
-            logger.info(f"No header row detected. Using expected headers: {expected_headers}")
-            logger.info(f"First data row: {rows[0] if rows else 'No data'}")
-    
-    # Process transactions
-    start_index = 1 if first_row_is_header else 0
-    
-    for row_index, row in enumerate(tqdm(rows[start_index:], desc="Processing transactions")):
-        actual_row_index = row_index + start_index
-        if len(row) >= 4:  # Ensure row has enough columns
-            try:
-                date = row[0]
-                amount = row[1]
-                description = row[2]
-                balance = row[3]
-                
-                # Skip rows without proper data
-                if not date or not amount:
-                    logger.debug(f"Skipping row {actual_row_index+1}: Incomplete data")
-                    skipped_rows += 1
-                    continue
-                
-                logger.debug(f"Processing row {actual_row_index+1}: Date={date}, Description={description}, Amount={amount}, Balance={balance}")
-                
-                # Format the date properly if it's in DD/MM/YYYY format
-                original_date = date
-                if '/' in date:
-                    try:
-                        date_parts = date.split('/')
-                        if len(date_parts) == 3:
-                            # Convert from DD/MM/YYYY to YYYY-MM-DD
-                            date = f"{date_parts[2]}-{date_parts[1]}-{date_parts[0]}"
-                            logger.debug(f"Converted date from {original_date} to {date}")
-                    except Exception as e:
-                        logger.warning(f"Failed to parse date {date}: {e}")
-                
-                # Ensure amount is properly formatted
-                original_amount = amount
-                # CommBank CSV typically has amounts with + or - prefix
-                # Make sure the amount is stored as a numeric string with the sign
-                if amount and not amount.startswith('+') and not amount.startswith('-'):
-                    # If no sign, assume it's negative (expense)
-                    amount = f"-{amount}"
-                    logger.debug(f"Added negative sign to amount: {original_amount} -> {amount}")
-                
-                # Calculate hash for deduplication
-                row_hash = calculate_row_hash(date, description, amount)
-                logger.debug(f"Generated hash: {row_hash}")
-                
-                # Check if transaction already exists
-                if db.transaction_exists(row_hash):
-                    logger.info(f"Transaction already exists (hash: {row_hash}): {date} | {description} | {amount}")
-                    skipped_rows += 1
-                    continue
-                
-                # Create prompt for LLM
-                logger.debug(f"Creating LLM prompt for description: {description}")
-                prompt = create_commbank_prompt(description)
-                    # Query LLM with retry
-                try:
-                    logger.debug(f"Querying LLM for description: {description}")
-                    response = query_ollama_with_retry(prompt, model=model)
-                    logger.debug(f"LLM response received: {response[:100]}...")
-                    
-                    # Parse response
-                    if is_valid_json(response):
-                        parsed_data = parse_json_response(response)
-                        logger.debug(f"Successfully parsed JSON response: {parsed_data}")
-                    else:
-                        logger.warning(f"Failed to parse JSON response for transaction: {description}")
-                        logger.warning(f"Raw response: {response}")
-                        # Use a default parsing for failed responses
-                        parsed_data = {
-                            "merchant_name": description[:50] if description else "Unknown",
-                            "transaction_type": "Unknown",
-                            "location": None,
-                            "currency": None,
-                            "last_4_card_number": None,
-                            "date": None
-                        }
-                        logger.debug(f"Using default parsing: {parsed_data}")
-                except Exception as e:
-                    logger.error(f"Error querying LLM for '{description}': {e}")
-                    # Use a default parsing for exceptions
-                    parsed_data = {
-                        "merchant_name": description[:50] if description else "Unknown",
-                        "transaction_type": "Unknown",
-                        "location": None,
-                        "currency": None,
-                        "last_4_card_number": None,
-                        "date": None
-                    }
-                    logger.debug(f"Using default parsing due to error: {parsed_data}")
-            
-                # Always use the date from the CSV file, not from the description
-                # Create transaction data dictionary
-                transaction_data = {
-                    "date": date,
-                    "amount": amount,
-                    "balance": balance,
-                    "original_description": description,
-                    "merchant_name": parsed_data.get('merchant_name'),
-                    "transaction_type": parsed_data.get('transaction_type'),
-                    "location": parsed_data.get('location'),
-                    "currency": parsed_data.get('currency'),
-                    "last_4_card_number": parsed_data.get('last_4_card_number'),
-                    "hash": row_hash,
-                    "source": "commbank"
-                }
-                
-                logger.debug(f"Transaction data prepared: {transaction_data}")
-                
-                # Insert into database
-                try:
-                    success = db.insert_transaction(transaction_data, row_hash)
-                    if success:
-                        logger.debug(f"Successfully inserted transaction: {date} | {parsed_data.get('merchant_name')} | {amount}")
-                        successful_inserts += 1
-                    else:
-                        # Check if it's a duplicate transaction
-                        if db.transaction_exists(row_hash):
-                            logger.info(f"Transaction already exists (hash: {row_hash}): {date} | {description} | {amount}")
-                            skipped_rows += 1
-                        else:
-                            logger.warning(f"Failed to insert transaction: {date} | {parsed_data.get('merchant_name')} | {amount}")
-                            failed_inserts += 1
-                except Exception as e:
-                    logger.error(f"Database error inserting transaction: {e}")
-                    logger.error(f"Transaction data: {transaction_data}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-                    failed_inserts += 1
-                    
-            except Exception as e:
-                logger.error(f"Error processing row {actual_row_index+1}: {e}")
-                logger.error(f"Row data: {row}")
-                import traceback
-                logger.error(traceback.format_exc())
-                failed_inserts += 1
+    return stats['inserted'] > 0
+
+def stub_llm_response(prompt):
+    """
+    Answer a CommBank single or batch prompt without a model, for dry runs.
+
+    Descriptions are parsed with the fixed rules whatever their confidence,
+    falling back to the raw-description parse.
+    """
+    if 'Now parse these' in prompt:
+        inputs = prompt.rsplit('Inputs:\n', 1)[1].rsplit('\nOutput:', 1)[0]
+        descriptions = [json.loads(d) for d in re.findall(r'^\d+\. (".*")$', inputs, re.MULTILINE)]
+    else:
+        descriptions = [re.search(r'Input: "(.*)"\nOutput:', prompt, re.DOTALL).group(1)]
+
+    items = []
+    for description in descriptions:
+        parsed = rule_parse(description)[0] or default_parse(description)
+        parsed["merchant_name"] = parsed["merchant_name"] or "Unknown"
+        items.append(parsed)
+    return json.dumps(items if 'Now parse these' in prompt else items[0])
+
+def profile_commbank_file(
+    file_path, db_path, dry_run=True, stub_latency=None, **loader_kwargs
+):
+    """
+    Run the loader over a file and report where the time went.
+
+    Args:
+        file_path: CommBank CSV to load
+        db_path: Database to load into; with dry_run it is only copied
+        dry_run: Load into a scratch copy of db_path (or an empty database
+                 if it doesn't exist) that is deleted afterwards
+        stub_latency: If set, answer LLM prompts locally after this many
+                      seconds instead of calling Ollama (dry runs only, so
+                      stub parses never reach real transactions or the
+                      parse cache)
+        **loader_kwargs: Passed to CommBankLoader
+
+    Returns:
+        Profile report (see print_profile)
+    """
+    if stub_latency is not None and not dry_run:
+        raise ValueError("A stubbed LLM can only be used for a dry run")
+
+    scratch_dir = tempfile.mkdtemp(prefix="commbank-dry-run-") if dry_run else None
+    try:
+        if dry_run:
+            target_path = os.path.join(scratch_dir, "finance.db")
+            if os.path.exists(db_path):
+                # Copying keeps dedupe, cache and merchant index hits realistic
+                with sqlite3.connect(db_path) as source, sqlite3.connect(target_path) as target:
+                    source.backup(target)
+            logger.info(f"Dry run: loading into scratch database {target_path}")
         else:
-            logger.warning(f"Row {actual_row_index+1} has insufficient columns: {row}")
-            skipped_rows += 1
-    
-    logger.info(f"Processing complete. Transactions added to database: {successful_inserts}")
-    logger.info(f"Skipped rows: {skipped_rows}")
-    logger.info(f"Failed inserts: {failed_inserts}")
-    
-    return successful_inserts > 0
+            target_path = db_path
+
+        if stub_latency is not None:
+            loader_kwargs['llm_client'] = StubOllamaClient(stub_llm_response, latency=stub_latency)
+
+        setup_started = time.perf_counter()
+        loader = CommBankLoader(FinanceDB(target_path), **loader_kwargs)
+        setup_seconds = time.perf_counter() - setup_started
+
+        stats = loader.load_file(file_path)
+        return build_profile(loader, stats, setup_seconds, dry_run=dry_run, stub_llm=stub_latency is not None)
+    finally:
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def build_profile(loader, stats, setup_seconds, dry_run, stub_llm):
+    """Collect stage timings, throughput, LLM latency and parse hit rates from a finished load."""
+    rows = stats['rows']
+    total_seconds = stats['seconds'] + setup_seconds
+
+    stage_seconds = {'setup': setup_seconds, **loader.stage_seconds}
+    # LLM time is spent inside the parse stage; report it as its own line
+    stage_seconds['llm'] = stats['llm_seconds']
+    stage_seconds['parse'] = max(0.0, stage_seconds['parse'] - stats['llm_seconds'])
+    # Batching, progress reporting and callbacks between the timed stages
+    stage_seconds['other'] = max(0.0, total_seconds - sum(stage_seconds.values()))
+    stages = {
+        stage: {
+            'seconds': seconds,
+            'share': seconds / total_seconds if total_seconds else 0.0,
+            'rows_per_second': rows / seconds if seconds else None,
+        }
+        for stage, seconds in stage_seconds.items()
+    }
+
+    parse_counts = {key: stats[key] for key in ('rules', 'cache_hits', 'index_hits', 'llm_rows')}
+    parsed_total = sum(parse_counts.values())
+    parsing = {
+        **parse_counts,
+        **{f"{key}_rate": count / parsed_total if parsed_total else 0.0 for key, count in parse_counts.items()},
+        'llm_bypass_rate': (parsed_total - parse_counts['llm_rows']) / parsed_total if parsed_total else 0.0,
+        'llm_failures': stats['llm_failures'],
+    }
+
+    return {
+        'config': {
+            'model': loader.model, 'workers': loader.workers, 'batch_size': loader.batch_size,
+            'llm_batch_size': loader.llm_batch_size, 'merchant_index': loader.merchant_index is not None,
+            'dry_run': dry_run, 'stub_llm': stub_llm,
+        },
+        'rows': rows,
+        'inserted': stats['inserted'],
+        'skipped': stats['skipped'],
+        'failed': stats['failed'],
+        'seconds': total_seconds,
+        'rows_per_second': rows / total_seconds if total_seconds else None,
+        'stages': stages,
+        'parsing': parsing,
+        'llm': {
+            'requests': stats['llm_calls'],
+            'resplits': stats['llm_resplits'],
+            **loader.llm_client.metrics_summary(),
+        },
+    }
+
+def print_profile(report):
+    """Print a profile report as tables."""
+    print(f"\n=== Load profile: {report['rows']} rows in {report['seconds']:.2f}s "
+          f"({report['rows_per_second'] or 0:.0f} rows/s) ===")
+    print(f"Inserted {report['inserted']}, skipped {report['skipped']}, failed {report['failed']}")
+    print(f"\n{'stage':<14}{'seconds':>10}{'share':>8}{'rows/s':>12}")
+    for stage, timing in report['stages'].items():
+        rate = f"{timing['rows_per_second']:.0f}" if timing['rows_per_second'] else '-'
+        print(f"{stage:<14}{timing['seconds']:>10.3f}{timing['share']:>8.1%}{rate:>12}")
+
+    parsing = report['parsing']
+    print(f"\n{'parsed by':<14}{'rows':>10}{'rate':>8}")
+    for key in ('rules', 'cache_hits', 'index_hits', 'llm_rows'):
+        print(f"{key:<14}{parsing[key]:>10}{parsing[key + '_rate']:>8.1%}")
+    print(f"LLM bypass rate {parsing['llm_bypass_rate']:.1%}, {parsing['llm_failures']} LLM failures")
+
+    llm = report['llm']
+    if llm.get('calls'):
+        print(f"\nLLM: {llm['requests']} prompts ({llm['resplits']} re-splits), {llm['calls']} calls, {llm['errors']} errors")
+        print(f"latency p50 {llm['latency_p50']:.3f}s  p90 {llm['latency_p90']:.3f}s  "
+              f"p99 {llm['latency_p99']:.3f}s  max {llm['latency_max']:.3f}s")
+        if llm['eval_tokens_per_second']:
+            print(f"{llm['eval_tokens_per_second']:.1f} output tokens/s, {llm['load_seconds']:.1f}s loading the model")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input-file", "-i", help="Input file path", type=str, required=True)
     parser.add_argument("--db-path", "-d", help="Database path", type=str, default="data/finance-stag.db")
     parser.add_argument("--model", "-m", help="LLM model to use", type=str, default="gemma3")
+    parser.add_argument("--workers", "-w", help="Concurrent LLM requests", type=int, default=DEFAULT_LLM_WORKERS)
+    parser.add_argument("--batch-size", "-b", help="Rows parsed and committed together", type=int, default=100)
+    parser.add_argument("--llm-batch-size", help="Transactions per LLM prompt", type=int, default=1)
+    parser.add_argument("--no-merchant-index", help="Don't reuse merchants of similar descriptions", action="store_true")
+    parser.add_argument("--index-threshold", help="Similarity needed to reuse a merchant", type=float, default=DEFAULT_SIMILARITY_THRESHOLD)
+    parser.add_argument("--min-confidence", help="Rule parses below this confidence go to the LLM", type=float, default=DEFAULT_MIN_CONFIDENCE)
     parser.add_argument("--verbose", "-v", help="Enable verbose logging", action="store_true")
+    parser.add_argument("--dry-run", help="Load into a scratch copy of the database instead", action="store_true")
+    parser.add_argument("--profile", help="Report per-stage timings, LLM latency and parse hit rates", action="store_true")
+    parser.add_argument("--profile-json", help="Also write the profile report to this JSON file", type=str)
+    parser.add_argument("--stub-llm", help="Answer LLM prompts locally instead of calling Ollama (implies --dry-run)", action="store_true")
+    parser.add_argument("--stub-latency", help="Simulated seconds per stubbed LLM call", type=float, default=0.0)
     args = parser.parse_args()
     
     # Set debug level if verbose flag is provided
@@ -357,4 +768,28 @@ if __name__ == "__main__":
         logger.setLevel(logging.DEBUG)
         logger.debug("Debug logging enabled")
     
-    process_commbank_transactions_file(args.input_file, args.db_path, model=args.model)
\ No newline at end of file
+    if args.stub_llm and not args.dry_run:
+        # Stub parses would otherwise be stored and cached as real ones
+        logger.info("--stub-llm implies --dry-run")
+        args.dry_run = True
+
+    if args.dry_run or args.profile or args.stub_llm:
+        report = profile_commbank_file(
+            args.input_file, args.db_path, dry_run=args.dry_run,
+            stub_latency=args.stub_latency if args.stub_llm else None,
+            model=args.model, min_confidence=args.min_confidence, workers=args.workers,
+            batch_size=args.batch_size, llm_batch_size=args.llm_batch_size,
+            use_merchant_index=not args.no_merchant_index, index_threshold=args.index_threshold
+        )
+        if args.profile:
+            print_profile(report)
+            print(json.dumps(report, indent=2))
+        if args.profile_json:
+            with open(args.profile_json, 'w') as f:
+                json.dump(report, f, indent=2)
+    else:
+        process_commbank_transactions_file(args.input_file, args.db_path, model=args.model, min_confidence=args.min_confidence,
+                                           workers=args.workers, batch_size=args.batch_size,
+                                           llm_batch_size=args.llm_batch_size,
+                                           use_merchant_index=not args.no_merchant_index,
+                                           index_threshold=args.index_threshold)
\ No newline at end of file
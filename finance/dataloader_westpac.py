@@ -0,0 +1,101 @@
+import re
+import os
+import sys
+import logging
+import argparse
+from typing import Dict, List
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finance.db import FinanceDB
+from finance.statement_loader import StatementLoader, ColumnMapping, plain_description
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Westpac narratives start with a fixed prefix naming the kind of transaction;
+# the first match wins, and the rest of the narrative names the other party
+NARRATIVE_RULES = [
+    (re.compile(r'^(?:DEBIT CARD PURCHASE|EFTPOS PURCHASE|CARD PURCHASE)\s+', re.IGNORECASE), "Merchant"),
+    (re.compile(r'^(?:WITHDRAWAL|DEPOSIT)[- ](?:OSKO PAYMENT|ONLINE|MOBILE)\s+\d*\s*(?:TFR|PYMT|PAYMENT)?\s*', re.IGNORECASE), "Transfer"),
+    (re.compile(r'^DIRECT DEBIT\s+', re.IGNORECASE), "Direct Debit"),
+    (re.compile(r'^DEPOSIT\s+', re.IGNORECASE), "Deposit"),
+    (re.compile(r'^WITHDRAWAL\s+', re.IGNORECASE), "Withdrawal"),
+]
+FEE_PATTERN = re.compile(r'\bFEE\b', re.IGNORECASE)
+INTEREST_PATTERN = re.compile(r'^INTEREST\b', re.IGNORECASE)
+# Trailing "MELBOURNE AUS" style location on card purchases
+LOCATION_SUFFIX = re.compile(r'\s+(?P<location>[A-Z][A-Z ]*?\s+(?:AU|AUS))$')
+CARD_REFERENCE = re.compile(r'\s+\d{4,}\b')
+
+
+def parse_narrative(narrative: str) -> dict:
+    """Split a Westpac narrative into merchant fields."""
+    text = ' '.join(narrative.split())
+    parsed = plain_description(text)
+
+    if INTEREST_PATTERN.match(text):
+        parsed.update(merchant_name=text, transaction_type="Interest")
+        return parsed
+    if FEE_PATTERN.search(text):
+        parsed.update(merchant_name=text, transaction_type="Fee")
+        return parsed
+
+    for pattern, transaction_type in NARRATIVE_RULES:
+        match = pattern.match(text)
+        if not match:
+            continue
+        body = text[match.end():] or text
+        if transaction_type == "Merchant":
+            location = LOCATION_SUFFIX.search(body)
+            if location:
+                parsed['location'] = location.group('location')
+                body = body[:location.start()]
+            body = CARD_REFERENCE.sub('', body)
+        parsed.update(merchant_name=body.strip()[:50] or text, transaction_type=transaction_type)
+        return parsed
+
+    return parsed
+
+
+class WestpacLoader(StatementLoader):
+    """Westpac CSV exports (Bank Account, Date, Narrative, Debit Amount, Credit Amount, Balance, ...)."""
+
+    source = "westpac"
+    parser_version = "westpac-rules-1"
+    mapping = ColumnMapping(
+        date="Date", description="Narrative", debit="Debit Amount",
+        credit="Credit Amount", balance="Balance"
+    )
+
+    def parse_descriptions(self, descriptions: List[str]) -> Dict[str, dict]:
+        return {description: parse_narrative(description) for description in descriptions}
+
+
+def process_westpac_transactions_file(file_path, db_path, batch_size=1000):
+    """Process a Westpac transactions CSV file and insert into database."""
+    logger.info(f"Processing file: {file_path}")
+    logger.info(f"Using database: {db_path}")
+
+    loader = WestpacLoader(FinanceDB(db_path), batch_size=batch_size)
+    try:
+        stats = loader.load_file(file_path)
+    except Exception as e:
+        logger.error(f"Failed to read CSV file: {e}")
+        return False
+
+    return stats['inserted'] > 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input-file", "-i", help="Input file path", type=str, required=True)
+    parser.add_argument("--db-path", "-d", help="Database path", type=str, default="data/finance-stag.db")
+    parser.add_argument("--batch-size", "-b", help="Rows committed together", type=int, default=1000)
+    args = parser.parse_args()
+
+    process_westpac_transactions_file(args.input_file, args.db_path, batch_size=args.batch_size)
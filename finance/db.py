@@ -1,12 +1,86 @@
 import sqlite3
 import hashlib
+import json
 import logging
 from datetime import datetime
 from contextlib import contextmanager
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import pandas as pd
 import os
 
+from .up_models import UP_TRANSACTION_COLUMNS, SyncTelemetry
+
+TRANSACTION_INSERT_SQL = '''
+INSERT OR IGNORE INTO transactions (
+    date, amount, balance, original_description,
+    merchant_name, transaction_type, location,
+    currency, last_4_card_number, hash, source, parser_version
+) VALUES (
+    :date, :amount, :balance, :original_description,
+    :merchant_name, :transaction_type, :location,
+    :currency, :last_4_card_number, :hash, :source, :parser_version
+)
+'''
+
+TRANSACTION_REPARSE_SQL = '''
+UPDATE transactions SET
+    merchant_name = :merchant_name,
+    transaction_type = :transaction_type,
+    location = :location,
+    currency = :currency,
+    last_4_card_number = :last_4_card_number,
+    parser_version = :parser_version
+WHERE id = :id
+'''
+
+# Fields Up can change after a transaction is first seen (a HELD transaction
+# settles, gets its final amount, or is recategorised)
+UP_TRANSACTION_MUTABLE_COLUMNS = (
+    "status", "raw_text", "description", "message", "amount",
+    "foreign_amount", "foreign_currency", "category_id", "parent_category_id",
+    "settled_at"
+)
+
+# Inserts new transactions and refreshes stored ones; unchanged re-fetches
+# are left alone so they don't count as changes
+UP_TRANSACTION_INSERT_SQL = f'''
+INSERT INTO up_transactions ({', '.join(UP_TRANSACTION_COLUMNS)})
+VALUES ({', '.join('?' * len(UP_TRANSACTION_COLUMNS))})
+ON CONFLICT(id) DO UPDATE SET
+    {', '.join(f'{c} = excluded.{c}' for c in UP_TRANSACTION_MUTABLE_COLUMNS)},
+    synced_at = CURRENT_TIMESTAMP
+WHERE {' OR '.join(f'up_transactions.{c} IS NOT excluded.{c}' for c in UP_TRANSACTION_MUTABLE_COLUMNS)}
+'''
+
+UP_ACCOUNT_UPSERT_SQL = '''
+INSERT INTO up_accounts (
+    id, display_name, account_type, ownership_type,
+    current_balance, currency_code, created_at, last_synced_at
+) VALUES (
+    :id, :display_name, :account_type, :ownership_type,
+    :current_balance, :currency_code, :created_at, :last_synced_at
+)
+ON CONFLICT(id) DO UPDATE SET
+    display_name = excluded.display_name,
+    current_balance = excluded.current_balance,
+    last_synced_at = excluded.last_synced_at
+'''
+
+UP_CATEGORY_UPSERT_SQL = '''
+INSERT INTO up_categories (id, name, parent_id, last_synced_at)
+VALUES (:id, :name, :parent_id, :last_synced_at)
+ON CONFLICT(id) DO UPDATE SET
+    name = excluded.name,
+    parent_id = excluded.parent_id,
+    last_synced_at = excluded.last_synced_at
+'''
+
+BALANCE_SNAPSHOT_INSERT_SQL = '''
+INSERT OR REPLACE INTO balance_snapshots
+    (account_id, balance, snapshot_date, snapshot_type)
+VALUES (?, ?, ?, ?)
+'''
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -72,8 +146,104 @@ class FinanceDB:
                 source TEXT NOT NULL
             )
             ''')
+
+            # Cache of LLM description parses, so repeat merchants skip inference
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_parse_cache (
+                description_key TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                parsed_json TEXT NOT NULL,
+                hits INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (description_key, model, prompt_version)
+            )
+            ''')
+
+            # Statement uploads processed by the background job worker
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS upload_jobs (
+                id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                filename TEXT,
+                file_path TEXT NOT NULL,
+                target_db_path TEXT NOT NULL,
+                model TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                estimated_rows INTEGER,
+                rows_read INTEGER DEFAULT 0,
+                rows_inserted INTEGER DEFAULT 0,
+                rows_skipped INTEGER DEFAULT 0,
+                rows_failed INTEGER DEFAULT 0,
+                last_row_committed INTEGER DEFAULT 0,
+                rows_per_second REAL,
+                error_message TEXT,
+                attempts INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+
+            # Re-parses of historical transactions with the current parser
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS reparse_jobs (
+                id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                model TEXT,
+                parser_version TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                total_rows INTEGER,
+                rows_done INTEGER DEFAULT 0,
+                rows_updated INTEGER DEFAULT 0,
+                rows_failed INTEGER DEFAULT 0,
+                merchants_renamed INTEGER DEFAULT 0,
+                last_transaction_id INTEGER DEFAULT 0,
+                rows_per_second REAL,
+                error_message TEXT,
+                attempts INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+
+            # Category suggestions for uncategorised merchants from the categoriser
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS merchant_category_suggestions (
+                merchant_name TEXT PRIMARY KEY,
+                category_id INTEGER NOT NULL,
+                confidence REAL NOT NULL,
+                nearest_merchant TEXT,
+                similarity REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+
+            # Daily ETF price bars, kept so analyses only fetch bars after the last stored date
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS etf_prices (
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL NOT NULL,
+                volume REAL,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (symbol, date)
+            )
+            ''')
             conn.commit()
 
+        # Parser (prompt/model) that produced each row's parsed fields; NULL
+        # for rows loaded before versions were recorded or whose parse failed
+        self._ensure_columns('transactions', {'parser_version': 'TEXT'})
+        self._ensure_columns('reparse_jobs', {'merchants_renamed': 'INTEGER DEFAULT 0'})
+
     def _initialize_up_tables(self):
         """Create Up Bank specific tables."""
         with self._get_connection() as conn:
@@ -155,8 +325,56 @@ class FinanceDB:
             )
             ''')
 
+            # Per-account fingerprints used to skip unchanged accounts
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS up_sync_state (
+                account_id TEXT PRIMARY KEY,
+                synced_balance REAL,
+                last_activity_at TIMESTAMP,
+                last_checked_at TIMESTAMP,
+                FOREIGN KEY (account_id) REFERENCES up_accounts(id)
+            )
+            ''')
+
+            # Pagination checkpoints so interrupted transaction syncs can resume
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS up_sync_checkpoints (
+                account_id TEXT PRIMARY KEY,
+                cursor TEXT,
+                since_at TIMESTAMP,
+                watermark TIMESTAMP,
+                pages_committed INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (account_id) REFERENCES up_accounts(id)
+            )
+            ''')
+
+            conn.commit()
+
+        # Per-phase timings added to sync_metadata after it first shipped
+        self._ensure_columns('sync_metadata', {
+            'http_seconds': 'REAL',
+            'rate_limit_sleep_seconds': 'REAL',
+            'parse_seconds': 'REAL',
+            'db_seconds': 'REAL',
+            'pages': 'INTEGER',
+            'requests': 'INTEGER',
+            'retries': 'INTEGER',
+            'max_request_seconds': 'REAL',
+        })
+        logger.info("Up Bank tables initialized")
+
+    def _ensure_columns(self, table: str, columns: Dict[str, str]):
+        """Add any missing columns to an existing table."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"PRAGMA table_info({table})")
+            existing = {row[1] for row in cursor.fetchall()}
+            for name, column_type in columns.items():
+                if name not in existing:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+                    logger.info(f"Added column {table}.{name}")
             conn.commit()
-            logger.info("Up Bank tables initialized")
     
     def _create_indexes(self):
         with self._get_connection() as conn:
@@ -165,6 +383,7 @@ class FinanceDB:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_merchant_name ON transactions (merchant_name);")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_date ON transactions (date);")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_amount ON transactions (amount);")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_source_parser_version ON transactions (source, parser_version);")
             # Up transaction indexes
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_up_tx_account ON up_transactions (account_id);")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_up_tx_date ON up_transactions (created_at);")
@@ -214,6 +433,49 @@ class FinanceDB:
             logger.error(traceback.format_exc())
             return False
     
+    def insert_transactions(self, transactions: List[Dict[str, Any]]) -> int:
+        """
+        Insert a batch of transactions in one database transaction.
+
+        Rows whose hash already exists are skipped.
+
+        Args:
+            transactions: Transaction dicts, keyed as for insert_transaction
+                          plus parser_version
+
+        Returns:
+            Number of transactions inserted
+        """
+        try:
+            with self._get_connection() as conn:
+                changes_before = conn.total_changes
+                conn.executemany(TRANSACTION_INSERT_SQL, transactions)
+                conn.commit()
+                return conn.total_changes - changes_before
+        except sqlite3.Error as e:
+            logger.error(f"Error inserting transaction batch: {e}")
+            raise
+
+    def existing_hashes(self, hashes: List[str]) -> set:
+        """
+        Return which of the given row hashes are already stored.
+
+        Uses the unique index on transactions.hash, one query per 500 hashes
+        on a single connection, instead of a lookup per row.
+        """
+        found = set()
+        hashes = list(dict.fromkeys(hashes))
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                cursor.execute(
+                    f"SELECT hash FROM transactions WHERE hash IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                found.update(row[0] for row in cursor.fetchall())
+        return found
+
     def transaction_exists(self, hash_value: str) -> bool:
         with self._get_connection() as conn:
             cursor = conn.cursor()
@@ -277,6 +539,478 @@ class FinanceDB:
             print(f"Error getting categories for merchant {merchant_name}: {e}")
             return []
 
+    def get_cached_parse(
+        self, description_key: str, model: str, prompt_version: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached LLM parse and bump its hit count.
+
+        Args:
+            description_key: Normalized transaction description
+            model: LLM model the parse came from
+            prompt_version: Version of the prompt that produced it
+
+        Returns:
+            The parsed fields, or None on a cache miss
+        """
+        return self.get_cached_parses([description_key], model, prompt_version).get(description_key)
+
+    def get_cached_parses(
+        self, description_keys: List[str], model: str, prompt_version: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up cached LLM parses for many descriptions and bump their hit counts.
+
+        One query per 500 keys and a single hit count update, all on one
+        connection, instead of a lookup and commit per description.
+
+        Args:
+            description_keys: Normalized transaction descriptions
+            model: LLM model the parses came from
+            prompt_version: Version of the prompt that produced them
+
+        Returns:
+            Parsed fields by description key, for the keys that were cached
+        """
+        keys = list(dict.fromkeys(description_keys))
+        cached = {}
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    cursor.execute(f'''
+                    SELECT description_key, parsed_json FROM llm_parse_cache
+                    WHERE model = ? AND prompt_version = ?
+                    AND description_key IN ({','.join('?' * len(chunk))})
+                    ''', (model, prompt_version, *chunk))
+                    for key, parsed_json in cursor.fetchall():
+                        cached[key] = json.loads(parsed_json)
+
+                if cached:
+                    cursor.executemany('''
+                    UPDATE llm_parse_cache
+                    SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+                    WHERE description_key = ? AND model = ? AND prompt_version = ?
+                    ''', [(key, model, prompt_version) for key in cached])
+                    conn.commit()
+                return cached
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error reading LLM parse cache: {e}")
+            return {}
+
+    def cache_parse(
+        self, description_key: str, model: str, prompt_version: str,
+        parsed: Dict[str, Any]
+    ) -> bool:
+        """Store an LLM parse for a normalized description."""
+        try:
+            with self._get_connection() as conn:
+                conn.execute('''
+                INSERT OR REPLACE INTO llm_parse_cache (
+                    description_key, model, prompt_version, parsed_json
+                ) VALUES (?, ?, ?, ?)
+                ''', (description_key, model, prompt_version, json.dumps(parsed)))
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error writing LLM parse cache: {e}")
+            return False
+
+    def get_parse_cache_stats(self) -> pd.DataFrame:
+        """Summarize the LLM parse cache by model and prompt version."""
+        query = """
+        SELECT
+            model,
+            prompt_version,
+            COUNT(*) as entries,
+            COALESCE(SUM(hits), 0) as hits,
+            MAX(last_used_at) as last_used_at
+        FROM llm_parse_cache
+        GROUP BY model, prompt_version
+        ORDER BY last_used_at DESC
+        """
+        return self.run_query_pandas(query)
+
+    def create_upload_job(self, job: Dict[str, Any]) -> bool:
+        """Insert a queued upload job."""
+        try:
+            with self._get_connection() as conn:
+                conn.execute('''
+                INSERT INTO upload_jobs (
+                    id, source, filename, file_path, target_db_path, model, estimated_rows
+                ) VALUES (
+                    :id, :source, :filename, :file_path, :target_db_path, :model, :estimated_rows
+                )
+                ''', job)
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error creating upload job: {e}")
+            return False
+
+    def update_upload_job(self, job_id: str, **fields) -> bool:
+        """Update columns of an upload job and touch updated_at."""
+        if not fields:
+            return True
+        assignments = ', '.join(f"{name} = :{name}" for name in fields)
+        try:
+            with self._get_connection() as conn:
+                conn.execute(
+                    f"UPDATE upload_jobs SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE id = :job_id",
+                    {**fields, 'job_id': job_id}
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error updating upload job {job_id}: {e}")
+            return False
+
+    def get_upload_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        df = self.run_query_pandas("SELECT * FROM upload_jobs WHERE id = ?", params=(job_id,))
+        if df.empty:
+            return None
+        return df.astype(object).where(df.notna(), None).to_dict(orient="records")[0]
+
+    def get_upload_jobs(self, limit: int = 50, status: str = None) -> pd.DataFrame:
+        """Get recent upload jobs, newest first."""
+        if status:
+            query = "SELECT * FROM upload_jobs WHERE status = ? ORDER BY created_at DESC, rowid DESC LIMIT ?"
+            return self.run_query_pandas(query, params=(status, limit))
+        query = "SELECT * FROM upload_jobs ORDER BY created_at DESC, rowid DESC LIMIT ?"
+        return self.run_query_pandas(query, params=(limit,))
+
+    def get_unfinished_upload_jobs(self) -> pd.DataFrame:
+        """Get jobs that were queued or running when the server last stopped, oldest first."""
+        query = """
+        SELECT * FROM upload_jobs
+        WHERE status IN ('queued', 'running')
+        ORDER BY created_at, rowid
+        """
+        return self.run_query_pandas(query)
+
+    def get_parser_version_counts(self, source: str = None) -> pd.DataFrame:
+        """Count transactions by source and the parser version that produced them."""
+        query = """
+        SELECT source, parser_version, COUNT(*) as transactions
+        FROM transactions
+        {where}
+        GROUP BY source, parser_version
+        ORDER BY source, transactions DESC
+        """
+        if source:
+            return self.run_query_pandas(query.format(where="WHERE source = ?"), params=(source,))
+        return self.run_query_pandas(query.format(where=""))
+
+    def count_outdated_transactions(self, source: str, parser_version: str, after_id: int = 0) -> int:
+        """Count rows of a source not produced by the given parser version."""
+        with self._get_connection() as conn:
+            row = conn.execute('''
+            SELECT COUNT(*) FROM transactions
+            WHERE source = ? AND id > ? AND (parser_version IS NULL OR parser_version != ?)
+            ''', (source, after_id, parser_version)).fetchone()
+            return row[0]
+
+    def get_outdated_transactions(
+        self, source: str, parser_version: str, after_id: int = 0, limit: int = 500
+    ) -> pd.DataFrame:
+        """Get the next batch of rows not produced by the given parser version, in id order."""
+        query = """
+        SELECT id, original_description, parser_version
+        FROM transactions
+        WHERE source = ? AND id > ? AND (parser_version IS NULL OR parser_version != ?)
+        ORDER BY id
+        LIMIT ?
+        """
+        return self.run_query_pandas(query, params=(source, after_id, parser_version, limit))
+
+    def update_transaction_parses(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Overwrite the parsed fields of existing transactions in one database transaction.
+
+        Dates, amounts, descriptions and hashes are left untouched. Where a
+        row's merchant_name changes, the old name's merchant_categories are
+        copied to the new name first, so a user's categories follow the
+        renamed transactions (the old name keeps its own for rows that
+        still carry it).
+
+        Args:
+            updates: Dicts with id, the parsed fields and parser_version
+
+        Returns:
+            Dict with rows updated, the (old, new) merchant renames and the
+            category assignments copied to new names
+        """
+        ids = [update['id'] for update in updates]
+        try:
+            with self._get_connection() as conn:
+                old_names = {}
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    old_names.update(conn.execute(
+                        f"SELECT id, merchant_name FROM transactions WHERE id IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall())
+                renames = sorted({
+                    (old_names[update['id']], update['merchant_name'])
+                    for update in updates
+                    if old_names.get(update['id']) and update['merchant_name']
+                    and old_names[update['id']] != update['merchant_name']
+                })
+
+                changes_before = conn.total_changes
+                if renames and self._table_exists('merchant_categories'):
+                    conn.executemany('''
+                    INSERT OR IGNORE INTO merchant_categories (merchant_name, category_id)
+                    SELECT ?, category_id FROM merchant_categories WHERE merchant_name = ?
+                    ''', [(new, old) for old, new in renames])
+                categories_copied = conn.total_changes - changes_before
+
+                conn.executemany(TRANSACTION_REPARSE_SQL, updates)
+                conn.commit()
+                return {
+                    'updated': conn.total_changes - changes_before - categories_copied,
+                    'renames': renames,
+                    'categories_copied': categories_copied,
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Error updating transaction parses: {e}")
+            raise
+
+    def create_reparse_job(self, job: Dict[str, Any]) -> bool:
+        """Insert a queued re-parse job."""
+        try:
+            with self._get_connection() as conn:
+                conn.execute('''
+                INSERT INTO reparse_jobs (id, source, model, parser_version, total_rows)
+                VALUES (:id, :source, :model, :parser_version, :total_rows)
+                ''', job)
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error creating re-parse job: {e}")
+            return False
+
+    def update_reparse_job(self, job_id: str, **fields) -> bool:
+        """Update columns of a re-parse job and touch updated_at."""
+        if not fields:
+            return True
+        assignments = ', '.join(f"{name} = :{name}" for name in fields)
+        try:
+            with self._get_connection() as conn:
+                conn.execute(
+                    f"UPDATE reparse_jobs SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE id = :job_id",
+                    {**fields, 'job_id': job_id}
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error updating re-parse job {job_id}: {e}")
+            return False
+
+    def get_reparse_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        df = self.run_query_pandas("SELECT * FROM reparse_jobs WHERE id = ?", params=(job_id,))
+        if df.empty:
+            return None
+        return df.astype(object).where(df.notna(), None).to_dict(orient="records")[0]
+
+    def get_reparse_jobs(self, limit: int = 50) -> pd.DataFrame:
+        """Get recent re-parse jobs, newest first."""
+        query = "SELECT * FROM reparse_jobs ORDER BY created_at DESC, rowid DESC LIMIT ?"
+        return self.run_query_pandas(query, params=(limit,))
+
+    def get_unfinished_reparse_jobs(self) -> pd.DataFrame:
+        """Get re-parse jobs that were queued or running when the server last stopped, oldest first."""
+        query = """
+        SELECT * FROM reparse_jobs
+        WHERE status IN ('queued', 'running')
+        ORDER BY created_at, rowid
+        """
+        return self.run_query_pandas(query)
+
+    def _table_exists(self, name: str) -> bool:
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+            ).fetchone()
+            return row is not None
+
+    def upsert_etf_prices(self, prices: List[tuple]) -> int:
+        """
+        Insert or replace a batch of daily price bars in one transaction.
+
+        Args:
+            prices: (symbol, date, open, high, low, close, volume) tuples
+
+        Returns:
+            Number of bars written
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.executemany('''
+                INSERT OR REPLACE INTO etf_prices (
+                    symbol, date, open, high, low, close, volume, fetched_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', prices)
+                conn.commit()
+                return len(prices)
+        except sqlite3.Error as e:
+            logger.error(f"Error storing ETF prices: {e}")
+            raise
+
+    def replace_etf_prices(self, symbol: str, prices: List[tuple]) -> int:
+        """
+        Replace every stored bar of a symbol in one transaction.
+
+        Args:
+            symbol: Symbol whose history is replaced
+            prices: (symbol, date, open, high, low, close, volume) tuples
+
+        Returns:
+            Number of bars written
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute("DELETE FROM etf_prices WHERE symbol = ?", (symbol,))
+                conn.executemany('''
+                INSERT INTO etf_prices (
+                    symbol, date, open, high, low, close, volume, fetched_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', prices)
+                conn.commit()
+                return len(prices)
+        except sqlite3.Error as e:
+            logger.error(f"Error replacing ETF prices for {symbol}: {e}")
+            raise
+
+    def get_recent_etf_closes(self, symbol: str, limit: int = 2) -> pd.DataFrame:
+        """Get the date and close of a symbol's newest stored bars, newest first."""
+        query = """
+        SELECT date, close
+        FROM etf_prices
+        WHERE symbol = ?
+        ORDER BY date DESC
+        LIMIT ?
+        """
+        return self.run_query_pandas(query, params=(symbol, limit))
+
+    def get_latest_etf_price_date(self, symbol: str) -> Optional[str]:
+        """Get the date (YYYY-MM-DD) of the newest stored bar for a symbol, or None."""
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT MAX(date) FROM etf_prices WHERE symbol = ?", (symbol,)).fetchone()
+            return row[0] if row else None
+
+    def get_etf_prices(self, symbol: str, start_date: str = None) -> pd.DataFrame:
+        """Get a symbol's stored daily bars in date order, optionally from start_date on."""
+        query = """
+        SELECT date, open, high, low, close, volume
+        FROM etf_prices
+        WHERE symbol = ? AND date >= ?
+        ORDER BY date
+        """
+        return self.run_query_pandas(query, params=(symbol, start_date or ''))
+
+    def get_etf_price_summary(self) -> pd.DataFrame:
+        """Get the stored date range, bar count and last fetch time of each symbol."""
+        query = """
+        SELECT
+            symbol,
+            MIN(date) as first_date,
+            MAX(date) as last_date,
+            COUNT(*) as bars,
+            MAX(fetched_at) as last_fetched_at
+        FROM etf_prices
+        GROUP BY symbol
+        ORDER BY symbol
+        """
+        return self.run_query_pandas(query)
+
+    def get_merchant_category_labels(self) -> pd.DataFrame:
+        """Get every (merchant_name, category_id) assignment."""
+        if not self._table_exists('merchant_categories'):
+            return pd.DataFrame(columns=['merchant_name', 'category_id'])
+        query = """
+        SELECT merchant_name, category_id
+        FROM merchant_categories
+        ORDER BY merchant_name, category_id
+        """
+        return self.run_query_pandas(query)
+
+    def get_uncategorised_merchants(self) -> pd.DataFrame:
+        """Get merchants with transactions but no assigned category, busiest first."""
+        has_labels = self._table_exists('merchant_categories')
+        query = f"""
+        SELECT merchant_name, COUNT(*) as transaction_count
+        FROM transactions
+        WHERE merchant_name IS NOT NULL
+          AND merchant_name != ''
+          {"AND merchant_name NOT IN (SELECT merchant_name FROM merchant_categories)" if has_labels else ""}
+        GROUP BY merchant_name
+        ORDER BY transaction_count DESC
+        """
+        return self.run_query_pandas(query)
+
+    def replace_category_suggestions(self, suggestions: List[tuple]) -> int:
+        """
+        Replace all stored category suggestions in one transaction.
+
+        Args:
+            suggestions: (merchant_name, category_id, confidence, nearest_merchant, similarity) tuples
+
+        Returns:
+            Number of suggestions stored
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute("DELETE FROM merchant_category_suggestions")
+                conn.executemany('''
+                INSERT INTO merchant_category_suggestions (
+                    merchant_name, category_id, confidence, nearest_merchant, similarity
+                ) VALUES (?, ?, ?, ?, ?)
+                ''', suggestions)
+                conn.commit()
+                return len(suggestions)
+        except sqlite3.Error as e:
+            logger.error(f"Error storing category suggestions: {e}")
+            raise
+
+    def get_category_suggestions(self, min_confidence: float = 0.0, limit: int = None) -> pd.DataFrame:
+        """Get stored category suggestions with their category details, most confident first."""
+        query = """
+        SELECT
+            s.merchant_name,
+            s.category_id,
+            c.name as category_name,
+            c.color,
+            c.icon,
+            s.confidence,
+            s.nearest_merchant,
+            s.similarity,
+            s.created_at
+        FROM merchant_category_suggestions s
+        JOIN categories c ON c.id = s.category_id
+        WHERE s.confidence >= ?
+        ORDER BY s.confidence DESC, s.merchant_name
+        """
+        params = [min_confidence]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self.run_query_pandas(query, params=tuple(params))
+
+    def delete_category_suggestion(self, merchant_name: str) -> bool:
+        """Drop the suggestion for a merchant, e.g. once it has been categorised."""
+        try:
+            with self._get_connection() as conn:
+                conn.execute(
+                    "DELETE FROM merchant_category_suggestions WHERE merchant_name = ?", (merchant_name,)
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting category suggestion for {merchant_name}: {e}")
+            return False
+
     # =========================================================================
     # Up Bank Methods
     # =========================================================================
@@ -286,25 +1020,32 @@ class FinanceDB:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO up_accounts (
-                    id, display_name, account_type, ownership_type,
-                    current_balance, currency_code, created_at, last_synced_at
-                ) VALUES (
-                    :id, :display_name, :account_type, :ownership_type,
-                    :current_balance, :currency_code, :created_at, :last_synced_at
-                )
-                ON CONFLICT(id) DO UPDATE SET
-                    display_name = excluded.display_name,
-                    current_balance = excluded.current_balance,
-                    last_synced_at = excluded.last_synced_at
-                ''', account_data)
+                cursor.execute(UP_ACCOUNT_UPSERT_SQL, account_data)
                 conn.commit()
                 return True
         except sqlite3.Error as e:
             logger.error(f"Error upserting Up account: {e}")
             return False
 
+    def upsert_up_accounts(self, accounts: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update a batch of Up Bank accounts in one transaction.
+
+        Args:
+            accounts: Account dicts, keyed as for upsert_up_account
+
+        Returns:
+            Number of accounts written
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(UP_ACCOUNT_UPSERT_SQL, accounts)
+                conn.commit()
+                return len(accounts)
+        except sqlite3.Error as e:
+            logger.error(f"Error upserting Up accounts: {e}")
+            raise
+
     def insert_up_transaction(self, tx_data: Dict[str, Any]) -> bool:
         """Insert an Up Bank transaction (skip if exists)."""
         try:
@@ -327,6 +1068,103 @@ class FinanceDB:
             logger.error(f"Error inserting Up transaction: {e}")
             return False
 
+    def insert_up_transaction_page(
+        self, account_id: str, tx_rows: List[tuple],
+        next_cursor: Optional[str], since_at: Optional[str],
+        watermark: Optional[str]
+    ) -> int:
+        """
+        Upsert one page of Up transactions and advance the account's checkpoint.
+
+        Rows and checkpoint are written in a single transaction, so a stored
+        cursor always points just past rows that are already committed.
+
+        Args:
+            account_id: Account the page belongs to
+            tx_rows: Row tuples in UP_TRANSACTION_COLUMNS order
+            next_cursor: Pagination URL of the following page (None when done)
+            since_at: The since filter the pagination chain was started with
+            watermark: Newest created_at seen in the chain so far
+
+        Returns:
+            Number of transactions inserted or updated
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                changes_before = conn.total_changes
+                cursor.executemany(UP_TRANSACTION_INSERT_SQL, tx_rows)
+                inserted = conn.total_changes - changes_before
+
+                cursor.execute('''
+                INSERT INTO up_sync_checkpoints (
+                    account_id, cursor, since_at, watermark, pages_committed, updated_at
+                ) VALUES (?, ?, ?, ?, 1, CURRENT_TIMESTAMP)
+                ON CONFLICT(account_id) DO UPDATE SET
+                    cursor = excluded.cursor,
+                    since_at = excluded.since_at,
+                    watermark = excluded.watermark,
+                    pages_committed = up_sync_checkpoints.pages_committed + 1,
+                    updated_at = excluded.updated_at
+                ''', (account_id, next_cursor, since_at, watermark))
+                conn.commit()
+                return inserted
+        except sqlite3.Error as e:
+            logger.error(f"Error inserting Up transaction page: {e}")
+            raise
+
+    def insert_up_transaction_rows(self, tx_rows: List[tuple]) -> int:
+        """
+        Bulk upsert Up transaction rows in one transaction, updating stored
+        rows whose status, amount or details changed.
+
+        Args:
+            tx_rows: Row tuples in UP_TRANSACTION_COLUMNS order
+
+        Returns:
+            Number of transactions inserted or updated
+        """
+        try:
+            with self._get_connection() as conn:
+                changes_before = conn.total_changes
+                conn.executemany(UP_TRANSACTION_INSERT_SQL, tx_rows)
+                conn.commit()
+                return conn.total_changes - changes_before
+        except sqlite3.Error as e:
+            logger.error(f"Error bulk inserting Up transactions: {e}")
+            raise
+
+    def get_up_sync_checkpoint(self, account_id: str) -> Optional[Dict[str, Any]]:
+        """Get the pending pagination checkpoint for an account, if any."""
+        query = """
+        SELECT account_id, cursor, since_at, watermark, pages_committed, updated_at
+        FROM up_sync_checkpoints
+        WHERE account_id = ? AND cursor IS NOT NULL
+        """
+        df = self.run_query_pandas(query, params=(account_id,))
+        if df.empty:
+            return None
+        return df.iloc[0].to_dict()
+
+    def get_up_sync_checkpoints(self) -> pd.DataFrame:
+        """Get all pending pagination checkpoints."""
+        query = """
+        SELECT account_id, cursor, since_at, watermark, pages_committed, updated_at
+        FROM up_sync_checkpoints
+        WHERE cursor IS NOT NULL
+        """
+        return self.run_query_pandas(query)
+
+    def clear_up_sync_checkpoint(self, account_id: str):
+        """Remove an account's checkpoint once its pagination chain has completed."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM up_sync_checkpoints WHERE account_id = ?', (account_id,))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error clearing Up sync checkpoint: {e}")
+
     def up_transaction_exists(self, tx_id: str) -> bool:
         """Check if an Up transaction already exists."""
         with self._get_connection() as conn:
@@ -339,20 +1177,32 @@ class FinanceDB:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO up_categories (id, name, parent_id, last_synced_at)
-                VALUES (:id, :name, :parent_id, :last_synced_at)
-                ON CONFLICT(id) DO UPDATE SET
-                    name = excluded.name,
-                    parent_id = excluded.parent_id,
-                    last_synced_at = excluded.last_synced_at
-                ''', category_data)
+                cursor.execute(UP_CATEGORY_UPSERT_SQL, category_data)
                 conn.commit()
                 return True
         except sqlite3.Error as e:
             logger.error(f"Error upserting Up category: {e}")
             return False
 
+    def upsert_up_categories(self, categories: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update a batch of Up Bank categories in one transaction.
+
+        Args:
+            categories: Category dicts, keyed as for upsert_up_category
+
+        Returns:
+            Number of categories written
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(UP_CATEGORY_UPSERT_SQL, categories)
+                conn.commit()
+                return len(categories)
+        except sqlite3.Error as e:
+            logger.error(f"Error upserting Up categories: {e}")
+            raise
+
     def insert_balance_snapshot(
         self, account_id: str, balance: float, snapshot_date: str,
         snapshot_type: str = 'daily'
@@ -361,17 +1211,33 @@ class FinanceDB:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                INSERT OR REPLACE INTO balance_snapshots
-                    (account_id, balance, snapshot_date, snapshot_type)
-                VALUES (?, ?, ?, ?)
-                ''', (account_id, balance, snapshot_date, snapshot_type))
+                cursor.execute(BALANCE_SNAPSHOT_INSERT_SQL,
+                               (account_id, balance, snapshot_date, snapshot_type))
                 conn.commit()
                 return True
         except sqlite3.Error as e:
             logger.error(f"Error inserting balance snapshot: {e}")
             return False
 
+    def insert_balance_snapshots(self, snapshots: List[tuple]) -> int:
+        """
+        Record a batch of balance snapshots in one transaction.
+
+        Args:
+            snapshots: (account_id, balance, snapshot_date, snapshot_type) tuples
+
+        Returns:
+            Number of snapshots written
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(BALANCE_SNAPSHOT_INSERT_SQL, snapshots)
+                conn.commit()
+                return len(snapshots)
+        except sqlite3.Error as e:
+            logger.error(f"Error inserting balance snapshots: {e}")
+            raise
+
     def get_up_accounts(self) -> pd.DataFrame:
         """Get all Up Bank accounts."""
         query = """
@@ -699,21 +1565,162 @@ class FinanceDB:
             return -1
 
     def record_sync_complete(
-        self, sync_id: int, items_synced: int, error_message: str = None
+        self, sync_id: int, items_synced: int, error_message: str = None,
+        telemetry: Optional[SyncTelemetry] = None
     ):
-        """Record sync completion."""
+        """Record sync completion, with its per-phase timings if provided."""
         try:
             status = 'failed' if error_message else 'completed'
+            telemetry = telemetry or SyncTelemetry()
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                 UPDATE sync_metadata
                 SET completed_at = CURRENT_TIMESTAMP,
-                    status = ?,
-                    items_synced = ?,
-                    error_message = ?
-                WHERE id = ?
-                ''', (status, items_synced, error_message, sync_id))
+                    status = :status,
+                    items_synced = :items_synced,
+                    error_message = :error_message,
+                    http_seconds = :http_seconds,
+                    rate_limit_sleep_seconds = :rate_limit_sleep_seconds,
+                    parse_seconds = :parse_seconds,
+                    db_seconds = :db_seconds,
+                    pages = :pages,
+                    requests = :requests,
+                    retries = :retries,
+                    max_request_seconds = :max_request_seconds
+                WHERE id = :id
+                ''', {
+                    **telemetry.model_dump(),
+                    'status': status,
+                    'items_synced': items_synced,
+                    'error_message': error_message,
+                    'id': sync_id
+                })
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error recording sync completion: {e}")
+
+    def get_up_sync_state(self, held_since: Optional[str] = None) -> pd.DataFrame:
+        """
+        Get the stored sync fingerprint for every active Up account.
+
+        Joins the fingerprint recorded at the last transaction check with the
+        account's current balance and the number of HELD transactions stored
+        for it, so callers can decide whether a transaction fetch is needed.
+
+        Args:
+            held_since: Only count HELD transactions created at or after this
+                        ISO timestamp (older ones are not expected to settle)
+        """
+        query = """
+        SELECT
+            a.id AS account_id,
+            a.current_balance,
+            s.synced_balance,
+            s.last_activity_at,
+            s.last_checked_at,
+            (
+                SELECT COUNT(*) FROM up_transactions t
+                WHERE t.account_id = a.id AND t.status = 'HELD'
+                AND (? IS NULL OR t.created_at >= ?)
+            ) AS held_count
+        FROM up_accounts a
+        LEFT JOIN up_sync_state s ON s.account_id = a.id
+        WHERE a.is_active = TRUE
+        """
+        return self.run_query_pandas(query, params=(held_since, held_since))
+
+    def get_oldest_held_up_transaction(
+        self, account_id: str, held_since: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Get the created_at of an account's oldest stored HELD transaction.
+
+        Args:
+            account_id: Up account ID
+            held_since: Ignore HELD transactions created before this ISO timestamp
+        """
+        query = """
+        SELECT MIN(created_at) AS created_at
+        FROM up_transactions
+        WHERE account_id = ? AND status = 'HELD'
+        AND (? IS NULL OR created_at >= ?)
+        """
+        df = self.run_query_pandas(query, params=(account_id, held_since, held_since))
+        if df.empty or pd.isna(df['created_at'].iloc[0]):
+            return None
+        return df['created_at'].iloc[0]
+
+    def update_up_sync_state(self, account_id: str, synced_balance: float) -> bool:
+        """Record the fingerprint of an account after its transactions were checked."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                INSERT INTO up_sync_state (
+                    account_id, synced_balance, last_activity_at, last_checked_at
+                ) VALUES (
+                    ?, ?,
+                    (SELECT MAX(created_at) FROM up_transactions WHERE account_id = ?),
+                    CURRENT_TIMESTAMP
+                )
+                ON CONFLICT(account_id) DO UPDATE SET
+                    synced_balance = excluded.synced_balance,
+                    last_activity_at = excluded.last_activity_at,
+                    last_checked_at = excluded.last_checked_at
+                ''', (account_id, synced_balance, account_id))
                 conn.commit()
+                return True
         except sqlite3.Error as e:
-            logger.error(f"Error recording sync completion: {e}")
\ No newline at end of file
+            logger.error(f"Error updating Up sync state: {e}")
+            return False
+
+    def get_sync_telemetry_summary(self, limit: int = 20) -> pd.DataFrame:
+        """Per-phase timing totals over the most recent completed sync runs, by sync type."""
+        query = """
+        SELECT
+            sync_type,
+            COUNT(*) AS runs,
+            SUM(items_synced) AS items_synced,
+            SUM((julianday(completed_at) - julianday(started_at)) * 86400) AS total_seconds,
+            SUM(COALESCE(http_seconds, 0)) AS http_seconds,
+            SUM(COALESCE(rate_limit_sleep_seconds, 0)) AS rate_limit_sleep_seconds,
+            SUM(COALESCE(parse_seconds, 0)) AS parse_seconds,
+            SUM(COALESCE(db_seconds, 0)) AS db_seconds,
+            SUM(COALESCE(pages, 0)) AS pages,
+            SUM(COALESCE(requests, 0)) AS requests,
+            SUM(COALESCE(retries, 0)) AS retries,
+            SUM(COALESCE(http_seconds, 0)) / MAX(SUM(COALESCE(requests, 0)), 1) AS avg_request_seconds,
+            MAX(max_request_seconds) AS max_request_seconds
+        FROM (
+            SELECT * FROM sync_metadata
+            WHERE status = 'completed'
+            ORDER BY started_at DESC
+            LIMIT ?
+        )
+        GROUP BY sync_type
+        """
+        return self.run_query_pandas(query, params=(limit,))
+
+    def get_sync_telemetry_trends(self, days: int = 30) -> pd.DataFrame:
+        """Daily per-phase sync timings, for spotting slow-downs over time."""
+        query = """
+        SELECT
+            DATE(started_at) AS day,
+            COUNT(*) AS runs,
+            SUM(items_synced) AS items_synced,
+            SUM((julianday(completed_at) - julianday(started_at)) * 86400) AS total_seconds,
+            SUM(COALESCE(http_seconds, 0)) AS http_seconds,
+            SUM(COALESCE(rate_limit_sleep_seconds, 0)) AS rate_limit_sleep_seconds,
+            SUM(COALESCE(parse_seconds, 0)) AS parse_seconds,
+            SUM(COALESCE(db_seconds, 0)) AS db_seconds,
+            SUM(COALESCE(pages, 0)) AS pages,
+            SUM(COALESCE(retries, 0)) AS retries,
+            MAX(max_request_seconds) AS max_request_seconds
+        FROM sync_metadata
+        WHERE status = 'completed'
+            AND started_at >= DATE('now', ?)
+        GROUP BY day
+        ORDER BY day
+        """
+        return self.run_query_pandas(query, params=(f'-{days} days',))
@@ -2,21 +2,41 @@
 ETF Analysis Module
 
 Provides linear regression analysis and CAGR calculations for ETF price data.
-Uses Yahoo Finance for historical price data.
+Historical prices come from the local ETF price store (see etf_prices), which
+is topped up from Yahoo Finance or fixture files.
 """
 
+import os
 import json
+import time
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date, timedelta
 from pathlib import Path
 from typing import Optional
 
 import pandas as pd
-import yfinance as yf
 from sklearn.linear_model import LinearRegression
 
+from .etf_prices import ETFPriceStore, HISTORY_START, price_source_from_env
+
 logger = logging.getLogger(__name__)
 
+# Exchange suffix of configured tickers (ASX)
+DEFAULT_SUFFIX = ".AX"
+
+# Tickers whose price history is loaded at the same time (I/O bound)
+DEFAULT_LOAD_WORKERS = 8
+
+# Worker processes fitting periods across tickers. A period fit takes tens of
+# milliseconds, about what shipping its history to another process costs, so
+# by default (0) fits run in a thread pool; set ETF_FIT_PROCESSES when many
+# tickers or longer histories make the fits worth spreading over cores
+DEFAULT_FIT_PROCESSES = int(os.getenv("ETF_FIT_PROCESSES", "0"))
+
 
 def load_etf_config(config_path: Optional[str] = None) -> dict:
     """Load ETF configuration from JSON file."""
@@ -123,22 +143,17 @@ def analyze_period(
     step = max(1, len(filtered_data) // sample_size)
     sampled_data = filtered_data.iloc[::step]
 
+    sampled_dates = sampled_data["Date"].dt.strftime("%Y-%m-%d").tolist()
     data_points = [
-        {
-            "date": row["Date"].strftime("%Y-%m-%d"),
-            "price": round(row["Close"], 2),
-        }
-        for _, row in sampled_data.iterrows()
+        {"date": day, "price": price}
+        for day, price in zip(sampled_dates, sampled_data["Close"].round(2).tolist())
     ]
 
     # Predict all trend points at once for efficiency
-    trend_predictions = model.predict(sampled_data[["DateNumeric"]].values)
+    trend_predictions = model.predict(sampled_data[["DateNumeric"]])
     trend_line = [
-        {
-            "date": row["Date"].strftime("%Y-%m-%d"),
-            "price": round(float(trend_predictions[i]), 2),
-        }
-        for i, (_, row) in enumerate(sampled_data.iterrows())
+        {"date": day, "price": price}
+        for day, price in zip(sampled_dates, trend_predictions.round(2).tolist())
     ]
 
     return {
@@ -155,7 +170,50 @@ def analyze_period(
     }
 
 
-def process_ticker(ticker: str, etf_info: dict, suffix: str = ".AX") -> Optional[dict]:
+def load_price_history(symbol: str, prices: Optional[ETFPriceStore] = None) -> pd.DataFrame:
+    """Get a symbol's daily bars from the price store, or straight from the price source without one."""
+    if prices is not None:
+        return prices.history(symbol)
+    return price_source_from_env().fetch(symbol, HISTORY_START)
+
+
+def prepare_history(etf_data: pd.DataFrame) -> pd.DataFrame:
+    """Add the Date and DateNumeric (ordinal day) columns the regressions use."""
+    etf_data = etf_data.copy()
+    etf_data["Date"] = etf_data.index
+    etf_data["DateNumeric"] = etf_data.index.map(lambda d: d.toordinal()).astype("int64")
+    return etf_data
+
+
+def analysis_periods(etf_data: pd.DataFrame) -> list[tuple[str, str]]:
+    """The (period name, start date) pairs analysed for an ETF's history."""
+    # Calculate max years of data
+    total_years = (etf_data.index[-1] - etf_data.index[0]).days / 365.25
+    max_years = min(20, total_years)
+
+    return [
+        (f"Max ({max_years:.1f} Years)", etf_data.index[0].strftime("%Y-%m-%d")),
+        ("3 Years", get_past_date(3 * 365)),
+        ("1 Year", get_past_date(365)),
+    ]
+
+
+def ticker_result(ticker: str, etf_info: dict, analyses: list[dict], timing: dict) -> dict:
+    """Assemble a ticker's analysis response."""
+    return {
+        "ticker": ticker,
+        "title": etf_info.get("title", ticker),
+        "name": etf_info.get("name", ""),
+        "description": etf_info.get("description", ""),
+        "etf_type": etf_info.get("etfType", ""),
+        "analyses": analyses,
+        "timing": timing,
+    }
+
+
+def process_ticker(
+    ticker: str, etf_info: dict, suffix: str = DEFAULT_SUFFIX, prices: Optional[ETFPriceStore] = None
+) -> Optional[dict]:
     """
     Process a single ETF ticker and return analysis data.
 
@@ -163,6 +221,7 @@ def process_ticker(ticker: str, etf_info: dict, suffix: str = ".AX") -> Optional
         ticker: The ETF ticker symbol (e.g., "VAS")
         etf_info: Metadata dict for the ETF
         suffix: Exchange suffix (default ".AX" for Australian)
+        prices: Local price store to serve history from (fetched uncached without one)
 
     Returns:
         Dict with ticker info and analysis for all periods, or None on error
@@ -170,67 +229,194 @@ def process_ticker(ticker: str, etf_info: dict, suffix: str = ".AX") -> Optional
     logger.info(f"Processing {ticker}")
 
     try:
-        etf = yf.Ticker(f"{ticker}{suffix}")
-        etf_data = etf.history(start="2000-01-01")
+        started = time.perf_counter()
+        etf_data = load_price_history(f"{ticker}{suffix}", prices)
+        load_seconds = time.perf_counter() - started
 
         if etf_data.empty:
             logger.error(f"No data found for {ticker}")
             return None
 
-        logger.info(f"Downloaded {len(etf_data)} data points for {ticker}")
-
-        etf_data["Date"] = etf_data.index
-        etf_data["DateNumeric"] = etf_data["Date"].apply(lambda d: d.toordinal())
-
-        # Calculate max years of data
-        total_years = (etf_data.index[-1] - etf_data.index[0]).days / 365.25
-        max_years = min(20, total_years)
-
-        # Analyze different time periods
-        periods = [
-            (f"Max ({max_years:.1f} Years)", etf_data.index[0].strftime("%Y-%m-%d")),
-            ("3 Years", get_past_date(3 * 365)),
-            ("1 Year", get_past_date(365)),
-        ]
+        logger.info(f"Loaded {len(etf_data)} data points for {ticker}")
 
+        etf_data = prepare_history(etf_data)
         analyses = []
-        for period_name, start_date in periods:
-            analysis = analyze_period(etf_data, start_date, period_name)
+        fit_seconds = 0.0
+        for period_name, start_date in analysis_periods(etf_data):
+            analysis, seconds = timed_analyze_period(etf_data, start_date, period_name)
             analyses.append(analysis)
+            fit_seconds += seconds
 
-        return {
-            "ticker": ticker,
-            "title": etf_info.get("title", ticker),
-            "name": etf_info.get("name", ""),
-            "description": etf_info.get("description", ""),
-            "etf_type": etf_info.get("etfType", ""),
-            "analyses": analyses,
-        }
+        return ticker_result(ticker, etf_info, analyses, {
+            "load_seconds": round(load_seconds, 4),
+            "fit_seconds": round(fit_seconds, 4),
+            "total_seconds": round(time.perf_counter() - started, 4),
+        })
 
     except Exception as e:
         logger.error(f"Error processing {ticker}: {str(e)}")
         return None
 
 
-def get_all_etf_analysis(config_path: Optional[str] = None) -> list[dict]:
+def timed_analyze_period(etf_data: pd.DataFrame, start_date: str, period_name: str) -> tuple[dict, float]:
+    """analyze_period plus the seconds it took; the unit of work sent to fit processes."""
+    started = time.perf_counter()
+    analysis = analyze_period(etf_data, start_date, period_name)
+    return analysis, time.perf_counter() - started
+
+
+_fit_pool: Optional[ProcessPoolExecutor] = None
+_fit_pool_lock = threading.Lock()
+
+def get_fit_pool(processes: int = DEFAULT_FIT_PROCESSES) -> ProcessPoolExecutor:
     """
-    Process all ETFs from config and return analysis data.
+    Shared process pool for period fits, created on first use and kept warm.
+
+    Workers are spawned rather than forked, as the API process runs other
+    threads (schedulers, job queues) that a fork would copy mid-flight.
+    """
+    global _fit_pool
+    with _fit_pool_lock:
+        if _fit_pool is None:
+            _fit_pool = ProcessPoolExecutor(
+                max_workers=max(1, processes), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _fit_pool
+
+def warm_fit_pool(processes: int = DEFAULT_FIT_PROCESSES):
+    """Start the fit processes ahead of the first analysis (no-op when fits run in threads)."""
+    if processes > 0:
+        pool = get_fit_pool(processes)
+        for _ in range(processes):
+            pool.submit(get_past_date, 0)
+
+def shutdown_fit_pool():
+    """Stop the shared fit processes (a later analysis starts new ones)."""
+    global _fit_pool
+    with _fit_pool_lock:
+        pool, _fit_pool = _fit_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_etf_analysis(
+    config_path: Optional[str] = None,
+    prices: Optional[ETFPriceStore] = None,
+    load_workers: int = DEFAULT_LOAD_WORKERS,
+    fit_processes: int = DEFAULT_FIT_PROCESSES
+) -> dict:
+    """
+    Analyse all configured ETFs concurrently.
+
+    Price histories are loaded in a bounded thread pool, and as each one
+    arrives its period fits are submitted to the fit executor (the shared
+    process pool, or a thread pool when fit_processes is 0), so fits
+    overlap the remaining downloads and the time taken is roughly the
+    slowest download plus its fits rather than the sum over every ticker.
+    A ticker that fails to load or fit is reported in errors without
+    affecting the others.
 
     Args:
         config_path: Optional path to ETF config JSON file
+        prices: Local price store to serve history from
+        load_workers: Histories loaded at the same time
+        fit_processes: Worker processes for the fits (0 fits in threads)
 
     Returns:
-        List of analysis results for each ETF
+        Dict with results (sorted by title, each with its timing), errors
+        (ticker and message) and the total seconds taken
     """
+    started = time.perf_counter()
     etf_info = load_etf_config(config_path)
+    load_workers = max(1, min(load_workers, len(etf_info)))
+    errors = []
 
-    results = []
-    for ticker, info in etf_info.items():
-        result = process_ticker(ticker, info)
-        if result:
-            results.append(result)
+    def load(ticker: str):
+        load_started = time.perf_counter()
+        etf_data = load_price_history(f"{ticker}{DEFAULT_SUFFIX}", prices)
+        if etf_data.empty:
+            raise ValueError("No data found")
+        # Only the fitted columns are shipped to the fit workers
+        return prepare_history(etf_data)[["Date", "DateNumeric", "Close"]], time.perf_counter() - load_started
+
+    fit_threads = None if fit_processes > 0 else ThreadPoolExecutor(
+        max_workers=load_workers, thread_name_prefix="etf-fit"
+    )
+    fit_executor = get_fit_pool(fit_processes) if fit_processes > 0 else fit_threads
+    fits = {}
+    try:
+        with ThreadPoolExecutor(max_workers=load_workers, thread_name_prefix="etf-load") as loader:
+            futures = {loader.submit(load, ticker): ticker for ticker in etf_info}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    etf_data, load_seconds = future.result()
+                except Exception as e:
+                    logger.error(f"Error loading {ticker}: {str(e)}")
+                    errors.append({"ticker": ticker, "error": str(e)})
+                    continue
+
+                logger.info(f"Loaded {len(etf_data)} data points for {ticker}")
+                fits[ticker] = (load_seconds, [
+                    (args, fit_executor.submit(timed_analyze_period, *args))
+                    for args in ((etf_data, start_date, period_name)
+                                 for period_name, start_date in analysis_periods(etf_data))
+                ])
+
+        results = []
+        pool_broken = False
+        for ticker, (load_seconds, period_fits) in fits.items():
+            try:
+                analyses, fit_seconds = [], 0.0
+                for args, future in period_fits:
+                    if pool_broken:
+                        analysis, seconds = timed_analyze_period(*args)
+                    else:
+                        try:
+                            analysis, seconds = future.result()
+                        except BrokenProcessPool:
+                            # A crashed worker takes the whole pool with it;
+                            # drop it (the next analysis starts a new one) and
+                            # fit what's left in this process
+                            logger.warning("ETF fit process pool broke; fitting the rest in-process")
+                            shutdown_fit_pool()
+                            pool_broken = True
+                            analysis, seconds = timed_analyze_period(*args)
+                    analyses.append(analysis)
+                    fit_seconds += seconds
+            except Exception as e:
+                logger.error(f"Error analysing {ticker}: {str(e)}")
+                errors.append({"ticker": ticker, "error": str(e)})
+                continue
+
+            results.append(ticker_result(ticker, etf_info[ticker], analyses, {
+                "load_seconds": round(load_seconds, 4),
+                "fit_seconds": round(fit_seconds, 4),
+            }))
+    finally:
+        if fit_threads is not None:
+            fit_threads.shutdown(wait=False, cancel_futures=True)
 
     # Sort alphabetically by title
     results.sort(key=lambda x: x["title"])
+    errors.sort(key=lambda x: x["ticker"])
 
-    return results
+    seconds = time.perf_counter() - started
+    logger.info(f"Analysed {len(results)} ETFs in {seconds:.2f}s ({len(errors)} failed)")
+    return {"results": results, "errors": errors, "seconds": round(seconds, 4)}
+
+
+def get_all_etf_analysis(
+    config_path: Optional[str] = None, prices: Optional[ETFPriceStore] = None
+) -> list[dict]:
+    """
+    Process all ETFs from config and return analysis data.
+
+    Args:
+        config_path: Optional path to ETF config JSON file
+        prices: Local price store to serve history from
+
+    Returns:
+        List of analysis results for each ETF
+    """
+    return run_etf_analysis(config_path, prices=prices)["results"]
@@ -0,0 +1,263 @@
+"""Local store of daily ETF prices, topped up incrementally from a pluggable price source."""
+
+import os
+import math
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, Optional
+
+import pandas as pd
+
+from .db import FinanceDB
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# First date requested for a symbol with no stored history
+HISTORY_START = "2000-01-01"
+
+# Bar columns as returned by price sources and used by the analysis
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Seconds a symbol's stored bars are served before the source is asked for newer ones
+DEFAULT_REFRESH_SECONDS = 6 * 60 * 60
+
+# Relative change in a re-fetched, already final close that means the source
+# has re-adjusted the whole history (a dividend or split moves it far more)
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def _empty_prices() -> pd.DataFrame:
+    return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+
+
+class PriceSource(ABC):
+    """
+    Where daily bars come from.
+
+    Subclasses return bars on or after start as a DataFrame indexed by a
+    tz-naive DatetimeIndex named Date (the exchange's trading date) with
+    the PRICE_COLUMNS columns, and an empty frame when there are none.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def fetch(self, symbol: str, start: str) -> pd.DataFrame:
+        """Get a symbol's daily bars from start (YYYY-MM-DD) on."""
+
+
+class YahooPriceSource(PriceSource):
+    """
+    Daily bars from Yahoo Finance (split and dividend adjusted).
+
+    Yahoo re-scales the whole adjusted history on every distribution;
+    ETFPriceStore notices and re-downloads it.
+    """
+
+    name = "yahoo"
+
+    def fetch(self, symbol: str, start: str) -> pd.DataFrame:
+        import yfinance as yf
+
+        history = yf.Ticker(symbol).history(start=start)
+        if history.empty:
+            return _empty_prices()
+
+        index = history.index
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        history.index = pd.DatetimeIndex(index.normalize(), name="Date")
+        return history[PRICE_COLUMNS]
+
+
+class CSVPriceSource(PriceSource):
+    """
+    Daily bars from fixture files, for tests and offline runs.
+
+    Each symbol is read from <directory>/<symbol>.csv with a Date column
+    (YYYY-MM-DD) and the PRICE_COLUMNS columns; a missing file means the
+    symbol has no data. Files written by export_prices use this layout.
+    """
+
+    name = "csv"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, symbol: str, start: str) -> pd.DataFrame:
+        path = os.path.join(self.directory, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return _empty_prices()
+
+        prices = pd.read_csv(path, parse_dates=["Date"], index_col="Date")
+        prices = prices.reindex(columns=PRICE_COLUMNS).sort_index()
+        return prices[prices.index >= pd.Timestamp(start)]
+
+
+def price_source_from_env() -> PriceSource:
+    """Fixture files from ETF_PRICE_FIXTURES when it is set, otherwise Yahoo Finance."""
+    fixtures = os.getenv("ETF_PRICE_FIXTURES")
+    if fixtures:
+        return CSVPriceSource(fixtures)
+    return YahooPriceSource()
+
+
+class ETFPriceStore:
+    """
+    Serves ETF price history from the etf_prices table.
+
+    The first request for a symbol downloads its full history; after that
+    only bars from the second-newest stored date on are fetched, no more
+    than once per refresh interval. The newest bar is fetched again so an
+    intraday bar is replaced by the final one, and the bar before it (which
+    was already final) is compared with the stored one: adjusted sources
+    re-scale all past prices after a dividend or split, so if it moved the
+    full history is downloaded again rather than mixing adjustment bases.
+    When the source fails, whatever is already stored is served.
+    """
+
+    def __init__(
+        self,
+        db: FinanceDB,
+        source: Optional[PriceSource] = None,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            db: Database holding the etf_prices table
+            source: Where new bars come from (default: price_source_from_env())
+            refresh_seconds: Seconds between fetches for the same symbol
+        """
+        self.db = db
+        self.source = source or price_source_from_env()
+        self.refresh_seconds = refresh_seconds
+        self._refreshed: Dict[str, float] = {}
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def history(self, symbol: str, refresh: bool = True) -> pd.DataFrame:
+        """
+        Get a symbol's daily bars, fetching newer ones first if they are due.
+
+        Returns:
+            DataFrame indexed by Date with the PRICE_COLUMNS columns, oldest first
+        """
+        if refresh:
+            self.refresh(symbol)
+
+        stored = self.db.get_etf_prices(symbol)
+        if stored.empty:
+            return _empty_prices()
+        stored.index = pd.DatetimeIndex(pd.to_datetime(stored.pop("date")), name="Date")
+        return stored.rename(columns=str.capitalize)[PRICE_COLUMNS]
+
+    def refresh(self, symbol: str, force: bool = False) -> int:
+        """
+        Fetch and store the bars after a symbol's last stored date, or its
+        full history again if the source has re-adjusted past prices.
+
+        Args:
+            symbol: Price source symbol (e.g. "VAS.AX")
+            force: Fetch even if the symbol was refreshed within the interval
+
+        Returns:
+            Number of bars written
+        """
+        with self._symbol_lock(symbol):
+            checked = self._refreshed.get(symbol)
+            if not force and checked is not None and time.monotonic() - checked < self.refresh_seconds:
+                return 0
+
+            recent = self.db.get_recent_etf_closes(symbol, limit=2)
+            last_date = recent['date'].iloc[0] if len(recent) else None
+            if last_date is not None and last_date >= date.today().isoformat() and not force:
+                self._refreshed[symbol] = time.monotonic()
+                return 0
+
+            # The oldest of the recent bars is the overlap checked for re-adjustment
+            start = recent['date'].iloc[-1] if len(recent) else HISTORY_START
+            try:
+                bars = self.source.fetch(symbol, start).dropna(subset=["Close"])
+                readjusted = len(recent) > 0 and self._readjusted(bars, recent['date'].iloc[-1], recent['close'].iloc[-1])
+                if readjusted:
+                    logger.info(f"{symbol} history was re-adjusted by {self.source.name}; downloading it again")
+                    start = HISTORY_START
+                    bars = self.source.fetch(symbol, start).dropna(subset=["Close"])
+            except Exception as e:
+                if last_date is None:
+                    raise
+                logger.warning(f"Could not fetch {symbol} prices from {self.source.name}, "
+                               f"serving stored bars up to {last_date}: {e}")
+                return 0
+
+            rows = [
+                (symbol, day.strftime("%Y-%m-%d"), *(_optional_float(row[c]) for c in PRICE_COLUMNS))
+                for day, row in bars.iterrows()
+            ]
+            if readjusted and rows:
+                written = self.db.replace_etf_prices(symbol, rows)
+            else:
+                written = self.db.upsert_etf_prices(rows) if rows else 0
+            self._refreshed[symbol] = time.monotonic()
+
+        logger.info(f"Stored {written} {symbol} bars from {self.source.name} (from {start})")
+        return written
+
+    def export_prices(self, symbol: str, directory: str) -> str:
+        """Write a symbol's stored bars as a CSVPriceSource fixture file and return its path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{symbol}.csv")
+        self.history(symbol, refresh=False).to_csv(path, date_format="%Y-%m-%d")
+        return path
+
+    @staticmethod
+    def _readjusted(bars: pd.DataFrame, check_date: str, stored_close: float) -> bool:
+        """True if the re-fetched close on check_date no longer matches the stored one."""
+        fetched = bars.loc[bars.index == pd.Timestamp(check_date), "Close"]
+        if fetched.empty:
+            return False
+        return not math.isclose(float(fetched.iloc[0]), stored_close, rel_tol=ADJUSTMENT_TOLERANCE)
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+
+def _optional_float(value) -> Optional[float]:
+    return None if pd.isna(value) else float(value)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .etf_analysis import DEFAULT_SUFFIX, load_etf_config
+
+    parser = argparse.ArgumentParser(description="Update the local ETF price store")
+    parser.add_argument("--db-path", "-d", help="Database path", type=str, default="data/finance-prod.db")
+    parser.add_argument("--fixtures", help="Read bars from fixture CSVs in this directory instead of Yahoo Finance", type=str)
+    parser.add_argument("--export", help="Write each ticker's stored bars as fixture CSVs to this directory", type=str)
+    parser.add_argument("--force", help="Fetch even if refreshed recently", action="store_true")
+    args = parser.parse_args()
+
+    source = CSVPriceSource(args.fixtures) if args.fixtures else None
+    store = ETFPriceStore(FinanceDB(args.db_path), source=source)
+    for ticker in load_etf_config():
+        symbol = f"{ticker}{DEFAULT_SUFFIX}"
+        try:
+            store.refresh(symbol, force=args.force)
+        except Exception as e:
+            logger.error(f"Error fetching {symbol}: {e}")
+            continue
+        if args.export and store.db.get_latest_etf_price_date(symbol):
+            print(f"Exported {store.export_prices(symbol, args.export)}")
+
+    print(store.db.get_etf_price_summary().to_string(index=False))
@@ -1,6 +1,18 @@
-import requests
+import os
 import json
-from typing import Dict
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
 
 def is_valid_json(response: str) -> bool:
     """Check if the response is a valid JSON string."""
@@ -27,21 +39,266 @@ def parse_json_response(response):
         # Try parsing the whole response
         return json.loads(response)
 
-def query_ollama(prompt: str, model: str = "gemma3") -> Dict:
-    """Send a query to Ollama and return the parsed response."""
-    url = "http://localhost:11434/api/generate"
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False
-    }
-    
+def try_parse_json(response: str) -> Optional[Any]:
+    """Parse JSON from an LLM response in one pass, returning None if it isn't valid."""
+    try:
+        return parse_json_response(response)
+    except (ValueError, TypeError, IndexError):
+        return None
+
+
+class OllamaError(Exception):
+    """Raised when Ollama can't be reached or returns an error."""
+    pass
+
+class OllamaClient:
+    """
+    Ollama /api/generate client for high-volume local inference.
+
+    Requests go through one pooled session (no reconnect per call), models
+    are warmed up once and kept resident with keep_alive, and JSON output can
+    be constrained to a schema. Latency and token throughput are recorded
+    for every call; see metrics_summary().
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Union[float, tuple] = (5.0, 120.0),
+        keep_alive: str = "30m",
+        max_retries: int = 2,
+        retry_delay: float = 1.0,
+        pool_size: int = 16,
+        max_metrics: int = 10000
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Ollama server (defaults to OLLAMA_HOST or localhost:11434)
+            timeout: Request timeout in seconds, or a (connect, read) tuple
+            keep_alive: How long Ollama keeps the model loaded after each call
+            max_retries: Retries on connection errors, timeouts and 5xx
+            retry_delay: First retry delay in seconds; doubles each attempt
+            pool_size: Pooled connections, at least the number of parallel callers
+            max_metrics: Per-call metric records kept for summaries
+        """
+        base_url = base_url or os.getenv("OLLAMA_HOST") or DEFAULT_OLLAMA_URL
+        if not base_url.startswith("http"):
+            base_url = f"http://{base_url}"
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._metrics = deque(maxlen=max_metrics)
+        self._errors = 0
+        self._warm_models = set()
+        self._lock = threading.Lock()
+
+    def warm_up(self, model: str) -> bool:
+        """Load a model into memory once, so the first real call doesn't pay for it."""
+        with self._lock:
+            if model in self._warm_models:
+                return True
+
+        started = time.perf_counter()
+        try:
+            # An empty prompt only loads the model
+            self._post({"model": model, "prompt": "", "keep_alive": self.keep_alive})
+        except OllamaError as e:
+            logger.warning(f"Could not warm up {model}: {e}")
+            return False
+
+        with self._lock:
+            self._warm_models.add(model)
+        logger.info(f"Warmed up {model} in {time.perf_counter() - started:.1f}s")
+        return True
+
+    def generate(
+        self, prompt: str, model: str = "gemma3",
+        format: Optional[Union[str, Dict]] = None, options: Optional[Dict] = None
+    ) -> str:
+        """
+        Run a prompt and return the generated text.
+
+        Args:
+            prompt: Prompt text
+            model: Ollama model name
+            format: "json" or a JSON schema to constrain the output
+            options: Model options such as temperature
+
+        Raises:
+            OllamaError: If the request still fails after retries
+        """
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+        }
+        if format is not None:
+            payload["format"] = format
+        if options:
+            payload["options"] = options
+
+        started = time.perf_counter()
+        try:
+            body = self._post(payload)
+        except OllamaError:
+            with self._lock:
+                self._errors += 1
+            raise
+
+        self._record(model, time.perf_counter() - started, body)
+        return body.get("response", "")
+
+    def generate_json(
+        self, prompt: str, model: str = "gemma3",
+        schema: Optional[Dict] = None, options: Optional[Dict] = None
+    ) -> Optional[Any]:
+        """
+        Run a prompt in JSON mode and parse the result once.
+
+        Returns:
+            The parsed JSON value, or None if the model's output wasn't valid JSON
+        """
+        response = self.generate(prompt, model=model, format=schema or "json", options=options)
+        parsed = try_parse_json(response)
+        if parsed is None:
+            logger.debug(f"Unparseable JSON from {model}: {response[:200]}")
+        return parsed
+
+    def _post(self, payload: Dict) -> Dict:
+        url = f"{self.base_url}/api/generate"
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                error = OllamaError(f"HTTP {response.status_code}: {response.text[:200]}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = OllamaError(str(e))
+            except (requests.HTTPError, ValueError) as e:
+                raise OllamaError(str(e)) from e
+
+            if attempt < self.max_retries:
+                logger.warning(f"Ollama request failed (attempt {attempt + 1}/{self.max_retries + 1}): {error}")
+                time.sleep(delay)
+                delay *= 2
+        raise error
+
+    def _record(self, model: str, seconds: float, body: Dict):
+        # Ollama reports durations in nanoseconds
+        eval_seconds = body.get("eval_duration", 0) / 1e9
+        prompt_seconds = body.get("prompt_eval_duration", 0) / 1e9
+        with self._lock:
+            self._metrics.append({
+                "model": model,
+                "seconds": seconds,
+                "load_seconds": body.get("load_duration", 0) / 1e9,
+                "prompt_tokens": body.get("prompt_eval_count", 0),
+                "prompt_seconds": prompt_seconds,
+                "eval_tokens": body.get("eval_count", 0),
+                "eval_seconds": eval_seconds,
+            })
+
+    def metrics_summary(self) -> Dict[str, Any]:
+        """Summarize recorded calls: count, latency percentiles and token throughput."""
+        with self._lock:
+            metrics = list(self._metrics)
+            errors = self._errors
+
+        summary = {"calls": len(metrics), "errors": errors}
+        if not metrics:
+            return summary
+
+        latencies = np.array([m["seconds"] for m in metrics])
+        prompt_seconds = sum(m["prompt_seconds"] for m in metrics)
+        eval_seconds = sum(m["eval_seconds"] for m in metrics)
+        summary.update({
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p90": float(np.percentile(latencies, 90)),
+            "latency_p99": float(np.percentile(latencies, 99)),
+            "latency_max": float(latencies.max()),
+            "total_seconds": float(latencies.sum()),
+            "load_seconds": sum(m["load_seconds"] for m in metrics),
+            "prompt_tokens": sum(m["prompt_tokens"] for m in metrics),
+            "eval_tokens": sum(m["eval_tokens"] for m in metrics),
+            "prompt_tokens_per_second": (
+                sum(m["prompt_tokens"] for m in metrics) / prompt_seconds if prompt_seconds else None
+            ),
+            "eval_tokens_per_second": (
+                sum(m["eval_tokens"] for m in metrics) / eval_seconds if eval_seconds else None
+            ),
+        })
+        return summary
+
+class StubOllamaClient(OllamaClient):
+    """
+    OllamaClient that answers locally instead of calling the server.
+
+    Used for dry runs and benchmarks: responses come from `responder` after
+    a fixed simulated latency, and are recorded in the same metrics as real
+    calls, so everything around the LLM can be measured on its own.
+    """
+
+    def __init__(self, responder: Callable[[str], str], latency: float = 0.0, tokens_per_second: float = 50.0, **kwargs):
+        """
+        Initialize the stub.
+
+        Args:
+            responder: Returns the response text for a prompt
+            latency: Seconds each call sleeps, standing in for inference time
+            tokens_per_second: Throughput reported in the simulated token counts
+            **kwargs: Passed to OllamaClient
+        """
+        super().__init__(**kwargs)
+        self.responder = responder
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    def _post(self, payload: Dict) -> Dict:
+        if not payload.get("prompt"):
+            return {"response": "", "load_duration": 0}
+        if self.latency:
+            time.sleep(self.latency)
+        response = self.responder(payload["prompt"])
+        # Rough whitespace token counts, so throughput figures stay meaningful
+        eval_count = len(response.split())
+        return {
+            "response": response,
+            "prompt_eval_count": len(payload["prompt"].split()),
+            "prompt_eval_duration": 0,
+            "eval_count": eval_count,
+            "eval_duration": int(eval_count / self.tokens_per_second * 1e9),
+            "load_duration": 0,
+        }
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_default_client() -> OllamaClient:
+    """Shared client, so callers without their own reuse one connection pool."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OllamaClient()
+        return _default_client
+
+def query_ollama(prompt: str, model: str = "gemma3") -> str:
+    """Send a query to Ollama and return the response text ("" if the request failed)."""
     try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()['response']
-        
+        return get_default_client().generate(prompt, model=model)
     except Exception as e:
-        print(f"Error querying Ollama: {str(e)}")
-        return {}
+        logger.error(f"Error querying Ollama: {e}")
+        return ""
 
@@ -0,0 +1,175 @@
+"""Nearest-neighbour merchant resolution over already-parsed transaction descriptions."""
+
+import os
+import re
+import json
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from .db import FinanceDB
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Cosine similarity a neighbour must reach before its merchant is reused
+DEFAULT_SIMILARITY_THRESHOLD = 0.85
+
+INDEX_VERSION = 1
+
+# Query rows scored per matrix product, bounding the dense similarity block
+SCORE_CHUNK_SIZE = 2048
+
+# Parts of a description that vary between purchases at the same merchant
+_VALUE_DATE = re.compile(r'\s*Value Date:\s*\d{2}/\d{2}/\d{4}', re.IGNORECASE)
+_CARD_SUFFIX = re.compile(r'\s+Card\s+xx\d{4}.*$')
+_DIGITS = re.compile(r'\d')
+
+
+def embedding_text(description: str) -> str:
+    """Reduce a description to the text that identifies its merchant."""
+    text = _VALUE_DATE.sub('', description)
+    text = _CARD_SUFFIX.sub('', text)
+    text = _DIGITS.sub('0', text)
+    return ' '.join(text.upper().split())
+
+
+class MerchantIndex:
+    """
+    Brute-force cosine index of descriptions -> (merchant_name, transaction_type).
+
+    Descriptions are embedded as L2-normalised hashed character n-grams, so a
+    query is a single sparse matrix-vector product. The matrix and labels are
+    persisted next to the database and topped up incrementally from the
+    transactions table on load.
+    """
+
+    def __init__(self, db: FinanceDB, threshold: float = DEFAULT_SIMILARITY_THRESHOLD):
+        """
+        Initialize the index.
+
+        Args:
+            db: Database whose transactions seed the index
+            threshold: Minimum cosine similarity for lookup() to return a match
+        """
+        self.db = db
+        self.threshold = threshold
+        self.vectorizer = HashingVectorizer(
+            analyzer='char_wb', ngram_range=(3, 4), n_features=2 ** 18,
+            alternate_sign=False, norm='l2'
+        )
+        self.matrix = sparse.csr_matrix((0, self.vectorizer.n_features), dtype=np.float64)
+        self.labels: List[Tuple[str, str]] = []
+        self.texts: dict = {}
+        self.last_transaction_id = 0
+
+        base = os.path.splitext(db.db_path)[0]
+        self.matrix_path = f"{base}.merchants.npz"
+        self.meta_path = f"{base}.merchants.json"
+
+    @classmethod
+    def load(cls, db: FinanceDB, threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> "MerchantIndex":
+        """Load the persisted index (if any) and add transactions parsed since it was saved."""
+        index = cls(db, threshold)
+        if os.path.exists(index.matrix_path) and os.path.exists(index.meta_path):
+            try:
+                with open(index.meta_path) as f:
+                    meta = json.load(f)
+                if meta.get('version') == INDEX_VERSION:
+                    index.matrix = sparse.load_npz(index.matrix_path).tocsr()
+                    index.labels = [tuple(label) for label in meta['labels']]
+                    index.texts = {text: i for i, text in enumerate(meta['texts'])}
+                    index.last_transaction_id = meta['last_transaction_id']
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Rebuilding merchant index, could not load {index.matrix_path}: {e}")
+                index = cls(db, threshold)
+
+        added = index.refresh()
+        logger.info(f"Merchant index has {len(index.labels)} entries ({added} new)")
+        return index
+
+    def refresh(self) -> int:
+        """Add descriptions parsed into the transactions table since the last refresh."""
+        rows = self.db.run_query_pandas("""
+            SELECT id, original_description, merchant_name, transaction_type
+            FROM transactions
+            WHERE id > ?
+              AND merchant_name IS NOT NULL
+              AND transaction_type IS NOT NULL
+              AND transaction_type != 'Unknown'
+            ORDER BY id
+        """, params=(self.last_transaction_id,))
+        if rows.empty:
+            return 0
+
+        added = self.add_many(
+            rows['original_description'].tolist(),
+            list(zip(rows['merchant_name'], rows['transaction_type']))
+        )
+        self.last_transaction_id = int(rows['id'].max())
+        return added
+
+    def add_many(self, descriptions: List[str], labels: List[Tuple[str, str]]) -> int:
+        """
+        Add parsed descriptions, keeping the first label seen for each text.
+
+        Returns:
+            Number of new entries
+        """
+        new_texts, new_labels = [], []
+        for description, label in zip(descriptions, labels):
+            text = embedding_text(description)
+            if text and text not in self.texts:
+                self.texts[text] = len(self.labels) + len(new_labels)
+                new_texts.append(text)
+                new_labels.append(tuple(label))
+
+        if new_texts:
+            self.matrix = sparse.vstack([self.matrix, self.vectorizer.transform(new_texts)], format='csr')
+            self.labels.extend(new_labels)
+        return len(new_texts)
+
+    def lookup_many(self, descriptions: List[str]) -> List[Optional[Tuple[str, str, float]]]:
+        """
+        Find the nearest indexed neighbour of each description.
+
+        Returns:
+            (merchant_name, transaction_type, similarity) per description, or
+            None where no neighbour clears the threshold
+        """
+        if not descriptions or not self.labels:
+            return [None] * len(descriptions)
+
+        results = []
+        for start in range(0, len(descriptions), SCORE_CHUNK_SIZE):
+            chunk = descriptions[start:start + SCORE_CHUNK_SIZE]
+            queries = self.vectorizer.transform([embedding_text(d) for d in chunk])
+            similarities = (queries @ self.matrix.T).toarray()
+            best = similarities.argmax(axis=1)
+            scores = similarities[np.arange(len(chunk)), best]
+            results.extend(
+                (*self.labels[i], float(score)) if score >= self.threshold else None
+                for i, score in zip(best, scores)
+            )
+        return results
+
+    def lookup(self, description: str) -> Optional[Tuple[str, str, float]]:
+        return self.lookup_many([description])[0]
+
+    def save(self):
+        """Persist the index next to the database."""
+        sparse.save_npz(self.matrix_path, self.matrix)
+        texts = sorted(self.texts, key=self.texts.get)
+        with open(self.meta_path, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'last_transaction_id': self.last_transaction_id,
+                'labels': self.labels,
+                'texts': texts,
+            }, f)
@@ -0,0 +1,267 @@
+"""Resumable background re-parse of historical transactions with the current parser."""
+
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .db import FinanceDB
+from .dataloader_commbank import CommBankLoader
+from .dataloader_westpac import WestpacLoader
+from .merchant_index import MerchantIndex
+from .statement_loader import PARSED_FIELDS
+from .upload_jobs import _now
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Loader whose parse_descriptions re-parses each source, built from (db, model).
+# The merchant index is left out: it would copy merchants from the very
+# rows being re-parsed.
+REPARSERS = {
+    'commbank': lambda db, model: CommBankLoader(db, model=model, use_merchant_index=False),
+    'westpac': lambda db, model: WestpacLoader(db),
+}
+
+DEFAULT_REPARSE_BATCH_SIZE = 500
+
+
+class ReparseJobRunner:
+    """
+    Re-parses rows whose parser_version isn't the current one, one job at a time.
+
+    Rows are taken in id order, parsed a batch at a time through the
+    loader's rules, parse cache and LLM, and updated in place; dates,
+    amounts and hashes are never touched. Merchants the new parse renames
+    keep their categories (see FinanceDB.update_transaction_parses) and are
+    counted and logged. Progress (the last transaction id handled) is
+    stored in reparse_jobs after every batch, so a job stopped by a restart
+    continues where it left off. A finished job rebuilds the merchant index
+    so lookups see the new merchant names.
+    """
+
+    def __init__(self, db: FinanceDB, batch_size: int = DEFAULT_REPARSE_BATCH_SIZE):
+        """
+        Initialize the runner.
+
+        Args:
+            db: Database whose transactions are re-parsed
+            batch_size: Rows parsed and updated together
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active = set()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, source: str = 'commbank', model: str = "gemma3") -> Dict[str, Any]:
+        """
+        Queue a re-parse of every outdated row of a source.
+
+        A job already queued or running for the source is returned instead
+        of starting a second one.
+
+        Returns:
+            The stored job
+        """
+        job = self.create_job(source, model)
+        self._enqueue(job['id'])
+        return self.db.get_reparse_job(job['id'])
+
+    def create_job(self, source: str = 'commbank', model: str = "gemma3") -> Dict[str, Any]:
+        """Record a re-parse job without running it (or return the source's unfinished one)."""
+        if source not in REPARSERS:
+            raise ValueError(f"Unsupported re-parse source: {source}")
+
+        unfinished = self.db.get_unfinished_reparse_jobs()
+        existing = unfinished[unfinished['source'] == source]
+        if len(existing):
+            return self.db.get_reparse_job(existing['id'].iloc[0])
+
+        parser_version = REPARSERS[source](self.db, model).parser_version
+        job_id = uuid.uuid4().hex[:12]
+        self.db.create_reparse_job({
+            'id': job_id,
+            'source': source,
+            'model': model,
+            'parser_version': parser_version,
+            'total_rows': self.db.count_outdated_transactions(source, parser_version),
+        })
+        return self.db.get_reparse_job(job_id)
+
+    def resume_unfinished(self) -> int:
+        """Re-queue jobs left queued or running by a previous server process."""
+        jobs = self.db.get_unfinished_reparse_jobs()
+        for job_id in jobs['id']:
+            self._enqueue(job_id)
+        if len(jobs):
+            logger.info(f"Resuming {len(jobs)} unfinished re-parse jobs")
+        return len(jobs)
+
+    def shutdown(self):
+        """Stop taking new work and pause the running job after its current batch."""
+        self._stop.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._active.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def active_jobs(self) -> List[str]:
+        with self._lock:
+            return sorted(self._active)
+
+    def _enqueue(self, job_id: str):
+        with self._lock:
+            if job_id in self._active:
+                return
+            self._active.add(job_id)
+            if self._executor is None:
+                self._stop.clear()
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reparse-job")
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str):
+        try:
+            self.run_job(job_id, stop=self._stop)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def run_job(self, job_id: str, stop: Optional[threading.Event] = None) -> Optional[Dict[str, Any]]:
+        """
+        Run (or resume) a job in the calling thread.
+
+        Args:
+            job_id: Job to run
+            stop: Set to pause the job after the current batch
+
+        Returns:
+            The job as stored when the run ended
+        """
+        job = self.db.get_reparse_job(job_id)
+        if job is None:
+            logger.warning(f"Re-parse job {job_id} disappeared before it ran")
+            return None
+
+        source, version = job['source'], job['parser_version']
+        last_id = job['last_transaction_id'] or 0
+        progress = {key: job[key] or 0 for key in ('rows_done', 'rows_updated', 'rows_failed', 'merchants_renamed')}
+        self.db.update_reparse_job(
+            job_id, status='running', attempts=(job['attempts'] or 0) + 1,
+            started_at=job['started_at'] or _now(), error_message=None
+        )
+        logger.info(f"{'Resuming' if last_id else 'Starting'} re-parse job {job_id}: "
+                    f"{source} rows to {version}" + (f" after id {last_id}" if last_id else ""))
+
+        started = time.perf_counter()
+        rows_this_run = 0
+        try:
+            loader = REPARSERS[source](self.db, job['model'] or "gemma3")
+            with loader.parsing_session():
+                while not (stop and stop.is_set()):
+                    batch = self.db.get_outdated_transactions(source, version, after_id=last_id, limit=self.batch_size)
+                    if batch.empty:
+                        break
+
+                    updated, failed, renames = self._reparse_batch(loader, batch, version)
+                    last_id = int(batch['id'].max())
+                    rows_this_run += len(batch)
+                    progress['rows_done'] += len(batch)
+                    progress['rows_updated'] += updated
+                    progress['rows_failed'] += failed
+                    progress['merchants_renamed'] += len(renames)
+                    for old, new in renames:
+                        logger.info(f"Re-parse job {job_id} renamed merchant '{old}' -> '{new}' "
+                                    f"(categories carried over)")
+
+                    seconds = time.perf_counter() - started
+                    self.db.update_reparse_job(
+                        job_id, last_transaction_id=last_id, **progress,
+                        rows_per_second=rows_this_run / seconds if seconds else None
+                    )
+                    logger.info(f"Re-parse job {job_id}: {progress['rows_done']}/{job['total_rows']} rows "
+                                f"({progress['rows_failed']} failed)")
+        except Exception as e:
+            logger.error(f"Re-parse job {job_id} failed: {e}")
+            self.db.update_reparse_job(job_id, status='failed', error_message=str(e), completed_at=_now())
+            return self.db.get_reparse_job(job_id)
+
+        if stop and stop.is_set():
+            self.db.update_reparse_job(job_id, status='queued')
+            logger.info(f"Re-parse job {job_id} paused after id {last_id}")
+        else:
+            if rows_this_run:
+                self._rebuild_merchant_index()
+            self.db.update_reparse_job(job_id, status='completed', completed_at=_now())
+            logger.info(f"Re-parse job {job_id} completed: {progress['rows_updated']} rows updated, "
+                        f"{progress['merchants_renamed']} merchants renamed, "
+                        f"{progress['rows_failed']} left for a later run")
+        return self.db.get_reparse_job(job_id)
+
+    def _rebuild_merchant_index(self):
+        """Rebuild the persisted merchant index; re-parsed rows keep their ids, so a refresh would miss them."""
+        try:
+            index = MerchantIndex(self.db)
+            index.refresh()
+            index.save()
+            logger.info(f"Rebuilt merchant index with {len(index.labels)} entries")
+        except Exception as e:
+            logger.warning(f"Could not rebuild merchant index after re-parse: {e}")
+
+    @staticmethod
+    def _reparse_batch(loader, batch, version):
+        """
+        Parse a batch of rows and update the ones that parsed; failures keep their old parse.
+
+        Returns:
+            (rows updated, rows failed, (old, new) merchant renames)
+        """
+        loader.parse_failures = set()
+        parsed_by_description = loader.parse_descriptions(list(dict.fromkeys(batch['original_description'])))
+
+        updates = []
+        for transaction_id, description in zip(batch['id'], batch['original_description']):
+            if description in loader.parse_failures:
+                continue
+            parsed = parsed_by_description[description]
+            updates.append({
+                'id': int(transaction_id),
+                **{field: parsed.get(field) for field in PARSED_FIELDS},
+                'parser_version': version,
+            })
+
+        if not updates:
+            return 0, len(batch), []
+        result = loader.db.update_transaction_parses(updates)
+        return result['updated'], len(batch) - len(updates), result['renames']
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-parse transactions produced by an older parser version")
+    parser.add_argument("--db-path", "-d", help="Database path", type=str, default="data/finance-prod.db")
+    parser.add_argument("--source", help="Statement source to re-parse", choices=sorted(REPARSERS), default="commbank")
+    parser.add_argument("--model", "-m", help="LLM model to use", type=str, default="gemma3")
+    parser.add_argument("--batch-size", "-b", help="Rows parsed and updated together", type=int, default=DEFAULT_REPARSE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = FinanceDB(args.db_path)
+    print(db.get_parser_version_counts(args.source).to_string(index=False))
+
+    # Picks up an interrupted job for the source rather than starting over
+    runner = ReparseJobRunner(db, batch_size=args.batch_size)
+    job = runner.create_job(args.source, args.model)
+    job = runner.run_job(job['id'])
+
+    print(f"\nRe-parse job {job['id']} {job['status']}: {job['rows_updated']} updated, "
+          f"{job['rows_failed']} failed of {job['rows_done']} rows, "
+          f"{job['merchants_renamed']} merchants renamed")
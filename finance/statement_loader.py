@@ -0,0 +1,434 @@
+"""Shared ingestion core for bank statement CSVs."""
+
+import csv
+import time
+import hashlib
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from tqdm import tqdm
+
+from .db import FinanceDB
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+Column = Union[int, str]
+
+PARSED_FIELDS = ("merchant_name", "transaction_type", "location", "currency", "last_4_card_number")
+
+# Pipeline stages timed in StatementLoader.stage_seconds
+STAGES = ("read", "normalize", "dedupe", "parse", "insert")
+
+
+class ColumnMapping:
+    """
+    Where a statement CSV keeps each transaction field.
+
+    Columns are given as zero-based positions or as header names (matched
+    case-insensitively). A statement has either a signed `amount` column or
+    separate `debit` and `credit` columns.
+    """
+
+    def __init__(
+        self,
+        date: Column,
+        description: Column,
+        amount: Optional[Column] = None,
+        debit: Optional[Column] = None,
+        credit: Optional[Column] = None,
+        balance: Optional[Column] = None,
+        date_format: str = "%d/%m/%Y",
+        has_header: Optional[bool] = None
+    ):
+        """
+        Initialize the mapping.
+
+        Args:
+            date: Transaction date column
+            description: Description column
+            amount: Signed amount column
+            debit: Money-out column, used with credit instead of amount
+            credit: Money-in column, used with debit instead of amount
+            balance: Running balance column
+            date_format: strptime format of the date column
+            has_header: Whether the first row is a header; None detects it
+                        (a header is required when columns are named)
+        """
+        if amount is None and (debit is None or credit is None):
+            raise ValueError("Column mapping needs an amount column or both debit and credit columns")
+
+        self.columns = {
+            'date': date, 'description': description, 'amount': amount,
+            'debit': debit, 'credit': credit, 'balance': balance,
+        }
+        self.date_format = date_format
+        self.uses_names = any(isinstance(c, str) for c in self.columns.values())
+        self.has_header = True if self.uses_names else has_header
+
+    @classmethod
+    def from_dict(cls, mapping: dict) -> "ColumnMapping":
+        """Build a mapping from a dict such as {"date": "Date", "amount": "Amount", ...}."""
+        return cls(**mapping)
+
+    def resolve(self, header: Optional[List[str]]) -> Dict[str, Optional[int]]:
+        """Map each field to a column position, using the header row for named columns."""
+        names = {name.strip().lower(): i for i, name in enumerate(header or [])}
+        positions = {}
+        for field, column in self.columns.items():
+            if isinstance(column, str):
+                if column.strip().lower() not in names:
+                    raise ValueError(f"Column '{column}' not found in header: {header}")
+                positions[field] = names[column.strip().lower()]
+            else:
+                positions[field] = column
+        return positions
+
+    def looks_like_header(self, row: List[str]) -> bool:
+        """
+        True if a first row is column labels rather than a transaction.
+
+        The date cell must not hold a date and some cell must read like a
+        label (a field name such as "Amount", or a "... Date" heading), so
+        blank or malformed first rows stay data and are counted as such.
+        """
+        position = self.columns['date']
+        if isinstance(position, str):
+            return True
+        if position < len(row) and not pd.isna(
+            pd.to_datetime(row[position].strip(), format=self.date_format, errors='coerce')
+        ):
+            return False
+        cells = [cell.strip().lower() for cell in row]
+        return any(cell in self.columns or 'date' in cell.split() for cell in cells)
+
+
+def hash_rows(dates: pd.Series, descriptions: pd.Series, amounts: pd.Series) -> List[str]:
+    """calculate_row_hash over whole columns."""
+    keys = dates + '|' + descriptions + '|' + amounts
+    return [hashlib.sha256(key.encode()).hexdigest() for key in keys]
+
+
+def parse_amounts(values: pd.Series) -> pd.Series:
+    """Convert amount strings such as "-$1,234.50" to floats (NaN if unparseable)."""
+    cleaned = values.fillna('').astype(str).str.replace(r'[$,\s]', '', regex=True)
+    return pd.to_numeric(cleaned.where(cleaned != '', None), errors='coerce')
+
+
+def plain_description(description: str) -> dict:
+    """Description parser that keeps the description as the merchant name."""
+    return {
+        "merchant_name": ' '.join(description.split())[:50] or "Unknown",
+        "transaction_type": None,
+        "location": None,
+        "currency": None,
+        "last_4_card_number": None,
+    }
+
+
+class StatementLoader:
+    """
+    Vectorized CSV rows -> dedupe -> description parsing -> bulk insert.
+
+    Rows are taken in fixed-size batches. Each batch becomes a DataFrame
+    whose dates, amounts and hashes are normalized column-wise, is deduped
+    against itself and the database with one query, and is committed with
+    one executemany, so memory stays flat and progress is durable per batch.
+
+    Bank loaders subclass this with a `source`, a `mapping` and, where the
+    descriptions carry structure, `parse_descriptions`.
+    """
+
+    source = "csv"
+    mapping: ColumnMapping = None
+    # Recorded on every row; bump when parse_descriptions changes its output
+    parser_version = "plain-1"
+
+    def __init__(self, db: FinanceDB, batch_size: int = 1000, mapping: Optional[ColumnMapping] = None):
+        """
+        Initialize the loader.
+
+        Args:
+            db: FinanceDB to insert into
+            batch_size: Rows normalized, parsed and committed together
+            mapping: Column mapping, overriding the class default
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        if mapping is not None:
+            self.mapping = mapping
+        if self.mapping is None:
+            raise ValueError(f"{type(self).__name__} needs a column mapping")
+        self.positions = None if self.mapping.uses_names else self.mapping.resolve(None)
+        self.stats = {'rows': 0, 'inserted': 0, 'skipped': 0, 'failed': 0}
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        # Descriptions whose parse fell back to a default in the current
+        # batch; their rows get no parser_version so a re-parse retries them
+        self.parse_failures = set()
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Add the wall time of the block to stage_seconds[stage]."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + time.perf_counter() - started
+
+    def iter_rows(self, lines: Iterable[str]) -> Iterator[Tuple[int, List[str]]]:
+        """
+        Lazily parse CSV lines into (row_number, row) pairs, dropping the header row.
+
+        Works on any iterable of lines (an open file, an upload being
+        received), so only the rows currently in flight are held in memory.
+        """
+        reader = csv.reader(lines)
+        first_row = next(reader, None)
+        if first_row is None:
+            return
+
+        has_header = self.mapping.has_header
+        if has_header is None:
+            has_header = self.mapping.looks_like_header(first_row)
+        if has_header:
+            logger.info(f"Detected header row: {first_row}")
+            self.positions = self.mapping.resolve(first_row)
+        else:
+            logger.info(f"No header row detected. First data row: {first_row}")
+            yield 1, first_row
+
+        for row_number, row in enumerate(reader, start=2):
+            yield row_number, row
+
+    @contextmanager
+    def parsing_session(self):
+        """Hold resources that parse_descriptions shares across batches (e.g. a worker pool)."""
+        yield
+
+    def parse_descriptions(self, descriptions: List[str]) -> Dict[str, dict]:
+        """Parse each distinct description into merchant fields (add failed ones to parse_failures)."""
+        return {description: plain_description(description) for description in descriptions}
+
+    def hash_amounts(self, raw_amounts: pd.Series, amounts: pd.Series) -> pd.Series:
+        """Amount strings that go into row hashes (raw_amounts are after signed_amounts)."""
+        return amounts.map('{:.2f}'.format)
+
+    def load_rows(
+        self, rows: Iterable[Tuple[int, List[str]]],
+        on_batch: Optional[Callable[[dict, int], None]] = None
+    ) -> dict:
+        """
+        Ingest (row_number, row) pairs batch by batch.
+
+        Args:
+            rows: Numbered CSV rows, e.g. from iter_rows
+            on_batch: Called after each batch commits with the running stats
+                      and the last row number in the batch
+
+        Returns:
+            Counters for rows read, inserted, skipped and failed, plus any
+            loader-specific stats
+        """
+        started = time.perf_counter()
+
+        def process(batch):
+            self.process_batch(batch)
+            progress.update(len(batch))
+            if on_batch is not None:
+                self.stats['seconds'] = time.perf_counter() - started
+                on_batch(self.stats, batch[-1][0])
+
+        with self.parsing_session(), \
+                tqdm(desc=f"Processing {self.source} transactions", unit=" rows") as progress:
+            batch = []
+            # Time spent pulling rows out of the source counts as reading
+            read_started = time.perf_counter()
+            for numbered_row in rows:
+                batch.append(numbered_row)
+                if len(batch) >= self.batch_size:
+                    self.stage_seconds['read'] += time.perf_counter() - read_started
+                    process(batch)
+                    batch = []
+                    read_started = time.perf_counter()
+            self.stage_seconds['read'] += time.perf_counter() - read_started
+            if batch:
+                process(batch)
+
+        self.stats['seconds'] = time.perf_counter() - started
+        self.log_summary()
+        return dict(self.stats)
+
+    def load_file(self, file_path: str, on_batch: Optional[Callable[[dict, int], None]] = None) -> dict:
+        """Ingest a whole statement file."""
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            return self.load_rows(self.iter_rows(f), on_batch=on_batch)
+
+    def normalize(self, batch: List[Tuple[int, List[str]]]) -> pd.DataFrame:
+        """
+        Normalize a batch of raw rows column-wise.
+
+        Returns:
+            One row per usable transaction with row_number, date (YYYY-MM-DD),
+            amount, balance, original_description and hash; skipped and
+            failed rows are counted in stats and dropped
+        """
+        if self.positions is None:
+            raise ValueError("Statement has named columns but no header row was read")
+        positions = self.positions
+        raw = pd.DataFrame.from_records([row for _, row in batch])
+        raw.index = [row_number for row_number, _ in batch]
+
+        def column(field, strip=True):
+            position = positions[field]
+            if position is None:
+                return None
+            if position not in raw.columns:
+                return pd.Series(None, index=raw.index, dtype=object)
+            values = raw[position].astype(object).where(raw[position].notna(), None)
+            return values.str.strip() if strip else values
+
+        dates_raw = column('date')
+        # Descriptions are hashed and stored exactly as exported
+        descriptions = column('description', strip=False)
+        if positions['amount'] is not None:
+            raw_amounts = self.signed_amounts(column('amount'))
+            amounts = parse_amounts(raw_amounts)
+        else:
+            debit, credit = column('debit'), column('credit')
+            has_debit, has_credit = debit.fillna('') != '', credit.fillna('') != ''
+            raw_amounts = credit.where(has_credit, debit.fillna(''))
+            debits, credits = parse_amounts(debit), parse_amounts(credit)
+            amounts = credits.fillna(0) - debits.abs().fillna(0)
+            # A filled-in cell that isn't a number makes the row invalid, not zero
+            unreadable = (has_debit & debits.isna()) | (has_credit & credits.isna())
+            amounts = amounts.where((has_credit | has_debit) & ~unreadable)
+
+        # Rows without a date or amount are blank lines and footers, not errors
+        incomplete = (dates_raw.fillna('') == '') | (raw_amounts.fillna('') == '') | descriptions.isna()
+        dates = pd.to_datetime(dates_raw, format=self.mapping.date_format, errors='coerce')
+        invalid = ~incomplete & (dates.isna() | amounts.isna())
+
+        for row_number in raw.index[incomplete]:
+            logger.debug(f"Skipping row {row_number}: Incomplete data")
+        for row_number in raw.index[invalid]:
+            logger.warning(f"Row {row_number} has an unreadable date or amount: {raw.loc[row_number].tolist()}")
+        self.stats['skipped'] += int(incomplete.sum())
+        self.stats['failed'] += int(invalid.sum())
+
+        keep = ~(incomplete | invalid)
+        frame = pd.DataFrame({
+            'row_number': raw.index[keep],
+            'date': dates[keep].dt.strftime('%Y-%m-%d').values,
+            'amount': amounts[keep].values,
+            'balance': parse_amounts(column('balance'))[keep].values if positions['balance'] is not None else None,
+            'original_description': descriptions[keep].astype(str).values,
+        })
+        frame['hash'] = hash_rows(
+            frame['date'], frame['original_description'],
+            self.hash_amounts(raw_amounts[keep].reset_index(drop=True), frame['amount'])
+        )
+        return frame
+
+    def signed_amounts(self, raw_amounts: pd.Series) -> pd.Series:
+        """Hook for statements whose amount column isn't signed the usual way."""
+        return raw_amounts
+
+    def process_batch(self, batch: List[Tuple[int, List[str]]]):
+        self.stats['rows'] += len(batch)
+
+        # Stage 1: normalize, then drop duplicates within the batch and
+        # against the database (which already holds every earlier batch)
+        with self.timed('normalize'):
+            frame = self.normalize(batch)
+        with self.timed('dedupe'):
+            duplicated = frame['hash'].duplicated()
+            existing = self.db.existing_hashes(frame['hash'].tolist())
+            duplicated |= frame['hash'].isin(existing)
+            self.stats['skipped'] += int(duplicated.sum())
+            frame = frame[~duplicated]
+        if frame.empty:
+            return
+
+        # Stage 2: parse each distinct description once
+        self.parse_failures = set()
+        with self.timed('parse'):
+            parsed_by_description = self.parse_descriptions(list(dict.fromkeys(frame['original_description'])))
+            parsed = pd.DataFrame(
+                [parsed_by_description[d] for d in frame['original_description']], columns=list(PARSED_FIELDS)
+            )
+
+        # Stage 3: insert in file order, committing the whole batch at once
+        records = pd.concat([frame.reset_index(drop=True), parsed], axis=1)
+        records['source'] = self.source
+        records['parser_version'] = self.parser_version
+        if self.parse_failures:
+            records.loc[records['original_description'].isin(self.parse_failures), 'parser_version'] = None
+        records = records.drop(columns='row_number').astype(object)
+        records = records.where(records.notna(), None).to_dict(orient='records')
+        try:
+            with self.timed('insert'):
+                inserted = self.db.insert_transactions(records)
+            self.stats['inserted'] += inserted
+            self.stats['skipped'] += len(records) - inserted
+        except Exception as e:
+            logger.error(f"Database error inserting batch starting at row {int(frame['row_number'].iloc[0])}: {e}")
+            self.stats['failed'] += len(records)
+
+    def log_summary(self):
+        stats = self.stats
+        logger.info(f"Processing complete. Transactions added to database: {stats['inserted']}")
+        logger.info(f"Skipped rows: {stats['skipped']}")
+        logger.info(f"Failed inserts: {stats['failed']}")
+        seconds = stats.get('seconds') or 0
+        if seconds:
+            logger.info(f"{stats['rows']} rows in {seconds:.2f}s ({stats['rows'] / seconds:.0f} rows/s)")
+
+
+class MappedCSVLoader(StatementLoader):
+    """Loader for any statement CSV described by a ColumnMapping, e.g. from a config file."""
+
+    def __init__(
+        self, db: FinanceDB, mapping: ColumnMapping, source: str = "csv",
+        description_parser: Callable[[str], dict] = plain_description, batch_size: int = 1000
+    ):
+        """
+        Initialize the loader.
+
+        Args:
+            db: FinanceDB to insert into
+            mapping: Where each field lives in the CSV
+            source: Value stored in transactions.source
+            description_parser: Turns a description into merchant fields
+            batch_size: Rows normalized, parsed and committed together
+        """
+        super().__init__(db, batch_size=batch_size, mapping=mapping)
+        self.source = source
+        self.description_parser = description_parser
+
+    def parse_descriptions(self, descriptions: List[str]) -> Dict[str, dict]:
+        return {description: self.description_parser(description) for description in descriptions}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Load a bank statement CSV using a column mapping")
+    parser.add_argument("--input-file", "-i", help="Input file path", type=str, required=True)
+    parser.add_argument("--db-path", "-d", help="Database path", type=str, default="data/finance-stag.db")
+    parser.add_argument("--mapping", help='Column mapping as JSON, e.g. {"date": "Date", "amount": "Amount", '
+                                          '"description": "Description"}', type=str, required=True)
+    parser.add_argument("--source", help="Value stored in transactions.source", type=str, default="csv")
+    parser.add_argument("--batch-size", "-b", help="Rows committed together", type=int, default=1000)
+    args = parser.parse_args()
+
+    loader = MappedCSVLoader(
+        FinanceDB(args.db_path), ColumnMapping.from_dict(json.loads(args.mapping)),
+        source=args.source, batch_size=args.batch_size
+    )
+    loader.load_file(args.input_file)
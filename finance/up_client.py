@@ -1,11 +1,16 @@
 """Up Bank API client with pagination and rate limiting support."""
 
 import os
+import json
 import time
+import random
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
-from typing import Generator, Optional, List
+from typing import Generator, Iterator, Optional, List, Tuple, Union
 
 # Melbourne timezone
 MELBOURNE_TZ = ZoneInfo("Australia/Melbourne")
@@ -15,9 +20,11 @@ from dotenv import load_dotenv
 
 from .up_models import (
     UpAccount, UpTransaction, UpCategory, Money,
-    AccountType, OwnershipType, TransactionStatus
+    AccountType, OwnershipType, TransactionStatus, SyncTelemetry
 )
 
+_TRANSACTION_STATUSES = frozenset(s.value for s in TransactionStatus)
+
 load_dotenv()
 
 logging.basicConfig(
@@ -40,13 +47,38 @@ class UpBankClient:
 
     BASE_URL = "https://api.up.com.au/api/v1"
 
-    def __init__(self, api_token: Optional[str] = None):
+    # Statuses worth retrying: rate limiting and transient server errors
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        api_token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: Union[float, Tuple[float, float]] = (10.0, 30.0),
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        max_retry_after: float = 300.0,
+        record_pages_dir: Optional[str] = None
+    ):
         """
         Initialize the Up Bank client.
 
         Args:
             api_token: Up Bank personal access token. If not provided,
                       will look for UP_BANK_TOKEN environment variable.
+            base_url: API root to talk to (defaults to the real Up API;
+                      point at finance.up_fake_server for local testing)
+            timeout: Request timeout in seconds, or a (connect, read) tuple
+            max_retries: Retries per request on 429/5xx, connection errors
+                         and timeouts before giving up
+            backoff_base: First retry delay in seconds; doubles each attempt
+            backoff_max: Upper bound on a single exponential backoff delay
+            max_retry_after: Longest server-supplied Retry-After to wait out;
+                             a longer one fails the request immediately
+            record_pages_dir: If set, every raw JSON:API page fetched is also
+                              written here, for later offline import with
+                              finance.up_import
         """
         self.api_token = api_token or os.getenv("UP_BANK_TOKEN")
         if not self.api_token:
@@ -54,66 +86,213 @@ class UpBankClient:
                 "Up Bank API token required. Set UP_BANK_TOKEN env var or pass api_token."
             )
 
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.record_pages_dir = record_pages_dir
+        self._pages_recorded = 0
+        self._record_lock = threading.Lock()
+        if record_pages_dir:
+            os.makedirs(record_pages_dir, exist_ok=True)
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         })
         self._rate_limit_remaining = None
+        self._telemetry_local = threading.local()
+
+    @contextmanager
+    def collect_telemetry(self, telemetry: SyncTelemetry) -> Iterator[SyncTelemetry]:
+        """
+        Record HTTP, rate-limit sleep, parse, page and retry figures into telemetry.
+
+        Collection is per thread, so concurrent account syncs sharing one
+        client each get their own figures.
+        """
+        previous = getattr(self._telemetry_local, 'current', None)
+        self._telemetry_local.current = telemetry
+        try:
+            yield telemetry
+        finally:
+            self._telemetry_local.current = previous
+
+    @property
+    def _telemetry(self) -> Optional[SyncTelemetry]:
+        return getattr(self._telemetry_local, 'current', None)
+
+    def _send(self, method: str, url: str, params: dict = None) -> requests.Response:
+        """Send a single HTTP request, recording its latency."""
+        started = time.perf_counter()
+        try:
+            return self.session.request(method, url, params=params, timeout=self.timeout)
+        finally:
+            elapsed = time.perf_counter() - started
+            logger.debug(f"{method} {url} took {elapsed * 1000:.0f}ms")
+            telemetry = self._telemetry
+            if telemetry is not None:
+                telemetry.http_seconds += elapsed
+                telemetry.requests += 1
+                telemetry.max_request_seconds = max(telemetry.max_request_seconds, elapsed)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for the given (zero-based) retry attempt."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _sleep(self, seconds: float):
+        """Sleep for rate limiting or backoff, counting the time against the current run."""
+        time.sleep(seconds)
+        telemetry = self._telemetry
+        if telemetry is not None:
+            telemetry.rate_limit_sleep_seconds += seconds
+
+    @property
+    def rate_limit_remaining(self) -> Optional[int]:
+        """Requests left in the current rate limit window, as last reported by the API."""
+        try:
+            return int(self._rate_limit_remaining)
+        except (TypeError, ValueError):
+            return None
+
+    def _request(
+        self, method: str, endpoint: str, params: dict = None,
+        max_retries: Optional[int] = None
+    ) -> dict:
+        """
+        Make an API request with rate limiting and bounded retries.
+
+        429 and 5xx responses, connection errors and timeouts are retried up
+        to max_retries times, waiting Retry-After when the API sends one and
+        exponential backoff with jitter otherwise. A Retry-After longer than
+        max_retry_after raises UpBankAPIError straight away.
+
+        Args:
+            method: HTTP method
+            endpoint: Path relative to base_url, or a full URL (pagination links)
+            params: Query parameters
+            max_retries: Override the client's max_retries for this request
+        """
+        url = endpoint if endpoint.startswith("http") else f"{self.base_url}{endpoint}"
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        for attempt in range(max_retries + 1):
+            retries_left = attempt < max_retries
+
+            try:
+                response = self._send(method, url, params=params)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not retries_left:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"{type(e).__name__} on {endpoint}; retrying in {delay:.1f}s")
+                self._retry_sleep(delay)
+                continue
+
+            # Track rate limit
+            self._rate_limit_remaining = response.headers.get("X-RateLimit-Remaining")
+            if self.rate_limit_remaining is not None and self.rate_limit_remaining < 10:
+                logger.warning(f"Rate limit low: {self._rate_limit_remaining} requests remaining")
+                self._sleep(1)  # Back off slightly
+
+            if response.status_code in self.RETRY_STATUSES and retries_left:
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    # Retrying before the server's hint only earns another 429
+                    delay = float(retry_after)
+                    if delay > self.max_retry_after:
+                        raise UpBankAPIError(
+                            response.status_code,
+                            f"Retry-After of {retry_after}s exceeds the {self.max_retry_after:.0f}s limit"
+                        )
+                else:
+                    delay = self._backoff_delay(attempt)
+                logger.warning(
+                    f"Up Bank API returned {response.status_code} for {endpoint}; "
+                    f"retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})"
+                )
+                self._retry_sleep(delay)
+                continue
+
+            if not response.ok:
+                try:
+                    error_msg = response.json().get("errors", [{}])[0].get("detail", response.text)
+                except ValueError:
+                    error_msg = response.text
+                raise UpBankAPIError(response.status_code, error_msg)
+
+            return response.json()
+
+    def _retry_sleep(self, seconds: float):
+        self._sleep(seconds)
+        if self._telemetry is not None:
+            self._telemetry.retries += 1
+
+    def _paginate(self, endpoint: str, params: dict = None) -> Generator[dict, None, None]:
+        """
+        Yield each page of a paginated endpoint, following links.next.
 
-    def _request(self, method: str, endpoint: str, params: dict = None) -> dict:
-        """Make an API request with rate limiting."""
-        url = f"{self.BASE_URL}{endpoint}"
+        Every page, first or subsequent, goes through _request, so all of
+        them get the same rate limiting, retries and error handling.
 
-        response = self.session.request(method, url, params=params)
+        Args:
+            endpoint: Path for the first page, or a pagination URL to resume from
+            params: Query parameters for the first page (later pages carry
+                    them in their links)
+        """
+        next_url = endpoint
 
-        # Track rate limit
-        self._rate_limit_remaining = response.headers.get("X-RateLimit-Remaining")
-        if self._rate_limit_remaining and int(self._rate_limit_remaining) < 10:
-            logger.warning(f"Rate limit low: {self._rate_limit_remaining} requests remaining")
-            time.sleep(1)  # Back off slightly
+        while next_url:
+            response = self._request("GET", next_url, params if next_url == endpoint else None)
 
-        if response.status_code == 429:
-            # Rate limited - wait and retry
-            retry_after = int(response.headers.get("Retry-After", 60))
-            logger.warning(f"Rate limited. Waiting {retry_after} seconds...")
-            time.sleep(retry_after)
-            return self._request(method, endpoint, params)
+            telemetry = self._telemetry
+            if telemetry is not None:
+                telemetry.pages += 1
 
-        if not response.ok:
-            error_msg = response.json().get("errors", [{}])[0].get("detail", response.text)
-            raise UpBankAPIError(response.status_code, error_msg)
+            if self.record_pages_dir:
+                self._record_page(next_url, response)
 
-        return response.json()
+            yield response
+            next_url = response.get("links", {}).get("next")
 
     def ping(self) -> bool:
-        """Test API connectivity and authentication."""
+        """Test API connectivity and authentication (fails fast, without retries)."""
         try:
-            self._request("GET", "/util/ping")
+            self._request("GET", "/util/ping", max_retries=0)
             logger.info("Up Bank API connection successful")
             return True
-        except UpBankAPIError as e:
+        except (UpBankAPIError, requests.RequestException) as e:
             logger.error(f"Up Bank API ping failed: {e}")
             return False
 
+    def _record_page(self, url: str, response: dict):
+        """Write a raw page to record_pages_dir, named so files sort in fetch order."""
+        path = urlsplit(url).path
+        if path.startswith(urlsplit(self.base_url).path):
+            path = path[len(urlsplit(self.base_url).path):]
+        slug = path.strip("/").replace("/", "_") or "root"
+
+        with self._record_lock:
+            self._pages_recorded += 1
+            sequence = self._pages_recorded
+
+        file_name = f"{datetime.now():%Y%m%dT%H%M%S}-{sequence:06d}-{slug}.json"
+        with open(os.path.join(self.record_pages_dir, file_name), "w") as f:
+            json.dump(response, f)
+
     def get_accounts(self) -> List[UpAccount]:
         """Fetch all Up Bank accounts."""
         accounts = []
-        next_url = "/accounts"
-
-        while next_url:
-            # Handle full URL for pagination
-            if next_url.startswith("http"):
-                response = self.session.get(next_url).json()
-            else:
-                response = self._request("GET", next_url)
 
+        for response in self._paginate("/accounts"):
             for item in response.get("data", []):
                 account = self._parse_account(item)
                 accounts.append(account)
 
-            next_url = response.get("links", {}).get("next")
-
         logger.info(f"Fetched {len(accounts)} accounts")
         return accounts
 
@@ -142,6 +321,53 @@ class UpBankClient:
             status: Filter by HELD or SETTLED
             page_size: Number of transactions per page (max 100)
         """
+        total_count = 0
+
+        for transactions, _ in self.get_transaction_pages(
+            account_id=account_id, since=since, until=until,
+            category=category, status=status, page_size=page_size
+        ):
+            for transaction in transactions:
+                yield transaction
+                total_count += 1
+
+        logger.info(f"Fetched {total_count} transactions")
+
+    def get_transaction_pages(
+        self,
+        account_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        category: Optional[str] = None,
+        status: Optional[TransactionStatus] = None,
+        page_size: int = 100,
+        start_url: Optional[str] = None,
+        as_rows: bool = False,
+        validate: bool = False
+    ) -> Generator[Tuple[list, Optional[str]], None, None]:
+        """
+        Generator yielding one page of transactions at a time.
+
+        Each item is a (transactions, next_url) tuple, where next_url is the
+        cursor for the following page (None on the last page). Passing a
+        previously yielded next_url as start_url resumes the same pagination
+        chain; the cursor already encodes the original filters.
+
+        With as_rows=True the page holds up_transactions row tuples built by
+        transaction_to_row instead of UpTransaction models, skipping the
+        pydantic round trip for bulk syncs.
+
+        Args:
+            account_id: Filter to specific account
+            since: Only transactions after this datetime
+            until: Only transactions before this datetime
+            category: Filter by Up category ID
+            status: Filter by HELD or SETTLED
+            page_size: Number of transactions per page (max 100)
+            start_url: Pagination cursor to resume from
+            as_rows: Yield DB row tuples instead of UpTransaction models
+            validate: With as_rows, check required fields, status and timestamps
+        """
         if account_id:
             endpoint = f"/accounts/{account_id}/transactions"
         else:
@@ -165,39 +391,38 @@ class UpBankClient:
         if status:
             params["filter[status]"] = status.value
 
-        next_url = endpoint
-        total_count = 0
+        if start_url:
+            endpoint, params = start_url, None
 
-        while next_url:
-            if next_url.startswith("http"):
-                response = self.session.get(next_url).json()
+        for response in self._paginate(endpoint, params):
+            parse_started = time.perf_counter()
+            if as_rows:
+                transactions = [transaction_to_row(item, validate) for item in response.get("data", [])]
             else:
-                response = self._request("GET", next_url, params if next_url == endpoint else None)
-
-            for item in response.get("data", []):
-                transaction = self._parse_transaction(item)
-                yield transaction
-                total_count += 1
-
+                transactions = [self._parse_transaction(item) for item in response.get("data", [])]
             next_url = response.get("links", {}).get("next")
 
-        logger.info(f"Fetched {total_count} transactions")
+            telemetry = self._telemetry
+            if telemetry is not None:
+                telemetry.parse_seconds += time.perf_counter() - parse_started
+
+            yield transactions, next_url
 
     def get_categories(self) -> List[UpCategory]:
         """Fetch Up's built-in category tree."""
-        response = self._request("GET", "/categories")
         categories = []
 
-        for item in response.get("data", []):
-            parent_data = item.get("relationships", {}).get("parent", {}).get("data")
-            parent_id = parent_data.get("id") if parent_data else None
+        for response in self._paginate("/categories"):
+            for item in response.get("data", []):
+                parent_data = item.get("relationships", {}).get("parent", {}).get("data")
+                parent_id = parent_data.get("id") if parent_data else None
 
-            category = UpCategory(
-                id=item["id"],
-                name=item["attributes"]["name"],
-                parent_id=parent_id
-            )
-            categories.append(category)
+                category = UpCategory(
+                    id=item["id"],
+                    name=item["attributes"]["name"],
+                    parent_id=parent_id
+                )
+                categories.append(category)
 
         logger.info(f"Fetched {len(categories)} categories")
         return categories
@@ -280,3 +505,72 @@ class UpBankClient:
             tags=tags,
             account_id=account_id
         )
+
+
+def _relationship_id(relationships: dict, name: str) -> Optional[str]:
+    data = relationships.get(name, {}).get("data")
+    return data["id"] if data else None
+
+
+def _normalize_timestamp(value: Optional[str], validate: bool) -> Optional[str]:
+    if not value:
+        return None
+    if validate:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+    return value[:-1] + "+00:00" if value.endswith("Z") else value
+
+
+def transaction_to_row(data: dict, validate: bool = False) -> tuple:
+    """
+    Map a raw JSON:API transaction straight to an up_transactions row.
+
+    Produces the same values as UpBankClient._parse_transaction followed by
+    UpBankSync._transaction_to_dict, in UP_TRANSACTION_COLUMNS order, without
+    building any pydantic models.
+
+    Args:
+        data: A single item from a transactions response's "data" list
+        validate: Check the status value and parse timestamps and amounts,
+                  raising ValueError/KeyError on malformed items
+
+    Returns:
+        Tuple of column values ready for executemany
+    """
+    attrs = data["attributes"]
+    relationships = data.get("relationships", {})
+    amount = attrs["amount"]
+    foreign = attrs.get("foreignAmount")
+    status = attrs["status"]
+
+    if validate:
+        if status not in _TRANSACTION_STATUSES:
+            raise ValueError(f"Unknown transaction status: {status}")
+        if not isinstance(attrs["description"], str):
+            raise ValueError(f"Transaction {data['id']} has no description")
+        int(amount["valueInBaseUnits"])
+
+    foreign_amount = None
+    if foreign:
+        try:
+            foreign_amount = float(foreign["value"])
+        except (ValueError, TypeError):
+            foreign_amount = None
+
+    account = relationships.get("account", {}).get("data") or {}
+
+    return (
+        data["id"],
+        account.get("id", ""),
+        status,
+        attrs.get("rawText"),
+        attrs["description"],
+        attrs.get("message"),
+        float(amount["value"]),
+        amount["currencyCode"],
+        foreign_amount,
+        foreign["currencyCode"] if foreign else None,
+        _relationship_id(relationships, "category"),
+        _relationship_id(relationships, "parentCategory"),
+        _normalize_timestamp(attrs.get("settledAt"), validate),
+        _normalize_timestamp(attrs["createdAt"], validate),
+    )
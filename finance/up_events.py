@@ -0,0 +1,99 @@
+"""In-process broadcaster for Up Bank sync progress events."""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SyncEventBroadcaster:
+    """
+    Fans sync progress events out to any number of subscribers.
+
+    Events are published from sync worker threads and delivered to asyncio
+    queues owned by SSE connections, so streaming progress to the dashboard
+    never touches the database.
+    """
+
+    def __init__(self, history: int = 50, max_queue: int = 1000):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            history: Number of recent events replayed to a new subscriber
+            max_queue: Events buffered per subscriber before the oldest are dropped
+        """
+        self.max_queue = max_queue
+        self._history = deque(maxlen=history)
+        self._subscribers: List[tuple] = []
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def publish(self, event_type: str, **data) -> dict:
+        """Publish an event to every subscriber; safe to call from any thread."""
+        with self._lock:
+            event = {
+                "id": self._next_id,
+                "type": event_type,
+                "timestamp": datetime.now().isoformat(),
+                "data": data,
+            }
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # Subscriber's event loop has closed
+                self.unsubscribe(queue)
+
+        return event
+
+    def subscribe(self, replay: bool = True) -> asyncio.Queue:
+        """
+        Register a subscriber on the running event loop.
+
+        Args:
+            replay: Queue the recent event history first, so a client that
+                    connects mid-sync sees where it is up to
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.max_queue)
+
+        with self._lock:
+            if replay:
+                for event in self._history:
+                    queue.put_nowait(event)
+            self._subscribers.append((loop, queue))
+
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers = [(l, q) for l, q in self._subscribers if q is not queue]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, event: dict):
+        if queue.full():
+            # Slow consumer: drop the oldest event rather than block the sync
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+
+def format_sse(event: Optional[dict]) -> str:
+    """Encode an event as a Server-Sent Events frame (None gives a keep-alive comment)."""
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
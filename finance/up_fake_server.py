@@ -0,0 +1,437 @@
+"""
+Local stand-in for the Up Bank API.
+
+Serves generated accounts, categories and paginated transactions in the same
+JSON:API shape as https://api.up.com.au/api/v1, including `links.next`
+cursors, `X-RateLimit-Remaining` headers, 429 responses with `Retry-After`
+and configurable latency. Point `UpBankClient(base_url=server.url)` at it to
+benchmark or load-test sync without touching the real API.
+
+Run standalone with:
+    python -m finance.up_fake_server --port 8765 --accounts 8 --transactions 2000
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlencode, urlsplit, parse_qsl
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+
+# (parent, child) category ids in the style of Up's category tree
+CATEGORIES = {
+    "good-life": ["restaurants-and-cafes", "takeaway", "pubs-and-bars", "events-and-gigs"],
+    "home": ["groceries", "rent-and-mortgage", "utilities", "internet"],
+    "personal": ["clothing-and-accessories", "health-and-medical", "technology"],
+    "transport": ["public-transport", "fuel", "taxis-and-share-cars"],
+}
+
+MERCHANTS = [
+    ("Woolworths", "groceries"),
+    ("Coles", "groceries"),
+    ("Seven Seeds", "restaurants-and-cafes"),
+    ("Uber Eats", "takeaway"),
+    ("The Tote", "pubs-and-bars"),
+    ("Myki Top Up", "public-transport"),
+    ("Uber", "taxis-and-share-cars"),
+    ("Aussie Broadband", "internet"),
+    ("AGL", "utilities"),
+    ("JB Hi-Fi", "technology"),
+    ("Chemist Warehouse", "health-and-medical"),
+    ("Uniqlo", "clothing-and-accessories"),
+]
+
+
+class FakeUpData:
+    """Deterministically generated Up Bank accounts, categories and transactions."""
+
+    def __init__(self, accounts: int = 4, transactions_per_account: int = 500, seed: int = 42):
+        """
+        Generate the fake dataset.
+
+        Args:
+            accounts: Number of accounts (the first is transactional, the rest savers)
+            transactions_per_account: Transactions generated for each account
+            seed: Random seed so repeated runs serve identical data
+        """
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+
+        self.categories = self._build_categories()
+        self.accounts: List[dict] = []
+        self.transactions: Dict[str, List[dict]] = {}
+
+        for index in range(accounts):
+            account_id = f"fake-account-{index:04d}"
+            account_type = "TRANSACTIONAL" if index == 0 else "SAVER"
+            transactions = [
+                self._build_transaction(rng, account_id, account_type, index, n, now)
+                for n in range(transactions_per_account)
+            ]
+            balance = round(1000 + sum(
+                t["attributes"]["amount"]["valueInBaseUnits"] for t in transactions
+            ) / 100, 2)
+
+            self.accounts.append({
+                "type": "accounts",
+                "id": account_id,
+                "attributes": {
+                    "displayName": "Spending" if index == 0 else f"Saver {index}",
+                    "accountType": account_type,
+                    "ownershipType": "INDIVIDUAL",
+                    "balance": _money(balance),
+                    "createdAt": _iso(now - timedelta(days=3 * 365)),
+                },
+                "relationships": {
+                    "transactions": {
+                        "links": {"related": f"{API_PREFIX}/accounts/{account_id}/transactions"}
+                    }
+                },
+            })
+            # Newest first, matching the real API ordering
+            self.transactions[account_id] = transactions
+
+    @staticmethod
+    def _build_categories() -> List[dict]:
+        categories = []
+        for parent, children in CATEGORIES.items():
+            categories.append(_category(parent, None))
+            categories.extend(_category(child, parent) for child in children)
+        return categories
+
+    @staticmethod
+    def _build_transaction(
+        rng: random.Random, account_id: str, account_type: str,
+        account_index: int, n: int, now: datetime
+    ) -> dict:
+        created_at = now - timedelta(hours=6 * n + rng.randint(0, 5))
+        held = n < 3 and account_type == "TRANSACTIONAL"
+
+        if account_type == "SAVER":
+            description = rng.choice(["Transfer from Spending", "Interest", "Transfer to Spending"])
+            value = rng.uniform(5, 200) * (-1 if description.startswith("Transfer to") else 1)
+            category = None
+        else:
+            description, category = rng.choice(MERCHANTS)
+            value = -rng.uniform(3, 150)
+
+        parent = next((p for p, children in CATEGORIES.items() if category in children), None)
+
+        return {
+            "type": "transactions",
+            "id": f"fake-tx-{account_index:04d}-{n:07d}",
+            "attributes": {
+                "status": "HELD" if held else "SETTLED",
+                "rawText": description.upper(),
+                "description": description,
+                "message": None,
+                "isCategorizable": category is not None,
+                "holdInfo": None,
+                "roundUp": None,
+                "cashback": None,
+                "amount": _money(round(value, 2)),
+                "foreignAmount": None,
+                "settledAt": None if held else _iso(created_at + timedelta(days=1)),
+                "createdAt": _iso(created_at),
+            },
+            "relationships": {
+                "account": {"data": {"type": "accounts", "id": account_id}},
+                "transferAccount": {"data": None},
+                "category": {"data": {"type": "categories", "id": category} if category else None},
+                "parentCategory": {"data": {"type": "categories", "id": parent} if parent else None},
+                "tags": {"data": []},
+            },
+        }
+
+    @property
+    def total_transactions(self) -> int:
+        return sum(len(t) for t in self.transactions.values())
+
+
+class FakeUpServer:
+    """Threaded HTTP server serving a FakeUpData set with Up-style rate limiting."""
+
+    def __init__(
+        self,
+        data: Optional[FakeUpData] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        rate_limit: Optional[int] = None,
+        rate_limit_window: float = 60.0,
+        throttle_every: Optional[int] = None,
+        retry_after: int = 1,
+    ):
+        """
+        Configure the fake API.
+
+        Args:
+            data: Dataset to serve (generates a small default set if not provided)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds added to every response
+            latency_jitter: Extra uniform random latency, in seconds
+            rate_limit: Requests allowed per window; None disables rate limiting
+            rate_limit_window: Length of the rate limit window in seconds
+            throttle_every: Answer every Nth request with a 429 regardless of
+                            the rate limit (exercises client retry paths)
+            retry_after: Minimum Retry-After sent with 429 responses, in seconds
+        """
+        self.data = data or FakeUpData()
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+
+        self.stats = {"requests": 0, "transaction_pages": 0, "throttled": 0}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+        self._httpd = ThreadingHTTPServer((host, port), _FakeUpHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to UpBankClient."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "FakeUpServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake Up API serving {self.data.total_transactions} transactions at {self.url}")
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted."""
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "transaction_pages": 0, "throttled": 0}
+
+    def __enter__(self) -> "FakeUpServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def admit(self) -> tuple[bool, Optional[int], int]:
+        """
+        Account for one request against the rate limit.
+
+        Returns:
+            (allowed, remaining, retry_after) for the response headers
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+
+            if self.throttle_every and self.stats["requests"] % self.throttle_every == 0:
+                self.stats["throttled"] += 1
+                return False, None, self.retry_after
+
+            if self.rate_limit is None:
+                return True, None, 0
+
+            now = time.monotonic()
+            if now - self._window_start >= self.rate_limit_window:
+                self._window_start = now
+                self._window_count = 0
+
+            if self._window_count >= self.rate_limit:
+                self.stats["throttled"] += 1
+                wait = math.ceil(self.rate_limit_window - (now - self._window_start))
+                return False, 0, max(self.retry_after, wait)
+
+            self._window_count += 1
+            return True, self.rate_limit - self._window_count, 0
+
+    def simulate_latency(self):
+        delay = self.latency + (random.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _FakeUpHandler(BaseHTTPRequestHandler):
+    """Routes Up API paths to the fake dataset."""
+
+    server_version = "FakeUp/1.0"
+
+    def do_GET(self):
+        fake: FakeUpServer = self.server.fake
+        fake.simulate_latency()
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._send_error(401, "Not Authorized", "The request was not authenticated.")
+            return
+
+        allowed, remaining, retry_after = fake.admit()
+        if not allowed:
+            self._send_error(
+                429, "Too Many Requests", "Rate limit exceeded.",
+                {"Retry-After": str(retry_after), "X-RateLimit-Remaining": "0"}
+            )
+            return
+
+        headers = {} if remaining is None else {"X-RateLimit-Remaining": str(remaining)}
+        split = urlsplit(self.path)
+        path = split.path[len(API_PREFIX):] if split.path.startswith(API_PREFIX) else split.path
+        query = dict(parse_qsl(split.query))
+        parts = [p for p in path.split("/") if p]
+
+        if parts == ["util", "ping"]:
+            self._send_json({"meta": {"id": "fake", "statusEmoji": "⚡️"}}, headers)
+        elif parts == ["categories"]:
+            self._send_json({"data": fake.data.categories}, headers)
+        elif parts == ["accounts"]:
+            self._send_page(path, query, fake.data.accounts, headers)
+        elif len(parts) == 2 and parts[0] == "accounts":
+            account = next((a for a in fake.data.accounts if a["id"] == parts[1]), None)
+            if account is None:
+                self._send_error(404, "Not Found", f"Account {parts[1]} not found.")
+            else:
+                self._send_json({"data": account}, headers)
+        elif len(parts) == 3 and parts[0] == "accounts" and parts[2] == "transactions":
+            if parts[1] not in fake.data.transactions:
+                self._send_error(404, "Not Found", f"Account {parts[1]} not found.")
+                return
+            self._send_transactions(path, query, fake.data.transactions[parts[1]], headers)
+        elif parts == ["transactions"]:
+            merged = sorted(
+                (t for txs in fake.data.transactions.values() for t in txs),
+                key=lambda t: t["attributes"]["createdAt"], reverse=True
+            )
+            self._send_transactions(path, query, merged, headers)
+        else:
+            self._send_error(404, "Not Found", f"No route for {path}.")
+
+    def _send_transactions(self, path: str, query: dict, transactions: List[dict], headers: dict):
+        since = query.get("filter[since]")
+        until = query.get("filter[until]")
+        status = query.get("filter[status]")
+        category = query.get("filter[category]")
+
+        if since or until or status or category:
+            since_dt = datetime.fromisoformat(since) if since else None
+            until_dt = datetime.fromisoformat(until) if until else None
+            transactions = [
+                t for t in transactions
+                if (since_dt is None or datetime.fromisoformat(t["attributes"]["createdAt"]) >= since_dt)
+                and (until_dt is None or datetime.fromisoformat(t["attributes"]["createdAt"]) <= until_dt)
+                and (status is None or t["attributes"]["status"] == status)
+                and (category is None or (t["relationships"]["category"]["data"] or {}).get("id") == category)
+            ]
+
+        with self.server.fake._lock:
+            self.server.fake.stats["transaction_pages"] += 1
+        self._send_page(path, query, transactions, headers)
+
+    def _send_page(self, path: str, query: dict, items: List[dict], headers: dict):
+        size = min(int(query.get("page[size]", 10)), 100)
+        start = int(query.get("page[after]", 0))
+        page = items[start:start + size]
+
+        next_link = None
+        if start + size < len(items):
+            next_query = {k: v for k, v in query.items() if k != "page[after]"}
+            next_query["page[size]"] = size
+            next_query["page[after]"] = start + size
+            host, port = self.server.server_address[:2]
+            next_link = f"http://{host}:{port}{API_PREFIX}{path}?{urlencode(next_query)}"
+
+        self._send_json({"data": page, "links": {"prev": None, "next": next_link}}, headers)
+
+    def _send_json(self, body: dict, headers: Optional[dict] = None, status: int = 200):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, title: str, detail: str, headers: Optional[dict] = None):
+        body = {"errors": [{"status": str(status), "title": title, "detail": detail}]}
+        self._send_json(body, headers, status)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def _money(value: float) -> dict:
+    return {
+        "currencyCode": "AUD",
+        "value": f"{value:.2f}",
+        "valueInBaseUnits": int(round(value * 100)),
+    }
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat()
+
+
+def _category(category_id: str, parent_id: Optional[str]) -> dict:
+    return {
+        "type": "categories",
+        "id": category_id,
+        "attributes": {"name": category_id.replace("-", " ").title()},
+        "relationships": {
+            "parent": {"data": {"type": "categories", "id": parent_id} if parent_id else None},
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", help="Interface to bind", type=str, default="127.0.0.1")
+    parser.add_argument("--port", "-p", help="Port to bind", type=int, default=8765)
+    parser.add_argument("--accounts", help="Number of accounts", type=int, default=4)
+    parser.add_argument("--transactions", help="Transactions per account", type=int, default=500)
+    parser.add_argument("--latency", help="Seconds of latency per request", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", help="Extra random latency in seconds", type=float, default=0.0)
+    parser.add_argument("--rate-limit", help="Requests allowed per window", type=int, default=None)
+    parser.add_argument("--rate-limit-window", help="Rate limit window in seconds", type=float, default=60.0)
+    parser.add_argument("--throttle-every", help="Return 429 for every Nth request", type=int, default=None)
+    parser.add_argument("--retry-after", help="Minimum Retry-After in seconds", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    server = FakeUpServer(
+        FakeUpData(args.accounts, args.transactions),
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        rate_limit=args.rate_limit,
+        rate_limit_window=args.rate_limit_window,
+        throttle_every=args.throttle_every,
+        retry_after=args.retry_after,
+    )
+    print(f"Fake Up API listening on {server.url} (use it as UpBankClient base_url)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,176 @@
+"""Offline bulk import of recorded Up Bank API pages into up_transactions."""
+
+import os
+import gzip
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from .db import FinanceDB
+from .up_client import transaction_to_row
+from .up_models import SyncResult, SyncTelemetry
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PAGE_SUFFIXES = ('.json', '.json.gz')
+
+
+def iter_page_files(pages_dir: str) -> Iterator[str]:
+    """Yield recorded page files in name order (which is fetch order for recorded dumps)."""
+    for name in sorted(os.listdir(pages_dir)):
+        if name.endswith(PAGE_SUFFIXES):
+            yield os.path.join(pages_dir, name)
+
+
+def load_page(path: str) -> dict:
+    """Load a single JSON:API page, transparently handling gzip."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt') as f:
+        return json.load(f)
+
+
+def iter_transaction_rows(
+    pages_dir: str,
+    validate: bool = True,
+    stats: Optional[dict] = None
+) -> Iterator[tuple]:
+    """
+    Stream transaction rows out of a directory of page files, one page in memory at a time.
+
+    Pages that are not transaction pages (accounts, categories) are skipped,
+    as are individual resources that fail to map.
+
+    Args:
+        pages_dir: Directory of recorded pages
+        validate: Check enums and timestamps while mapping
+        stats: Optional dict updated with files/pages/skipped/invalid counts
+    """
+    stats = stats if stats is not None else {}
+    for key in ('files', 'pages', 'skipped_pages', 'invalid_rows'):
+        stats.setdefault(key, 0)
+
+    for path in iter_page_files(pages_dir):
+        stats['files'] += 1
+        try:
+            page = load_page(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable page {path}: {e}")
+            stats['skipped_pages'] += 1
+            continue
+
+        data = page.get('data') if isinstance(page, dict) else None
+        if not isinstance(data, list) or any(item.get('type') != 'transactions' for item in data):
+            stats['skipped_pages'] += 1
+            continue
+
+        stats['pages'] += 1
+        for item in data:
+            try:
+                yield transaction_to_row(item, validate=validate)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping transaction {item.get('id')} in {path}: {e}")
+                stats['invalid_rows'] += 1
+
+
+def import_pages(
+    pages_dir: str,
+    db: Optional[FinanceDB] = None,
+    batch_size: int = 5000,
+    validate: bool = True
+) -> Tuple[SyncResult, dict]:
+    """
+    Bulk import a directory of recorded Up transaction pages.
+
+    Rows are inserted in executemany batches, one transaction per batch, with
+    INSERT OR IGNORE so re-importing the same dump is a no-op.
+
+    Args:
+        pages_dir: Directory written by UpBankClient(record_pages_dir=...)
+        db: Database to import into
+        batch_size: Rows per insert transaction
+        validate: Check enums and timestamps while mapping
+
+    Returns:
+        Tuple of (SyncResult, stats dict)
+    """
+    if not os.path.isdir(pages_dir):
+        raise ValueError(f"Pages directory not found: {pages_dir}")
+
+    db = db or FinanceDB()
+    sync_id = db.record_sync_start('transactions_import')
+    started_at = datetime.now()
+    telemetry = SyncTelemetry()
+    stats = {'rows': 0}
+    inserted = 0
+    error_message = None
+
+    def flush(batch: List[tuple]) -> int:
+        db_started = time.perf_counter()
+        count = db.insert_up_transaction_rows(batch)
+        telemetry.db_seconds += time.perf_counter() - db_started
+        return count
+
+    try:
+        batch = []
+        parse_started = time.perf_counter()
+        for row in iter_transaction_rows(pages_dir, validate=validate, stats=stats):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                telemetry.parse_seconds += time.perf_counter() - parse_started
+                inserted += flush(batch)
+                stats['rows'] += len(batch)
+                batch = []
+                parse_started = time.perf_counter()
+        telemetry.parse_seconds += time.perf_counter() - parse_started
+
+        if batch:
+            inserted += flush(batch)
+            stats['rows'] += len(batch)
+
+        telemetry.pages = stats['pages']
+        logger.info(f"Imported {inserted} new transactions from {stats['rows']} rows "
+                    f"across {stats['pages']} pages")
+    except Exception as e:
+        error_message = str(e)
+        logger.error(f"Error importing Up pages from {pages_dir}: {e}")
+
+    db.record_sync_complete(sync_id, inserted, error_message, telemetry)
+
+    result = SyncResult(
+        sync_type='transactions_import',
+        items_synced=inserted,
+        started_at=started_at,
+        completed_at=datetime.now(),
+        status='failed' if error_message else 'completed',
+        error_message=error_message,
+        telemetry=telemetry
+    )
+    return result, stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import recorded Up Bank transaction pages")
+    parser.add_argument("pages_dir", help="Directory of recorded page files (.json or .json.gz)")
+    parser.add_argument("--db-path", help="SQLite database to import into (defaults to the app database)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per insert transaction")
+    parser.add_argument("--no-validate", help="Skip enum/timestamp validation for trusted dumps", action="store_true")
+    args = parser.parse_args()
+
+    db = FinanceDB(args.db_path) if args.db_path else FinanceDB()
+    result, stats = import_pages(args.pages_dir, db, args.batch_size, validate=not args.no_validate)
+
+    elapsed = (result.completed_at - result.started_at).total_seconds()
+    print("\n=== Import Results ===")
+    print(f"Files: {stats['files']} ({stats['pages']} transaction pages, {stats['skipped_pages']} skipped)")
+    print(f"Rows: {stats['rows']} read, {result.items_synced} new, {stats['invalid_rows']} invalid")
+    print(f"Elapsed: {elapsed:.2f}s ({stats['rows'] / elapsed if elapsed else 0:.0f} rows/s)")
+    if result.error_message:
+        print(f"Error: {result.error_message}")
@@ -22,6 +22,14 @@ class TransactionStatus(str, Enum):
     SETTLED = "SETTLED"
 
 
+# Column order of up_transactions rows produced by the fast parsing path
+UP_TRANSACTION_COLUMNS = (
+    "id", "account_id", "status", "raw_text", "description", "message",
+    "amount", "currency_code", "foreign_amount", "foreign_currency",
+    "category_id", "parent_category_id", "settled_at", "created_at",
+)
+
+
 class Money(BaseModel):
     """Represents a monetary amount with currency."""
     currency_code: str = Field(alias="currencyCode")
@@ -90,6 +98,18 @@ class UpCategory(BaseModel):
     parent_id: Optional[str] = None
 
 
+class SyncTelemetry(BaseModel):
+    """Where the time went in a single sync run."""
+    http_seconds: float = 0.0
+    rate_limit_sleep_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    db_seconds: float = 0.0
+    pages: int = 0
+    requests: int = 0
+    retries: int = 0
+    max_request_seconds: float = 0.0
+
+
 class SyncResult(BaseModel):
     """Result of a sync operation."""
     sync_type: str
@@ -98,3 +118,4 @@ class SyncResult(BaseModel):
     completed_at: Optional[datetime] = None
     status: str = "completed"
     error_message: Optional[str] = None
+    telemetry: Optional[SyncTelemetry] = None
@@ -0,0 +1,205 @@
+"""In-process scheduler for Up Bank syncs with single-flight triggering."""
+
+import logging
+import random
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from .up_events import SyncEventBroadcaster
+from .up_sync import UpBankSync
+
+logger = logging.getLogger(__name__)
+
+
+class SyncJob:
+    """A single sync run, shared by every trigger that was collapsed into it."""
+
+    def __init__(self, reason: str, resume: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.reason = reason
+        self.resume = resume
+        self.status = 'queued'
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.triggers = 1
+        self.summary: Optional[dict] = None
+        self.error_message: Optional[str] = None
+        self._done = threading.Event()
+
+    @property
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes; returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "reason": self.reason,
+            "resume": self.resume,
+            "triggers": self.triggers,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "summary": self.summary,
+            "error_message": self.error_message,
+        }
+
+
+class SyncScheduler:
+    """
+    Runs periodic incremental Up syncs and collapses concurrent triggers.
+
+    At most one sync runs at a time. A trigger that arrives while a sync is
+    in flight joins that job instead of starting another one against the
+    same SQLite file.
+    """
+
+    def __init__(
+        self,
+        sync_factory: Callable[[], UpBankSync],
+        interval: Optional[timedelta] = timedelta(hours=1),
+        jitter: float = 0.1,
+        max_history: int = 50,
+        events: Optional[SyncEventBroadcaster] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            sync_factory: Builds the UpBankSync used for each run
+            interval: Time between scheduled syncs (None disables them)
+            jitter: Random +/- fraction applied to each interval
+            max_history: Number of finished jobs kept for lookup by id
+            events: Broadcaster that receives job start/finish events
+        """
+        self.sync_factory = sync_factory
+        self.interval = interval
+        self.jitter = jitter
+        self.max_history = max_history
+        self.events = events
+
+        self._lock = threading.Lock()
+        self._current: Optional[SyncJob] = None
+        self._jobs: "OrderedDict[str, SyncJob]" = OrderedDict()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.next_run_at: Optional[datetime] = None
+
+    def start(self):
+        """Start the periodic sync loop in a daemon thread."""
+        if not self.interval or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="up-sync-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Up sync scheduler started (every {self.interval}, jitter {self.jitter:.0%})")
+
+    def stop(self):
+        """Stop scheduling new syncs; a sync already running is left to finish."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def trigger(self, reason: str = 'manual', resume: bool = False) -> SyncJob:
+        """
+        Request a sync, joining the in-flight one if there is one.
+
+        A resume request that joins a job which hasn't started yet turns that
+        job into a resuming one. A job already running can't change mode, so
+        the returned job's resume flag shows whether the request was honoured.
+
+        Returns:
+            The job that will satisfy this request
+        """
+        with self._lock:
+            if self._current and not self._current.is_done:
+                current = self._current
+                current.triggers += 1
+                if resume and not current.resume:
+                    if current.status == 'queued':
+                        current.resume = True
+                    else:
+                        logger.warning(f"Resume requested but job {current.id} is already running "
+                                       f"without resume; joining it as is")
+                logger.info(f"Sync already running as job {current.id}; joining it")
+                return current
+
+            job = SyncJob(reason, resume)
+            self._current = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_history:
+                self._jobs.popitem(last=False)
+
+        threading.Thread(target=self._run_job, args=(job,), name=f"up-sync-{job.id}", daemon=True).start()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[SyncJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[SyncJob]:
+        """Wait for a job to finish (or the timeout to pass) and return it."""
+        job = self.get_job(job_id)
+        if job:
+            job.wait(timeout)
+        return job
+
+    @property
+    def current_job(self) -> Optional[SyncJob]:
+        with self._lock:
+            return self._current
+
+    def _next_delay(self) -> float:
+        seconds = self.interval.total_seconds()
+        return max(1.0, seconds * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _run_loop(self):
+        while True:
+            delay = self._next_delay()
+            self.next_run_at = datetime.now() + timedelta(seconds=delay)
+            if self._stop.wait(delay):
+                break
+            # Resume mode only picks up accounts with a pending checkpoint and
+            # syncs the rest incrementally, so a timer tick continues an
+            # interrupted sync instead of discarding its progress
+            self.trigger(reason='scheduled', resume=True)
+
+    def _run_job(self, job: SyncJob):
+        job.status = 'running'
+        job.started_at = datetime.now()
+        self._publish('job_started', job)
+        try:
+            sync = self.sync_factory()
+            if not sync.client.ping():
+                raise RuntimeError("Up Bank API is not accessible")
+
+            results = sync.sync_all(resume=job.resume)
+            transactions = results['transactions']
+            job.summary = {
+                "categories": results['categories'].items_synced,
+                "accounts": results['accounts'].items_synced,
+                "transactions": sum(r.items_synced for r in transactions),
+                "accounts_skipped": sum(1 for r in transactions if r.status == 'skipped'),
+                "accounts_failed": sum(1 for r in transactions if r.status == 'failed'),
+            }
+            job.status = 'completed'
+        except Exception as e:
+            logger.error(f"Sync job {job.id} failed: {e}")
+            job.error_message = str(e)
+            job.status = 'failed'
+        finally:
+            job.completed_at = datetime.now()
+            job._done.set()
+            self._publish('job_completed', job)
+
+    def _publish(self, event_type: str, job: SyncJob):
+        if self.events is not None:
+            self.events.publish(event_type, **job.to_dict())
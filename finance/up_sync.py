@@ -1,11 +1,20 @@
 """Up Bank synchronization logic for incremental data sync."""
 
 import logging
-from datetime import datetime, date, timedelta
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta, timezone
 from typing import Optional, List
 
+import pandas as pd
+
 from .up_client import UpBankClient
-from .up_models import UpAccount, UpTransaction, UpCategory, SyncResult
+from .up_events import SyncEventBroadcaster
+from .up_models import (
+    UpAccount, UpTransaction, UpCategory, SyncResult, SyncTelemetry,
+    UP_TRANSACTION_COLUMNS
+)
 from .db import FinanceDB
 
 logging.basicConfig(
@@ -14,37 +23,92 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Unchanged accounts are still checked at least this often, to catch activity
+# that nets to zero (e.g. money moved in and straight back out)
+DEFAULT_FORCE_CHECK_INTERVAL = timedelta(hours=24)
+
+# HELD transactions older than this are not expected to settle any more (an
+# authorisation that never settled was dropped), so they no longer force a
+# check or pull the incremental fetch window back
+DEFAULT_HELD_SETTLE_WINDOW = timedelta(days=14)
+
+CREATED_AT_INDEX = UP_TRANSACTION_COLUMNS.index('created_at')
+
 
 class UpBankSync:
     """Handles syncing Up Bank data to local SQLite database."""
 
-    def __init__(self, db: FinanceDB = None, client: UpBankClient = None):
+    def __init__(
+        self,
+        db: FinanceDB = None,
+        client: UpBankClient = None,
+        force_check_interval: timedelta = DEFAULT_FORCE_CHECK_INTERVAL,
+        held_settle_window: timedelta = DEFAULT_HELD_SETTLE_WINDOW,
+        max_workers: int = 1,
+        events: Optional[SyncEventBroadcaster] = None
+    ):
         """
         Initialize sync handler.
 
         Args:
             db: FinanceDB instance (creates default if not provided)
             client: UpBankClient instance (creates default if not provided)
+            force_check_interval: Maximum time an account's transactions can go
+                                  unchecked when its fingerprint hasn't changed
+            held_settle_window: How long a HELD transaction is watched for
+                                settlement after it was created
+            max_workers: Number of accounts whose transactions are synced
+                         concurrently (1 syncs accounts serially)
+            events: Broadcaster that receives page-level progress events
         """
         self.db = db or FinanceDB()
         self.client = client or UpBankClient()
+        self.force_check_interval = force_check_interval
+        self.held_settle_window = held_settle_window
+        self.max_workers = max_workers
+        self.events = events
+
+    def _publish(self, event_type: str, **data):
+        """Publish a progress event if a broadcaster is attached."""
+        if self.events is not None:
+            self.events.publish(event_type, **data)
 
-    def sync_all(self) -> dict:
-        """Run full sync: accounts, categories, transactions, and snapshot."""
+    def sync_all(self, skip_unchanged: bool = True, resume: bool = False) -> dict:
+        """
+        Run full sync: accounts, categories, transactions, and snapshot.
+
+        Args:
+            skip_unchanged: Skip the transaction fetch for accounts whose
+                            fingerprint hasn't changed since the last check
+            resume: Continue interrupted transaction syncs from their checkpoints
+        """
         results = {}
+        self._publish('sync_started', resume=resume)
 
         # Sync categories first (used for transaction categorization)
         results['categories'] = self.sync_categories()
+        self._publish('phase_completed', phase='categories', items=results['categories'].items_synced)
 
         # Sync accounts (gets current balances)
         results['accounts'] = self.sync_accounts()
+        self._publish('phase_completed', phase='accounts', items=results['accounts'].items_synced)
 
         # Sync transactions for all accounts
-        results['transactions'] = self.sync_all_transactions()
+        results['transactions'] = self.sync_all_transactions(
+            skip_unchanged=skip_unchanged, resume=resume
+        )
 
         # Record balance snapshot
         self.record_balance_snapshots()
 
+        transactions = results['transactions']
+        self._publish(
+            'sync_completed',
+            transactions=sum(r.items_synced for r in transactions),
+            accounts_skipped=sum(1 for r in transactions if r.status == 'skipped'),
+            accounts_failed=sum(1 for r in transactions if r.status == 'failed')
+        )
+
         return results
 
     def sync_accounts(self) -> SyncResult:
@@ -54,11 +118,15 @@ class UpBankSync:
         items_synced = 0
         error_message = None
 
+        telemetry = SyncTelemetry()
+
         try:
-            accounts = self.client.get_accounts()
+            with self.client.collect_telemetry(telemetry):
+                accounts = self.client.get_accounts()
 
-            for account in accounts:
-                account_data = {
+            synced_at = datetime.now().isoformat()
+            accounts_data = [
+                {
                     'id': account.id,
                     'display_name': account.display_name,
                     'account_type': account.account_type.value,
@@ -66,11 +134,14 @@ class UpBankSync:
                     'current_balance': account.balance_dollars,
                     'currency_code': account.balance.currency_code,
                     'created_at': account.created_at.isoformat(),
-                    'last_synced_at': datetime.now().isoformat()
+                    'last_synced_at': synced_at
                 }
+                for account in accounts
+            ]
 
-                if self.db.upsert_up_account(account_data):
-                    items_synced += 1
+            db_started = time.perf_counter()
+            items_synced = self.db.upsert_up_accounts(accounts_data)
+            telemetry.db_seconds += time.perf_counter() - db_started
 
             logger.info(f"Synced {items_synced} accounts")
 
@@ -78,7 +149,7 @@ class UpBankSync:
             error_message = str(e)
             logger.error(f"Error syncing accounts: {e}")
 
-        self.db.record_sync_complete(sync_id, items_synced, error_message)
+        self.db.record_sync_complete(sync_id, items_synced, error_message, telemetry)
 
         return SyncResult(
             sync_type='accounts',
@@ -86,7 +157,8 @@ class UpBankSync:
             started_at=started_at,
             completed_at=datetime.now(),
             status='failed' if error_message else 'completed',
-            error_message=error_message
+            error_message=error_message,
+            telemetry=telemetry
         )
 
     def sync_categories(self) -> SyncResult:
@@ -96,19 +168,26 @@ class UpBankSync:
         items_synced = 0
         error_message = None
 
+        telemetry = SyncTelemetry()
+
         try:
-            categories = self.client.get_categories()
+            with self.client.collect_telemetry(telemetry):
+                categories = self.client.get_categories()
 
-            for category in categories:
-                category_data = {
+            synced_at = datetime.now().isoformat()
+            categories_data = [
+                {
                     'id': category.id,
                     'name': category.name,
                     'parent_id': category.parent_id,
-                    'last_synced_at': datetime.now().isoformat()
+                    'last_synced_at': synced_at
                 }
+                for category in categories
+            ]
 
-                if self.db.upsert_up_category(category_data):
-                    items_synced += 1
+            db_started = time.perf_counter()
+            items_synced = self.db.upsert_up_categories(categories_data)
+            telemetry.db_seconds += time.perf_counter() - db_started
 
             logger.info(f"Synced {items_synced} categories")
 
@@ -116,7 +195,7 @@ class UpBankSync:
             error_message = str(e)
             logger.error(f"Error syncing categories: {e}")
 
-        self.db.record_sync_complete(sync_id, items_synced, error_message)
+        self.db.record_sync_complete(sync_id, items_synced, error_message, telemetry)
 
         return SyncResult(
             sync_type='categories',
@@ -124,22 +203,30 @@ class UpBankSync:
             started_at=started_at,
             completed_at=datetime.now(),
             status='failed' if error_message else 'completed',
-            error_message=error_message
+            error_message=error_message,
+            telemetry=telemetry
         )
 
     def sync_transactions(
         self,
         account_id: Optional[str] = None,
         since: Optional[datetime] = None,
-        full_sync: bool = False
+        full_sync: bool = False,
+        resume: bool = False
     ) -> SyncResult:
         """
         Sync transactions for a specific account.
 
+        Every page is committed together with a pagination checkpoint. In
+        resume mode an interrupted chain continues from its stored cursor,
+        followed by a catch-up fetch of anything newer than the chain's
+        watermark, so pages that were already stored are never refetched.
+
         Args:
             account_id: Account ID to sync (required)
             since: Only sync transactions after this datetime
             full_sync: If True, sync all transactions regardless of last sync
+            resume: If True, continue from the account's pending checkpoint
         """
         if not account_id:
             raise ValueError("account_id is required for transaction sync")
@@ -148,20 +235,55 @@ class UpBankSync:
         started_at = datetime.now()
         items_synced = 0
         error_message = None
+        self._publish('account_started', account_id=account_id, resume=resume)
+        telemetry = SyncTelemetry()
 
         try:
-            # Determine start date for incremental sync
-            if not full_sync and not since:
-                last_sync = self.db.get_last_up_sync(account_id)
-                if not last_sync.empty and last_sync['last_sync'].iloc[0]:
-                    since = datetime.fromisoformat(last_sync['last_sync'].iloc[0])
-
-            # Fetch and store transactions
-            for tx in self.client.get_transactions(account_id=account_id, since=since):
-                tx_data = self._transaction_to_dict(tx)
-
-                if self.db.insert_up_transaction(tx_data):
-                    items_synced += 1
+            with self.client.collect_telemetry(telemetry):
+                checkpoint = self.db.get_up_sync_checkpoint(account_id) if resume else None
+
+                if checkpoint:
+                    logger.info(
+                        f"Resuming account {account_id} after "
+                        f"{checkpoint['pages_committed']} committed pages"
+                    )
+                    pages = self.client.get_transaction_pages(
+                        start_url=checkpoint['cursor'], as_rows=True
+                    )
+                    items_synced += self._store_transaction_pages(
+                        account_id, pages, checkpoint['since_at'], telemetry,
+                        checkpoint['watermark']
+                    )
+
+                    # Catch up on anything created after the interrupted chain started
+                    catch_up_from = checkpoint['watermark'] or checkpoint['since_at']
+                    since = datetime.fromisoformat(catch_up_from) if catch_up_from else None
+
+                # Determine start date for incremental sync
+                elif not full_sync and not since:
+                    last_sync = self.db.get_last_up_sync(account_id)
+                    if not last_sync.empty and last_sync['last_sync'].iloc[0]:
+                        since = datetime.fromisoformat(last_sync['last_sync'].iloc[0])
+
+                        # Refetch from the oldest recent HELD transaction so it
+                        # is updated when it settles
+                        oldest_held = self.db.get_oldest_held_up_transaction(
+                            account_id, self._held_since()
+                        )
+                        if oldest_held:
+                            held_at = datetime.fromisoformat(oldest_held)
+                            if held_at.tzinfo is not None:
+                                held_at = held_at.astimezone(timezone.utc).replace(tzinfo=None)
+                            since = min(since, held_at)
+
+                # Fetch and store transactions as a fresh pagination chain
+                self.db.clear_up_sync_checkpoint(account_id)
+                pages = self.client.get_transaction_pages(
+                    account_id=account_id, since=since, as_rows=True
+                )
+                items_synced += self._store_transaction_pages(
+                    account_id, pages, since.isoformat() if since else None, telemetry
+                )
 
             logger.info(f"Synced {items_synced} transactions for account {account_id}")
 
@@ -169,7 +291,14 @@ class UpBankSync:
             error_message = str(e)
             logger.error(f"Error syncing transactions: {e}")
 
-        self.db.record_sync_complete(sync_id, items_synced, error_message)
+        self.db.record_sync_complete(sync_id, items_synced, error_message, telemetry)
+        self._publish(
+            'account_completed',
+            account_id=account_id,
+            items_synced=items_synced,
+            status='failed' if error_message else 'completed',
+            error_message=error_message
+        )
 
         return SyncResult(
             sync_type='transactions',
@@ -177,12 +306,62 @@ class UpBankSync:
             started_at=started_at,
             completed_at=datetime.now(),
             status='failed' if error_message else 'completed',
-            error_message=error_message
+            error_message=error_message,
+            telemetry=telemetry
         )
 
-    def sync_all_transactions(self, full_sync: bool = False) -> List[SyncResult]:
-        """Sync transactions for all accounts."""
-        results = []
+    def _store_transaction_pages(
+        self,
+        account_id: str,
+        pages,
+        since_at: Optional[str],
+        telemetry: SyncTelemetry,
+        watermark: Optional[str] = None
+    ) -> int:
+        """Commit each page with its checkpoint, clearing it once the chain completes."""
+        items_synced = 0
+        rows_fetched = 0
+
+        for page_number, (tx_rows, next_url) in enumerate(pages, start=1):
+            # Pages arrive newest first, so the first row seen is the watermark
+            if watermark is None and tx_rows:
+                watermark = tx_rows[0][CREATED_AT_INDEX]
+
+            db_started = time.perf_counter()
+            items_synced += self.db.insert_up_transaction_page(
+                account_id, tx_rows, next_url, since_at, watermark
+            )
+            telemetry.db_seconds += time.perf_counter() - db_started
+            rows_fetched += len(tx_rows)
+
+            self._publish(
+                'page',
+                account_id=account_id,
+                pages=page_number,
+                rows=rows_fetched,
+                inserted=items_synced,
+                has_more=next_url is not None,
+                rate_limit_remaining=self.client.rate_limit_remaining
+            )
+
+        self.db.clear_up_sync_checkpoint(account_id)
+        return items_synced
+
+    def sync_all_transactions(
+        self, full_sync: bool = False, skip_unchanged: bool = False,
+        resume: bool = False
+    ) -> List[SyncResult]:
+        """
+        Sync transactions for all accounts.
+
+        Args:
+            full_sync: If True, sync all transactions regardless of last sync
+            skip_unchanged: Skip accounts whose fingerprint (balance, held
+                            transactions, last check time) shows no change.
+                            Ignored when full_sync is True.
+            resume: Continue interrupted syncs from their checkpoints. Accounts
+                    with a pending checkpoint are never skipped.
+        """
         accounts = self.db.get_up_accounts()
 
         if accounts.empty:
@@ -190,30 +369,83 @@ class UpBankSync:
             self.sync_accounts()
             accounts = self.db.get_up_accounts()
 
-        for _, account in accounts.iterrows():
+        sync_state = self.db.get_up_sync_state(self._held_since()).set_index('account_id')
+        pending = set(self.db.get_up_sync_checkpoints()['account_id']) if resume else set()
+
+        def sync_account(account: pd.Series) -> SyncResult:
+            account_id = account['id']
+            state = sync_state.loc[account_id] if account_id in sync_state.index else None
+
+            if (skip_unchanged and not full_sync and account_id not in pending
+                    and self._is_account_unchanged(state)):
+                logger.info(f"Skipping account {account_id}: no change since last check")
+                self._publish('account_skipped', account_id=account_id)
+                now = datetime.now()
+                return SyncResult(
+                    sync_type='transactions',
+                    items_synced=0,
+                    started_at=now,
+                    completed_at=now,
+                    status='skipped'
+                )
+
             result = self.sync_transactions(
-                account_id=account['id'],
-                full_sync=full_sync
+                account_id=account_id,
+                full_sync=full_sync,
+                resume=account_id in pending
             )
-            results.append(result)
 
-        return results
+            if result.status == 'completed':
+                self.db.update_up_sync_state(account_id, account['current_balance'])
+
+            return result
+
+        account_rows = [account for _, account in accounts.iterrows()]
+
+        if self.max_workers <= 1:
+            return [sync_account(account) for account in account_rows]
+
+        # Accounts are independent pagination chains, so fetch them in parallel
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(sync_account, account_rows))
+
+    def _is_account_unchanged(self, state: Optional[pd.Series]) -> bool:
+        """Check an account's fingerprint to decide if its transactions can be skipped."""
+        if state is None or pd.isna(state['synced_balance']) or pd.isna(state['last_checked_at']):
+            return False
+
+        # Balance moved since the last check
+        if abs(state['current_balance'] - state['synced_balance']) >= 0.005:
+            return False
+
+        # Recent HELD transactions can settle or drop off without moving the balance
+        if state['held_count'] > 0:
+            return False
+
+        # sync_state timestamps are written by SQLite in UTC
+        last_checked = datetime.fromisoformat(state['last_checked_at'])
+        now_utc = datetime.now(timezone.utc).replace(tzinfo=None)
+        return now_utc - last_checked < self.force_check_interval
+
+    def _held_since(self) -> str:
+        """Oldest created_at of a HELD transaction that may still settle."""
+        return (datetime.now(timezone.utc) - self.held_settle_window).isoformat()
 
     def record_balance_snapshots(self, snapshot_type: str = 'daily') -> int:
         """Record current balance for all saver accounts."""
         accounts = self.db.get_up_accounts()
         today = date.today().isoformat()
-        snapshots_recorded = 0
-
-        for _, account in accounts.iterrows():
-            if account['account_type'] == 'SAVER':
-                if self.db.insert_balance_snapshot(
-                    account_id=account['id'],
-                    balance=account['current_balance'],
-                    snapshot_date=today,
-                    snapshot_type=snapshot_type
-                ):
-                    snapshots_recorded += 1
+
+        savers = accounts[accounts['account_type'] == 'SAVER']
+        snapshots = [
+            (account_id, float(balance), today, snapshot_type)
+            for account_id, balance in zip(savers['id'], savers['current_balance'])
+        ]
+
+        try:
+            snapshots_recorded = self.db.insert_balance_snapshots(snapshots) if snapshots else 0
+        except sqlite3.Error:
+            snapshots_recorded = 0
 
         logger.info(f"Recorded {snapshots_recorded} balance snapshots")
         return snapshots_recorded
@@ -246,9 +478,9 @@ class UpBankSync:
         }
 
 
-def run_sync():
+def run_sync(resume: bool = False, record_pages_dir: Optional[str] = None):
     """CLI entry point for running sync."""
-    sync = UpBankSync()
+    sync = UpBankSync(client=UpBankClient(record_pages_dir=record_pages_dir))
 
     # Test connection first
     if not sync.client.ping():
@@ -256,15 +488,25 @@ def run_sync():
         return
 
     # Run full sync
-    results = sync.sync_all()
+    results = sync.sync_all(resume=resume)
 
     print("\n=== Sync Results ===")
     print(f"Categories: {results['categories'].items_synced} synced")
     print(f"Accounts: {results['accounts'].items_synced} synced")
 
     total_tx = sum(r.items_synced for r in results['transactions'])
-    print(f"Transactions: {total_tx} synced across {len(results['transactions'])} accounts")
+    skipped = sum(1 for r in results['transactions'] if r.status == 'skipped')
+    print(f"Transactions: {total_tx} synced across {len(results['transactions'])} accounts "
+          f"({skipped} unchanged accounts skipped)")
 
 
 if __name__ == "__main__":
-    run_sync()
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume", help="Resume interrupted syncs from their checkpoints", action="store_true")
+    parser.add_argument("--record-pages", metavar="DIR",
+                        help="Also write every raw API page to DIR for offline import with finance.up_import")
+    args = parser.parse_args()
+
+    run_sync(resume=args.resume, record_pages_dir=args.record_pages)
@@ -0,0 +1,186 @@
+"""Persistent background queue for bank statement uploads."""
+
+import os
+import uuid
+import logging
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from .db import FinanceDB
+from .dataloader_commbank import CommBankLoader
+from .dataloader_westpac import WestpacLoader
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Statement loader for each upload source, built from (target db, model)
+LOADERS = {
+    'commbank': lambda db, model: CommBankLoader(db, model=model),
+    'westpac': lambda db, model: WestpacLoader(db),
+}
+
+
+class UploadJobQueue:
+    """
+    Processes uploaded statements in a bounded pool of worker threads.
+
+    Every job is a row in upload_jobs that is updated after each committed
+    batch, so progress can be polled and a job interrupted by a restart picks
+    up after the last committed row.
+    """
+
+    def __init__(self, db: FinanceDB, upload_dir: str, max_concurrent: int = 1):
+        """
+        Initialize the queue.
+
+        Args:
+            db: Database holding the upload_jobs table
+            upload_dir: Directory uploaded files are kept in until processed
+            max_concurrent: Jobs processed at the same time; the rest wait
+        """
+        self.db = db
+        self.upload_dir = upload_dir
+        self.max_concurrent = max(1, max_concurrent)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active = set()
+        self._lock = threading.Lock()
+        os.makedirs(upload_dir, exist_ok=True)
+
+    def new_upload_path(self, job_id: str) -> str:
+        return os.path.join(self.upload_dir, f"{job_id}.csv")
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex[:12]
+
+    def submit(
+        self, job_id: str, source: str, file_path: str, target_db_path: str,
+        filename: str = None, model: str = "gemma3", estimated_rows: int = None
+    ) -> Dict[str, Any]:
+        """
+        Record a job for an upload already saved to file_path and queue it.
+
+        Returns:
+            The stored job
+        """
+        if source not in LOADERS:
+            raise ValueError(f"Unsupported upload source: {source}")
+
+        self.db.create_upload_job({
+            'id': job_id,
+            'source': source,
+            'filename': filename,
+            'file_path': file_path,
+            'target_db_path': target_db_path,
+            'model': model,
+            'estimated_rows': estimated_rows,
+        })
+        self._enqueue(job_id)
+        return self.db.get_upload_job(job_id)
+
+    def resume_unfinished(self) -> int:
+        """Re-queue jobs left queued or running by a previous server process."""
+        jobs = self.db.get_unfinished_upload_jobs()
+        for job_id in jobs['id']:
+            self._enqueue(job_id)
+        if len(jobs):
+            logger.info(f"Resuming {len(jobs)} unfinished upload jobs")
+        return len(jobs)
+
+    def shutdown(self):
+        """Stop taking new work; running jobs are resumed on next start."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._active.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def active_jobs(self) -> List[str]:
+        with self._lock:
+            return sorted(self._active)
+
+    def _enqueue(self, job_id: str):
+        with self._lock:
+            if job_id in self._active:
+                return
+            self._active.add(job_id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent, thread_name_prefix="upload-job"
+                )
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str):
+        try:
+            job = self.db.get_upload_job(job_id)
+            if job is None:
+                logger.warning(f"Upload job {job_id} disappeared before it ran")
+                return
+            self._process(job)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def _process(self, job: Dict[str, Any]):
+        job_id = job['id']
+        resume_after = job['last_row_committed'] or 0
+        base = {
+            'rows_read': job['rows_read'] or 0,
+            'rows_inserted': job['rows_inserted'] or 0,
+            'rows_skipped': job['rows_skipped'] or 0,
+            'rows_failed': job['rows_failed'] or 0,
+        }
+
+        self.db.update_upload_job(
+            job_id, status='running', attempts=(job['attempts'] or 0) + 1,
+            started_at=job['started_at'] or _now(), error_message=None
+        )
+        if resume_after:
+            logger.info(f"Resuming upload job {job_id} after row {resume_after}")
+        else:
+            logger.info(f"Starting upload job {job_id} ({job['filename']})")
+
+        def record_progress(stats: dict, last_row: int):
+            seconds = stats.get('seconds') or 0
+            self.db.update_upload_job(
+                job_id,
+                rows_read=base['rows_read'] + stats['rows'],
+                rows_inserted=base['rows_inserted'] + stats['inserted'],
+                rows_skipped=base['rows_skipped'] + stats['skipped'],
+                rows_failed=base['rows_failed'] + stats['failed'],
+                last_row_committed=last_row,
+                rows_per_second=stats['rows'] / seconds if seconds else None,
+            )
+
+        try:
+            loader = LOADERS[job['source']](FinanceDB(job['target_db_path']), job['model'] or "gemma3")
+            with open(job['file_path'], 'r', encoding='utf-8-sig', newline='') as f:
+                rows = ((n, row) for n, row in loader.iter_rows(f) if n > resume_after)
+                stats = loader.load_rows(rows, on_batch=record_progress)
+        except Exception as e:
+            logger.error(f"Upload job {job_id} failed: {e}")
+            self.db.update_upload_job(job_id, status='failed', error_message=str(e), completed_at=_now())
+            return
+
+        seconds = stats.get('seconds') or 0
+        self.db.update_upload_job(
+            job_id, status='completed', completed_at=_now(),
+            rows_per_second=stats['rows'] / seconds if seconds else None
+        )
+        logger.info(f"Upload job {job_id} completed: {stats['inserted']} inserted, "
+                    f"{stats['skipped']} skipped, {stats['failed']} failed")
+        try:
+            os.remove(job['file_path'])
+        except OSError as e:
+            logger.warning(f"Could not remove processed upload {job['file_path']}: {e}")
+
+
+def _now() -> str:
+    """UTC timestamp in the same format as SQLite's CURRENT_TIMESTAMP."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,39 @@
+import unittest
+
+from finance.commbank_rules import DEFAULT_MIN_CONFIDENCE, rule_parse
+
+
+class CardPurchaseSplitTest(unittest.TestCase):
+    """Merchant/location splits of card purchases, and when they are trusted over the LLM."""
+
+    def assert_trusted(self, description, merchant, location):
+        parsed, confidence, _ = rule_parse(description)
+        self.assertGreaterEqual(confidence, DEFAULT_MIN_CONFIDENCE)
+        self.assertEqual(parsed['merchant_name'], merchant)
+        self.assertEqual(parsed['location'], location)
+
+    def assert_left_to_llm(self, description):
+        _, confidence, _ = rule_parse(description)
+        self.assertLess(confidence, DEFAULT_MIN_CONFIDENCE)
+
+    def test_upper_case_merchant_with_suburb(self):
+        self.assert_trusted(
+            "EZI*TPC Fitzroy MELBOURNE AU AUS Card xx4321 Value Date: 24/10/2024",
+            "EZI*TPC", "Fitzroy MELBOURNE AU AUS"
+        )
+
+    def test_upper_case_merchant_with_multi_word_suburb(self):
+        self.assert_trusted("KMART Box Hill MELBOURNE AU AUS Card xx1234", "KMART", "Box Hill MELBOURNE AU AUS")
+
+    def test_mixed_case_merchant_with_single_word_suburb(self):
+        self.assert_trusted("Coles Richmond MELBOURNE AU AUS Card xx1234", "Coles", "Richmond MELBOURNE AU AUS")
+
+    def test_mixed_case_merchant_containing_single_letter_is_not_trusted(self):
+        self.assert_left_to_llm("Guzman Y Gomez Newtown SYDNEY NS AUS Card xx1234")
+
+    def test_mixed_case_merchant_with_suburb_is_not_trusted(self):
+        self.assert_left_to_llm("Seven Seeds Carlton MELBOURNE AU AUS Card xx1234")
+
+
+if __name__ == "__main__":
+    unittest.main()
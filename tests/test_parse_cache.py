@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from finance.dataloader_commbank import (
+    PROMPT_VERSION, new_parse_stats, normalize_description, parse_many_without_llm
+)
+from finance.db import FinanceDB
+
+MODEL = "gemma3"
+CACHED = "SQ *MARKET LANE COFFEE Prahran AU Card xx1234 Value Date: 03/05/2024"
+UNCACHED = "SQ *SOMEWHERE NEW Fitzroy AU Card xx1234"
+
+
+class ParseCacheBatchTest(unittest.TestCase):
+    """Cached LLM parses are looked up for a whole batch of descriptions at once."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = FinanceDB(os.path.join(self.tmp.name, "finance.db"))
+        self.db.cache_parse(normalize_description(CACHED), MODEL, PROMPT_VERSION, {
+            "merchant_name": "Market Lane Coffee", "transaction_type": "purchase", "location": "Prahran AU",
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_batch_lookup_returns_hits_and_counts_them(self):
+        keys = [normalize_description(CACHED), normalize_description(UNCACHED)]
+        cached = self.db.get_cached_parses(keys, MODEL, PROMPT_VERSION)
+
+        self.assertEqual(list(cached), [keys[0]])
+        self.assertEqual(cached[keys[0]]["merchant_name"], "Market Lane Coffee")
+        self.assertEqual(self.db.get_parse_cache_stats()["hits"].tolist(), [1])
+        self.assertEqual(self.db.get_cached_parses(keys, "other-model", PROMPT_VERSION), {})
+
+    def test_cache_misses_are_left_for_the_llm(self):
+        stats = new_parse_stats()
+        parsed, rule_fallbacks = parse_many_without_llm([CACHED, UNCACHED], MODEL, self.db, stats, min_confidence=1.1)
+
+        self.assertEqual(parsed[CACHED]["merchant_name"], "Market Lane Coffee")
+        self.assertEqual(parsed[CACHED]["date"], "03/05/2024")
+        self.assertEqual(list(rule_fallbacks), [UNCACHED])
+        self.assertEqual(stats["cache_hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from finance.up_client import UpBankAPIError, UpBankClient
+from finance.up_fake_server import FakeUpData, FakeUpServer
+
+
+class RetryAfterTest(unittest.TestCase):
+    """Server-supplied Retry-After is always waited out in full, or fails fast when too long."""
+
+    def client(self, server):
+        client = UpBankClient(
+            api_token="test", base_url=server.url, backoff_base=0.01, backoff_max=0.5,
+            max_retry_after=30.0
+        )
+        # Record waits instead of sleeping through them
+        self.sleeps = []
+        client._sleep = self.sleeps.append
+        return client
+
+    def test_retry_after_above_backoff_max_is_honoured(self):
+        # Every second request is throttled: ping is answered, get_accounts retried once
+        with FakeUpServer(FakeUpData(accounts=1, transactions_per_account=0), throttle_every=2, retry_after=10) as server:
+            client = self.client(server)
+            client._request("GET", "/util/ping")
+            accounts = client.get_accounts()
+
+        self.assertEqual(len(accounts), 1)
+        self.assertIn(10.0, self.sleeps)
+        self.assertEqual(server.stats["throttled"], 1)
+
+    def test_retry_after_above_limit_fails_without_retrying(self):
+        with FakeUpServer(FakeUpData(accounts=1, transactions_per_account=0), throttle_every=1, retry_after=120) as server:
+            client = self.client(server)
+            with self.assertRaises(UpBankAPIError) as raised:
+                client.get_accounts()
+
+        self.assertEqual(raised.exception.status_code, 429)
+        self.assertEqual(server.stats["requests"], 1)
+        self.assertNotIn(120.0, self.sleeps)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from finance.db import FinanceDB
+from finance.up_client import UpBankClient
+from finance.up_models import UP_TRANSACTION_COLUMNS
+from finance.up_sync import UpBankSync
+
+ACCOUNT_ID = "acc-1"
+
+
+def transaction_row(tx_id, status, created_at, settled_at=None, amount=-12.5):
+    values = {
+        "id": tx_id, "account_id": ACCOUNT_ID, "status": status, "raw_text": None,
+        "description": "Coffee", "message": None, "amount": amount,
+        "currency_code": "AUD", "foreign_amount": None, "foreign_currency": None,
+        "category_id": None, "parent_category_id": None,
+        "settled_at": settled_at, "created_at": created_at,
+    }
+    return tuple(values[c] for c in UP_TRANSACTION_COLUMNS)
+
+
+class HeldTransactionTest(unittest.TestCase):
+    """HELD transactions settle in place and only recent ones block skipping an account."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = FinanceDB(os.path.join(self.tmp.name, "finance.db"))
+        self.sync = UpBankSync(db=self.db, client=UpBankClient(api_token="test"))
+        self.db.upsert_up_account({
+            "id": ACCOUNT_ID, "display_name": "Spending", "account_type": "TRANSACTIONAL",
+            "ownership_type": "INDIVIDUAL", "current_balance": 100.0, "currency_code": "AUD",
+            "created_at": "2020-01-01T00:00:00+00:00", "last_synced_at": None,
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def account_state(self):
+        state = self.db.get_up_sync_state(self.sync._held_since()).set_index("account_id")
+        return state.loc[ACCOUNT_ID]
+
+    def test_held_transaction_settles_on_refetch(self):
+        self.db.insert_up_transaction_rows([transaction_row("tx-1", "HELD", "2024-05-01T10:00:00+10:00")])
+        changed = self.db.insert_up_transaction_rows([
+            transaction_row("tx-1", "SETTLED", "2024-05-01T10:00:00+10:00",
+                            settled_at="2024-05-02T09:00:00+10:00", amount=-13.0)
+        ])
+
+        self.assertEqual(changed, 1)
+        stored = self.db.run_query_pandas("SELECT status, settled_at, amount FROM up_transactions")
+        self.assertEqual(stored["status"].tolist(), ["SETTLED"])
+        self.assertEqual(stored["settled_at"].tolist(), ["2024-05-02T09:00:00+10:00"])
+        self.assertEqual(stored["amount"].tolist(), [-13.0])
+
+    def test_unchanged_refetch_is_not_counted(self):
+        row = transaction_row("tx-1", "SETTLED", "2024-05-01T10:00:00+10:00",
+                              settled_at="2024-05-02T09:00:00+10:00")
+        self.db.insert_up_transaction_rows([row])
+
+        self.assertEqual(self.db.insert_up_transaction_rows([row]), 0)
+
+    def test_account_with_old_held_transaction_is_skipped(self):
+        created_at = (datetime.now(timezone.utc) - timedelta(days=60)).isoformat()
+        self.db.insert_up_transaction_rows([transaction_row("tx-1", "HELD", created_at)])
+        self.db.update_up_sync_state(ACCOUNT_ID, 100.0)
+
+        state = self.account_state()
+        self.assertEqual(state["held_count"], 0)
+        self.assertTrue(self.sync._is_account_unchanged(state))
+
+    def test_account_with_recent_held_transaction_is_checked(self):
+        created_at = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+        self.db.insert_up_transaction_rows([transaction_row("tx-1", "HELD", created_at)])
+        self.db.update_up_sync_state(ACCOUNT_ID, 100.0)
+
+        state = self.account_state()
+        self.assertEqual(state["held_count"], 1)
+        self.assertFalse(self.sync._is_account_unchanged(state))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,7 +7,8 @@ import {
   fetchUpHealth,
   fetchUpSummary,
   triggerUpSync,
-  fetchUpSyncStatus
+  fetchUpSyncStatus,
+  subscribeUpSyncEvents
 } from '../services/api';
 import { formatCurrency } from '../utils/formatters';
 
@@ -17,6 +18,7 @@ const UpDashboard = () => {
   const [syncStatus, setSyncStatus] = useState(null);
   const [loading, setLoading] = useState(true);
   const [syncing, setSyncing] = useState(false);
+  const [syncProgress, setSyncProgress] = useState(null);
   const [activeTab, setActiveTab] = useState('overview');
 
   const loadData = useCallback(async () => {
@@ -43,25 +45,40 @@ const UpDashboard = () => {
 
   const handleSync = async () => {
     setSyncing(true);
-    try {
-      await triggerUpSync();
-      const pollInterval = setInterval(async () => {
-        const status = await fetchUpSyncStatus();
-        setSyncStatus(status);
-        const latestSync = status.recent_syncs?.[0];
-        if (latestSync && latestSync.status !== 'running') {
-          clearInterval(pollInterval);
-          setSyncing(false);
-          loadData();
-        }
-      }, 2000);
+    setSyncProgress(null);
+
+    // Subscribe before triggering so no progress events are missed
+    const pages = {};
+    let jobId = null;
+    const closeStream = subscribeUpSyncEvents((event) => {
+      if (event.type === 'page') {
+        pages[event.data.account_id] = event.data;
+        const accountPages = Object.values(pages);
+        setSyncProgress({
+          accounts: accountPages.length,
+          pages: accountPages.reduce((sum, p) => sum + p.pages, 0),
+          rows: accountPages.reduce((sum, p) => sum + p.rows, 0),
+          rateLimitRemaining: event.data.rate_limit_remaining,
+        });
+      } else if (event.type === 'job_completed' && (!jobId || event.data.job_id === jobId)) {
+        closeStream();
+        setSyncing(false);
+        setSyncProgress(null);
+        loadData();
+      }
+    });
 
-      setTimeout(() => {
-        clearInterval(pollInterval);
+    try {
+      const result = await triggerUpSync();
+      jobId = result.job_id;
+      if (result.job?.completed_at) {
+        closeStream();
         setSyncing(false);
-      }, 120000);
+        loadData();
+      }
     } catch (err) {
       console.error('Error syncing:', err);
+      closeStream();
       setSyncing(false);
     }
   };
@@ -246,7 +263,9 @@ const UpDashboard = () => {
           {syncing ? (
             <>
               <span className="spin-icon">⟳</span>
-              Syncing...
+              {syncProgress
+                ? `Syncing... ${syncProgress.rows} rows`
+                : 'Syncing...'}
             </>
           ) : (
             <>
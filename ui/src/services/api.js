@@ -498,6 +498,30 @@ export const fetchUpSyncStatus = async () => {
   }
 };
 
+export const subscribeUpSyncEvents = (onEvent) => {
+  const source = new EventSource(`${API_BASE_URL}/up/sync/events?replay=false`);
+  const eventTypes = [
+    'job_started', 'job_completed', 'sync_started', 'phase_completed',
+    'account_started', 'account_skipped', 'account_completed', 'page', 'sync_completed'
+  ];
+
+  eventTypes.forEach((type) => {
+    source.addEventListener(type, (message) => {
+      try {
+        onEvent(JSON.parse(message.data));
+      } catch (error) {
+        console.error('Error parsing Up sync event:', error);
+      }
+    });
+  });
+
+  source.onerror = (error) => {
+    console.error('Up sync event stream error:', error);
+  };
+
+  return () => source.close();
+};
+
 export const recordBalanceSnapshot = async () => {
   try {
     const response = await axios.post(`${API_BASE_URL}/up/snapshot`);